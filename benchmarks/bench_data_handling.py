@@ -0,0 +1,107 @@
+"""
+Benchmark of the Data accumulation path.
+
+Compares the vectorized single pass accumulation of
+:class:`qupyt.measurement_logic.data_handling.Data` with the former
+per reference channel loop for several ROI sizes and frame counts.
+Besides the runtime, the peak of temporary memory allocated during one
+update is reported (numpy allocations are traced by tracemalloc).
+
+Run with::
+
+    python -m benchmarks.bench_data_handling
+"""
+
+import timeit
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from qupyt.measurement_logic.data_handling import Data
+
+ROI_SHAPES: List[List[int]] = [[32, 32], [128, 128], [512, 512]]
+FRAME_COUNTS: List[int] = [10, 100, 400]
+REFERENCE_CHANNELS = 2
+# Skip combinations whose frame stack would not comfortably fit in memory.
+MAX_STACK_BYTES = 512 * 2**20
+
+
+def _legacy_update(data: Data, frames: np.ndarray) -> None:
+    for i in range(data.reference_channels):
+        if data.averaging_mode == "sum":
+            data.data[i, 0, 0] += frames[i :: data.reference_channels].sum(axis=0)
+        else:
+            data.data[i, 0, 0] += frames[i :: data.reference_channels]
+
+
+def _make_data(averaging_mode: str, nframes: int, roi: List[int]) -> Data:
+    data = Data(
+        {
+            "averaging_mode": averaging_mode,
+            "dynamic_steps": 1,
+            "reference_channels": REFERENCE_CHANNELS,
+            "number_measurements": nframes,
+            "roi_shape": roi,
+        }
+    )
+    data.create_array()
+    return data
+
+
+def _time(func: Callable[[], None], repeats: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeats))
+
+
+def _peak_memory(func: Callable[[], None]) -> int:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run() -> List[Tuple[str, int, str, float, float, int, int]]:
+    results = []
+    rng = np.random.default_rng(0)
+    for averaging_mode in ["sum", "spread"]:
+        for roi in ROI_SHAPES:
+            for nframes in FRAME_COUNTS:
+                if nframes * int(np.prod(roi)) * 2 > MAX_STACK_BYTES:
+                    continue
+                frames = rng.integers(0, 4096, size=(nframes, *roi), dtype=np.uint16)
+                data = _make_data(averaging_mode, nframes, roi)
+                vectorized = _time(lambda: data.update_data(frames, 0, 0, 0), 5)
+                legacy = _time(lambda: _legacy_update(data, frames), 5)
+                vectorized_memory = _peak_memory(lambda: data.update_data(frames, 0, 0, 0))
+                legacy_memory = _peak_memory(lambda: _legacy_update(data, frames))
+                results.append(
+                    (
+                        averaging_mode,
+                        nframes,
+                        "x".join(map(str, roi)),
+                        legacy,
+                        vectorized,
+                        legacy_memory,
+                        vectorized_memory,
+                    )
+                )
+    return results
+
+
+def main() -> None:
+    print(
+        f"{'mode':<8}{'frames':>8}{'roi':>10}{'legacy / ms':>14}{'vectorized / ms':>18}"
+        f"{'speedup':>10}{'legacy peak / MB':>19}{'vectorized peak / MB':>23}"
+    )
+    for result in run():
+        averaging_mode, nframes, roi, legacy, vectorized, legacy_memory, vectorized_memory = result
+        print(
+            f"{averaging_mode:<8}{nframes:>8}{roi:>10}"
+            f"{legacy * 1e3:>14.2f}{vectorized * 1e3:>18.2f}{legacy / vectorized:>10.2f}"
+            f"{legacy_memory / 2**20:>19.2f}{vectorized_memory / 2**20:>23.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark of the PulseBlaster edge compiler.
+
+Compiles DROID60 like blocks, i.e. trains of 60 microwave pulses per
+cycle framed by laser and readout pulses, with up to tens of thousands
+of pulses per block. The vectorized compiler of
+:class:`qupyt.pulse_sequences.SequenceDesigner.PulseBlasterSequence` is
+compared with the former list based one (Python appends, sort of zipped
+event lists, running bit loop and popping zero length events).
+
+Run with::
+
+    python -m benchmarks.bench_pulse_blaster_sequence
+"""
+
+import timeit
+from typing import Any, Dict, List, Tuple
+
+from qupyt.pulse_sequences.compiled_sequence import CompiledSequence, to_microseconds
+from qupyt.pulse_sequences.SequenceDesigner import PulseBlasterSequence
+
+PULSES_PER_CYCLE = 60
+CYCLE_COUNTS: List[int] = [10, 100, 1000]
+CHANNEL_MAPPING = {"LASER": 0, "MW": 1, "MW_Y": 2, "READ": 3}
+
+
+def _droid_sequence(cycles: int) -> Dict[str, Any]:
+    pulse_duration, spacing = 0.024, 0.016
+    microwave: Dict[str, Any] = {"MW": {}, "MW_Y": {}}
+    time = 3.0
+    for pulse in range(cycles * PULSES_PER_CYCLE):
+        # Alternate the pulse axis, as DROID does, between two channels.
+        channel = "MW" if pulse % 3 else "MW_Y"
+        microwave[channel][f"pulse{len(microwave[channel]) + 1}"] = {
+            "start": round(time, 6),
+            "duration": pulse_duration,
+        }
+        time += pulse_duration + spacing
+    block = {
+        "LASER": {
+            "pulse1": {"start": 0.0, "duration": 3.0},
+            "pulse2": {"start": round(time, 6), "duration": 3.0},
+        },
+        "READ": {"pulse1": {"start": round(time, 6), "duration": 0.5}},
+        **microwave,
+    }
+    return {
+        "total_duration": round(time + 3.5, 6),
+        "sequencing_order": ["block_0"],
+        "sequencing_repeats": [1],
+        "block_0": block,
+    }
+
+
+def _legacy_compile(compiled_sequence: CompiledSequence) -> Tuple[List[int], List[float]]:
+    pulses = compiled_sequence.pulses_of("block_0")
+    event_times: List[float] = []
+    event_channel: List[str] = []
+    events: List[str] = []
+    for pulse in pulses:
+        channel = compiled_sequence.channels[pulse["channel"]]
+        event_times += [to_microseconds(pulse["start"]), to_microseconds(pulse["stop"])]
+        event_channel += [channel, channel]
+        events += ["up", "down"]
+    event_times, event_channel, events = zip(
+        *sorted(zip(event_times, event_channel, events))
+    )
+    durations = [i - j for i, j in zip(event_times[1:], event_times[:-1])]
+    total_duration = to_microseconds(compiled_sequence.total_duration)
+    if event_times[-1] != total_duration:
+        durations.append(total_duration - event_times[-1])
+    channel_bits: List[int] = []
+    for i, _ in enumerate(durations):
+        prev_val = channel_bits[-1] if channel_bits else 0
+        sign = 1 if events[i] == "up" else -1
+        channel_bits.append(prev_val + 2 ** CHANNEL_MAPPING[event_channel[i]] * sign)
+    if event_times[0] != 0:
+        channel_bits.insert(0, 0)
+        durations.insert(0, event_times[0])
+    for pop_index in [index for index, duration in enumerate(durations) if duration == 0]:
+        durations.pop(pop_index)
+        channel_bits.pop(pop_index)
+    return channel_bits, durations
+
+
+def _vectorized_compile(
+    compiled_sequence: CompiledSequence,
+) -> Tuple[List[int], List[float], List[int], List[int]]:
+    sequence = PulseBlasterSequence(CHANNEL_MAPPING, compiled_sequence=compiled_sequence)
+    sequence.parse_pulse_sequence_file()
+    return sequence.compile()
+
+
+def _time(func: Any, repeats: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeats))
+
+
+def run() -> List[Tuple[int, int, float, float]]:
+    results = []
+    for cycles in CYCLE_COUNTS:
+        compiled_sequence = CompiledSequence.from_dict(_droid_sequence(cycles))
+        legacy = _time(lambda: _legacy_compile(compiled_sequence), 3)
+        vectorized = _time(lambda: _vectorized_compile(compiled_sequence), 3)
+        results.append((cycles, len(compiled_sequence.pulses), legacy, vectorized))
+    return results
+
+
+def main() -> None:
+    print(
+        f"{'cycles':>8}{'pulses':>10}{'legacy / ms':>14}{'vectorized / ms':>18}{'speedup':>10}"
+    )
+    for cycles, pulses, legacy, vectorized in run():
+        print(
+            f"{cycles:>8}{pulses:>10}{legacy * 1e3:>14.2f}{vectorized * 1e3:>18.2f}"
+            f"{legacy / vectorized:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark of the Pulse Streamer sequence builder.
+
+Builds sequences of alternating DROID60 like blocks, i.e. trains of 60
+microwave pulses per cycle framed by laser and readout pulses, with
+each block repeated many times. The array based builder of
+:class:`qupyt.hardware.synchronisers.PStreamer` (one (duration, level)
+array pair per block and channel, tiled once per channel when the
+sequence is streamed) is compared with the former one (per pulse list
+appends, one Sequence per block, concatenated repetition by
+repetition).
+
+Run with::
+
+    python -m benchmarks.bench_pulse_streamer_sequence
+"""
+
+import timeit
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from unittest import mock
+
+from pulsestreamer import Sequence
+
+from qupyt.hardware import synchronisers
+from qupyt.hardware.synchronisers import PStreamer, compile_pulse_streamer_patterns
+from qupyt.pulse_sequences.compiled_sequence import CompiledSequence
+
+PULSES_PER_CYCLE = 60
+CYCLES = 10
+SEQUENCING_ENTRIES: List[int] = [4, 16, 64]
+BLOCK_REPEATS = 50
+CHANNEL_MAPPING = {"LASER": 0, "MW": 1, "MW_Y": 2, "READ": 3}
+
+
+def _droid_block(offset: int) -> Tuple[Dict[str, Any], float]:
+    pulse_duration, spacing = 0.024 + 0.008 * offset, 0.016
+    microwave: Dict[str, Any] = {"MW": {}, "MW_Y": {}}
+    time = 3.0
+    for pulse in range(CYCLES * PULSES_PER_CYCLE):
+        # Alternate the pulse axis, as DROID does, between two channels.
+        channel = "MW" if pulse % 3 else "MW_Y"
+        microwave[channel][f"pulse{len(microwave[channel]) + 1}"] = {
+            "start": round(time, 6),
+            "duration": pulse_duration,
+        }
+        time += pulse_duration + spacing
+    block = {
+        "LASER": {
+            "pulse1": {"start": 0.0, "duration": 3.0},
+            "pulse2": {"start": round(time, 6), "duration": 3.0},
+        },
+        "READ": {"pulse1": {"start": round(time, 6), "duration": 0.5}},
+        **microwave,
+    }
+    return block, round(time + 3.5, 6)
+
+
+def _droid_sequence(entries: int) -> Dict[str, Any]:
+    block_0, duration_0 = _droid_block(0)
+    block_1, duration_1 = _droid_block(1)
+    return {
+        "total_duration": max(duration_0, duration_1),
+        "sequencing_order": ["block_0", "block_1"] * (entries // 2),
+        "sequencing_repeats": [BLOCK_REPEATS] * entries,
+        "block_0": block_0,
+        "block_1": block_1,
+    }
+
+
+def _legacy_pattern(pulses: Any, total_duration: int) -> List[Tuple[int, int]]:
+    seq = []
+    pointer_i = 0
+    for pulse in sorted(pulses.tolist(), key=lambda pulse: pulse[2]):
+        start_pulse_i = int(round(pulse[2] / 1000))
+        len_pulse_i = int(round((pulse[3] - pulse[2]) / 1000))
+        seq.append((start_pulse_i - pointer_i, 0))
+        seq.append((len_pulse_i, 1))
+        pointer_i = start_pulse_i + len_pulse_i
+    seq.append((total_duration - pointer_i, 0))
+    return seq
+
+
+def _legacy_build(compiled_sequence: CompiledSequence) -> Sequence:
+    total_duration = int(round(compiled_sequence.total_duration / 1000))
+    sequences_to_write = {}
+    for block in compiled_sequence.blocks:
+        sequences_to_write[block] = Sequence()
+        for channel in compiled_sequence.channels_of(block):
+            sequences_to_write[block].setDigital(
+                CHANNEL_MAPPING[channel],
+                _legacy_pattern(
+                    compiled_sequence.pulses_of(block, channel), total_duration
+                ),
+            )
+    sequence = Sequence()
+    for block, repetitions in zip(
+        compiled_sequence.sequencing_order, compiled_sequence.repeats.tolist()
+    ):
+        sequence += repetitions * sequences_to_write[block]
+    return sequence
+
+
+def _array_build(compiled_sequence: CompiledSequence) -> Sequence:
+    streamer = PStreamer.__new__(PStreamer)
+    with mock.patch.object(
+        synchronisers, "load_compiled_sequence", lambda _: compiled_sequence
+    ):
+        streamer.compiled_patterns = compile_pulse_streamer_patterns(
+            Path(), CHANNEL_MAPPING
+        )
+    return streamer._build_sequence()
+
+
+def _time(func: Any, repeats: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeats))
+
+
+def run() -> List[Tuple[int, int, float, float]]:
+    results = []
+    for entries in SEQUENCING_ENTRIES:
+        compiled_sequence = CompiledSequence.from_dict(_droid_sequence(entries))
+        legacy = _time(lambda: _legacy_build(compiled_sequence), 3)
+        array = _time(lambda: _array_build(compiled_sequence), 3)
+        results.append((entries, len(compiled_sequence.pulses), legacy, array))
+    return results
+
+
+def main() -> None:
+    print(
+        f"{'entries':>8}{'pulses':>10}{'legacy / ms':>14}{'arrays / ms':>14}{'speedup':>10}"
+    )
+    for entries, pulses, legacy, array in run():
+        print(
+            f"{entries:>8}{pulses:>10}{legacy * 1e3:>14.2f}{array * 1e3:>14.2f}"
+            f"{legacy / array:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
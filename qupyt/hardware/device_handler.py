@@ -12,10 +12,13 @@ or sweeped are handled here as well.
 """
 import copy
 import logging
-from typing import Dict, Any, List, Union, Tuple
+from typing import Dict, Any, List, Optional, Union, Tuple
 import numpy as np
 from pydantic import validate_call
 from qupyt.hardware.signal_sources import DeviceFactory
+from qupyt.hardware.sensors import Sensor, SensorFactory
+from qupyt.hardware.synchronisers import Synchroniser, SynchroniserFactory
+from qupyt.hardware.settle import wait_until_settled
 
 DynamicParameterInput = Union[
     List[Union[float, int]],
@@ -24,6 +27,21 @@ DynamicParameterInput = Union[
 ]
 
 
+def _changed_configuration(
+    applied: Dict[str, Any], requested: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    :return: Requested configuration values that differ from
+     the applied ones.
+    :rtype: Dict[str, Any]
+    """
+    return {
+        key: value
+        for key, value in requested.items()
+        if key not in applied or applied[key] != value
+    }
+
+
 class DeviceHandler:
     """
     A class to handle the management of devices for measurements.
@@ -230,8 +248,19 @@ class DynamicDeviceHandler(DeviceHandler):
                     )
             device["device"].update_configuration(current_config)
             device["device"].set_values()
+            device["device"].mark_touched()
         self.current_dynamic_step += 1
 
+    def wait_until_settled(self) -> float:
+        """
+        Wait until all devices changed in the last dynamic step have settled,
+        according to their settle policies.
+
+        :return: Time waited in seconds.
+        :rtype: float
+        """
+        return wait_until_settled(device["device"] for device in self.devices.values())
+
     def _reset_step_counter(self) -> None:
         """
         Reset the dynamic step counter to zero.
@@ -278,3 +307,199 @@ class DynamicDeviceHandler(DeviceHandler):
         if isinstance(arg, list):
             return [("channel_1", arg)]
         raise ValueError("Dynamic parameter coercion failed")
+
+
+class SensorHandler:
+    """
+    Keeps the sensor open across measurements.
+
+    Creating a sensor can take seconds (loading GenTL producers,
+    device discovery, ...). Poolable sensors (see :attr:`Sensor.poolable`)
+    are therefore kept open after a measurement. If the next measurement
+    requests the same sensor type and connection
+    (see :attr:`Sensor.connection_keys`), only the configuration values
+    that changed are applied to the open sensor.
+
+    A new sensor is created if the type or connection changes, or
+    if a configuration value was dropped, since its default value
+    cannot be restored on the open sensor.
+    """
+
+    def __init__(self) -> None:
+        self.sensor: Optional[Sensor] = None
+        self.sensor_type: Optional[str] = None
+        self.configuration: Dict[str, Any] = {}
+
+    def get_sensor(self, sensor_type: str, configuration: Dict[str, Any]) -> Sensor:
+        """
+        Return a sensor of the requested type and configuration,
+        reusing the pooled sensor if possible.
+
+        :param sensor_type: Sensor model identifier,
+         see :meth:`SensorFactory.create_sensor`.
+        :type sensor_type: str
+        :param configuration: Sensor configuration dictionary.
+        :type configuration: Dict[str, Any]
+        :return: Configured sensor. Sensors that are not poolable
+         are not kept and have to be closed by the caller.
+        :rtype: Sensor
+        """
+        configuration = copy.deepcopy(configuration) if configuration else {}
+        if self._is_reusable(sensor_type, configuration):
+            assert self.sensor is not None
+            changed = _changed_configuration(self.configuration, configuration)
+            try:
+                self.sensor.reconfigure(changed)
+            except Exception:
+                self.close()
+                raise
+            self.configuration = configuration
+            logging.info(
+                f"Reused {repr(self.sensor)}, updated {list(changed)}".ljust(65, ".")
+                + "[done]"
+            )
+            return self.sensor
+        self.close()
+        sensor = SensorFactory.create_sensor(sensor_type, configuration)
+        if sensor.poolable:
+            self.sensor = sensor
+            self.sensor_type = sensor_type
+            self.configuration = configuration
+            logging.info(
+                f"Added {repr(sensor)} to sensor pool".ljust(65, ".") + "[done]"
+            )
+        return sensor
+
+    def close(self) -> None:
+        """
+        Close and forget the pooled sensor, if there is one.
+        """
+        if self.sensor is None:
+            return
+        self.sensor.close()
+        logging.info(
+            f"Removed {repr(self.sensor)} from sensor pool".ljust(65, ".") + "[done]"
+        )
+        self.sensor = None
+        self.sensor_type = None
+        self.configuration = {}
+
+    def _is_reusable(self, sensor_type: str, configuration: Dict[str, Any]) -> bool:
+        if self.sensor is None or sensor_type != self.sensor_type:
+            return False
+        if not set(self.configuration).issubset(configuration):
+            return False
+        return all(
+            self.configuration.get(key) == configuration.get(key)
+            for key in self.sensor.connection_keys
+        )
+
+
+class SynchroniserHandler:
+    """
+    Keeps the synchroniser connected across pulse sequence steps
+    and measurements.
+
+    Opening a synchroniser reconfigures the whole device (sampling rate,
+    DAC resolution, amplitudes and marker levels of an AWG, a new
+    PulseStreamer client, ...). The measurement loop therefore only calls
+    :meth:`Synchroniser.ensure_open`, and this handler keeps the
+    synchroniser between measurements. If the next measurement requests
+    the same synchroniser type, connection
+    (see :attr:`Synchroniser.connection_keys`) and channel mapping, only the
+    configuration values that changed are applied, and the device is
+    reconfigured on the next :meth:`Synchroniser.ensure_open`.
+
+    A new synchroniser is created if the type, connection or channel mapping
+    changes, or if a configuration value was dropped.
+    """
+
+    def __init__(self) -> None:
+        self.synchroniser: Optional[Synchroniser] = None
+        self.sync_type: Optional[str] = None
+        self.configuration: Dict[str, Any] = {}
+        self.channel_mapping: Dict[str, Any] = {}
+
+    def get_synchroniser(
+        self,
+        sync_type: str,
+        configuration: Dict[str, Any],
+        channel_mapping: Dict[str, Any],
+    ) -> Synchroniser:
+        """
+        Return a synchroniser of the requested type and configuration,
+        reusing the cached synchroniser if possible.
+
+        :param sync_type: Synchroniser model identifier,
+         see :meth:`SynchroniserFactory.create_synchroniser`.
+        :type sync_type: str
+        :param configuration: Synchroniser configuration dictionary.
+        :type configuration: Dict[str, Any]
+        :param channel_mapping: Matches channel descriptors to ports on the device.
+        :type channel_mapping: Dict[str, Any]
+        :rtype: Synchroniser
+        """
+        configuration = copy.deepcopy(configuration) if configuration else {}
+        channel_mapping = copy.deepcopy(channel_mapping) if channel_mapping else {}
+        if self._is_reusable(sync_type, configuration, channel_mapping):
+            assert self.synchroniser is not None
+            changed = _changed_configuration(self.configuration, configuration)
+            if changed:
+                try:
+                    self.synchroniser.reconfigure(changed)
+                except Exception:
+                    self.close()
+                    raise
+            self.configuration = configuration
+            logging.info(
+                f"Reused {repr(self.synchroniser)}, updated {list(changed)}".ljust(
+                    65, "."
+                )
+                + "[done]"
+            )
+            return self.synchroniser
+        self.close()
+        self.synchroniser = SynchroniserFactory.create_synchroniser(
+            sync_type, configuration, channel_mapping
+        )
+        self.sync_type = sync_type
+        self.configuration = configuration
+        self.channel_mapping = channel_mapping
+        logging.info(
+            f"Added {repr(self.synchroniser)} as synchroniser".ljust(65, ".")
+            + "[done]"
+        )
+        return self.synchroniser
+
+    def close(self) -> None:
+        """
+        Close and forget the cached synchroniser, if there is one.
+        """
+        if self.synchroniser is None:
+            return
+        self.synchroniser.ensure_closed()
+        logging.info(
+            f"Removed {repr(self.synchroniser)} as synchroniser".ljust(65, ".")
+            + "[done]"
+        )
+        self.synchroniser = None
+        self.sync_type = None
+        self.configuration = {}
+        self.channel_mapping = {}
+
+    def _is_reusable(
+        self,
+        sync_type: str,
+        configuration: Dict[str, Any],
+        channel_mapping: Dict[str, Any],
+    ) -> bool:
+        if self.synchroniser is None or sync_type != self.sync_type:
+            return False
+        if channel_mapping != self.channel_mapping:
+            return False
+        if not set(self.configuration).issubset(configuration):
+            return False
+        return all(
+            self.configuration.get(key) == configuration.get(key)
+            for key in self.synchroniser.connection_keys
+        )
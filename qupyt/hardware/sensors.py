@@ -39,6 +39,7 @@ except ImportError:
     )
 
 from qupyt.hardware.synchronisers import Synchroniser
+from qupyt.hardware.settle import SettleMixin
 from qupyt.mixins import ConfigurationMixin, UpdateConfigurationType, ConfigurationError
 
 # Imports for HeliCam
@@ -129,7 +130,7 @@ class SensorFactory:
             raise exc
 
 
-class Sensor(ABC, ConfigurationMixin):
+class Sensor(ABC, ConfigurationMixin, SettleMixin):
     """
     Abstract Base Class for all sensors. All sensors implemented in QuPyt
     should inherit from this class. This helps ensure compliance with the
@@ -147,6 +148,11 @@ class Sensor(ABC, ConfigurationMixin):
           Possible configuration values:
             - **number_measurements** (int, even): Set the number of
               images or measurements the sensor will acquire in one go.
+            - **settle_policy** (str): How to wait after :meth:`open`. 'fixed'
+              (default), 'ready' or 'none'. See :mod:`qupyt.hardware.settle`.
+            - **settle_time** (float, s): Settle time of the 'fixed' policy.
+              Defaults to 0.5 s.
+            - **settle_timeout** (float, s): Longest wait of the 'ready' policy.
 
           Concrete sensor classes may have additional configuration values.
 
@@ -161,9 +167,22 @@ class Sensor(ABC, ConfigurationMixin):
           data container. Not settable for all sensors.
         - **number_measurements** (int): Set by the number_measurements
           attribute in the configuration dict.
+        - **native_data_type** (type): Pixel data type the sensor returns
+          from :meth:`acquire_data`. The data container uses it, together with
+          **bit_depth**, to pick the smallest overflow safe accumulator.
+        - **bit_depth** (int | None): Number of significant bits per pixel,
+          e.g. 12 for Mono12 data in uint16 containers. None if the full
+          range of native_data_type is used.
+        - **poolable** (bool): True if the sensor can stay open between
+          measurements and be reconfigured in place.
+          See :class:`qupyt.hardware.device_handler.SensorHandler`.
+        - **connection_keys** (list[str]): Configuration keys identifying
+          the physical device. A pooled sensor is only reused if these match.
     """
 
     attribute_map: UpdateConfigurationType
+    poolable: bool = False
+    connection_keys: List[str] = []
 
     def __init__(
         self, configuration: Dict[str, Any]
@@ -173,11 +192,38 @@ class Sensor(ABC, ConfigurationMixin):
         self.roi_shape: list[int]
         self.number_measurements: int = 2
         self.target_data_type: type
+        self.native_data_type: type = np.float64
+        self.bit_depth: Optional[int] = None
+        self._init_settle(0.5)
         self.attribute_map = {
             "number_measurements": lambda x: setattr(self, "number_measurements", x),
             "target_data_type": lambda x: setattr(self, "target_data_type", x),
+            "settle_policy": self._set_settle_policy,
+            "settle_time": self._set_settle_time,
+            "settle_timeout": self._set_settle_timeout,
         }
 
+    def set_number_measurements(self, number_measurements: int) -> None:
+        """
+        Change the number of measurements acquired per :meth:`acquire_data`
+        call, e.g. to record several averages in one go.
+        Goes through the same setter as the configuration value.
+
+        :param number_measurements: Measurements per acquisition.
+        :type number_measurements: int
+        """
+        self.attribute_map["number_measurements"](int(number_measurements))
+
+    def reconfigure(self, configuration: Dict[str, Any]) -> None:
+        """
+        Apply changed configuration values to the sensor, e.g. when it
+        is reused for the next measurement.
+
+        :param configuration: Configuration values to change.
+        :type configuration: Dict[str, Any]
+        """
+        self._update_from_configuration(configuration)
+
     @abstractmethod
     def open(self) -> None:
         """
@@ -247,6 +293,8 @@ class GenICamPhantom(Sensor):
         - ConfigurationError
     """
 
+    poolable = True
+
     def __init__(self, configuration: Dict[str, Any]) -> None:
         self.cam, self.cam_instance = self._discover_and_setup()
         super().__init__(configuration)
@@ -256,6 +304,8 @@ class GenICamPhantom(Sensor):
         self.cam.remote.set("Width", 1280)
         self.cam.remote.set("PixelFormat", "Mono8")
         self.image_dtype = np.uint8
+        self.native_data_type = self.image_dtype
+        self.bit_depth = 8
         self.cam.remote.set("TriggerSource", "GPIO0")
         self.cam.remote.set("TriggerMode", "TriggerModeOn")
         self.cam.remote.set("ExposureTime", 20)
@@ -325,6 +375,8 @@ class GenICamPhantom(Sensor):
             raise ConfigurationError(
                 "pixel_bits", pixel_bits, ["mono8", "mono12", "mono16"]
             )
+        self.native_data_type = self.image_dtype
+        self.bit_depth = int(pixel_bits[4:])
         self.cam.remote.set("PixelFormat", pixel_bits)
 
     def _set_exposure_time(self, exposure_time: int) -> None:
@@ -400,8 +452,8 @@ class GenICamPhantom(Sensor):
 
         self.cam.realloc_buffers(self.number_measurements)
         self.cam.start()
-        data = np.zeros((self.number_measurements,
-                        height * 4, width), dtype=np.uint32)
+        data = np.empty((self.number_measurements,
+                        height * 4, width), dtype=self.image_dtype)
         timesteps = np.zeros(self.number_measurements, dtype=np.float64)
         if synchroniser is not None:
             synchroniser.trigger()
@@ -411,7 +463,7 @@ class GenICamPhantom(Sensor):
                     buffer)
                 raw_frame = self._move_frame_from_pool(
                     buffer_ptr, image_size, part_num)
-                data[i] += raw_frame
+                data[i] = raw_frame
                 timesteps[i] += timestep
         self.cam.stop()
 
@@ -497,6 +549,9 @@ class GenICamHarvester(Sensor):
         - **FileNotFoundError**
     """
 
+    poolable = True
+    connection_keys = ["GenTL_producer_cti"]
+
     def __init__(self, configuration: Dict[str, Any]) -> None:
         self.harvester = Harvester()
         self.cti_file = configuration["GenTL_producer_cti"]
@@ -514,6 +569,8 @@ class GenICamHarvester(Sensor):
         super().__init__(configuration)
         self.cam.remote_device.node_map.CxpLinkConfiguration.value = "CXP12_X4"
         self.cam.remote_device.node_map.PixelFormat.value = "Mono10"
+        self.native_data_type = np.uint16
+        self.bit_depth = 10
         self.cam.remote_device.node_map.TriggerMode.value = "On"
         self.cam.remote_device.node_map.TriggerSource.value = "Line0"
         self.cam.remote_device.node_map.TriggerSelector.value = "FrameStart"
@@ -616,8 +673,8 @@ class GenICamHarvester(Sensor):
         height = self.cam.remote_device.node_map.Height.value
         width = self.cam.remote_device.node_map.Width.value
         self.cam.start()
-        data = np.zeros((self.number_measurements,
-                        height * width), dtype=np.uint32)
+        data = np.empty((self.number_measurements,
+                        height * width), dtype=self.native_data_type)
         if synchroniser is not None:
             synchroniser.trigger()
         for i in range(self.number_measurements):
@@ -683,6 +740,8 @@ class BaslerCam(Sensor):
           :class:`Sensor` base class.
     """
 
+    poolable = True
+
     def __init__(self, configuration: Dict[str, Any]) -> None:
         self.cam = pylon.InstantCamera(
             pylon.TlFactory.GetInstance().CreateFirstDevice()
@@ -691,6 +750,8 @@ class BaslerCam(Sensor):
         self._configure_defaults()
         self._configure_const()
         super().__init__(configuration)
+        self.native_data_type = np.uint16
+        self.bit_depth = 12
         self.attribute_map["exposure_time"] = self._set_exposure_time
         self.attribute_map["binning_horizontal"] = self._set_binning_horizontal
         self.attribute_map["trigger_line"] = self._set_trigger_line
@@ -739,7 +800,7 @@ class BaslerCam(Sensor):
         See :meth:`Sensor.acquire_data`.
         """
         time_1 = time()
-        arr = np.zeros((self.number_measurements, *self.roi_shape))
+        arr: np.ndarray = np.empty((self.number_measurements, *self.roi_shape), dtype=self.native_data_type)
         self.cam.StartGrabbingMax(self.number_measurements)
         if synchroniser is not None:
             synchroniser.trigger()
@@ -921,6 +982,7 @@ class HeliCam(Sensor):
             self._update_from_configuration(configuration)
         self.he_sys = heli.LibHeLIC()
         self.roi_shape = [300, 300]
+        self.native_data_type = np.uint16
 
     def __repr__(self) -> str:
         return f"HeliCam(configuration: {self.initial_configuration_dict})"
@@ -980,8 +1042,10 @@ class HeliCam(Sensor):
         data = heli.LibHeLIC.Ptr2Arr(
             data, (self.settings["SensNFrames"], 300, 300, 2), heli.ct.c_ushort
         )
-        raw_frames = np.asarray((data), dtype="int32")
-        return_frames = np.zeros((2 * self.settings["SensNFrames"], 300, 300))
+        raw_frames = np.asarray(data)
+        return_frames: np.ndarray = np.empty(
+            (2 * self.settings["SensNFrames"], 300, 300), dtype=self.native_data_type
+        )
         return_frames[::2] = raw_frames[:, :, :, 0]
         return_frames[1::2] = raw_frames[:, :, :, 1]
         time_2 = time()
@@ -1200,9 +1264,12 @@ class MockCam(Sensor):
           :class:`Sensor` base class.
     """
 
+    poolable = True
+
     def __init__(self, configuration: Dict[str, Any]) -> None:
         super().__init__(configuration)
         self.roi_shape = [200, 200]
+        self.native_data_type = np.uint16
         self.attribute_map["image_roi"] = self._set_roi
         self.initial_configuration_dict = configuration
         if configuration is not None:
@@ -1242,7 +1309,7 @@ class MockCam(Sensor):
             15_000,
             size=(self.number_measurements, *self.roi_shape),
         )
-        return noise
+        return noise.astype(self.native_data_type)
 
     def close(self) -> None:
         """
@@ -0,0 +1,139 @@
+"""
+Settle policies for devices touched during a measurement.
+
+Instead of sleeping for a fixed time after every device interaction,
+each device declares how long it needs to settle after being touched:
+
+- **fixed**: wait ``settle_time`` seconds after the device was touched.
+- **ready**: poll the device's :meth:`SettleMixin.is_ready` query until it
+  reports ready, or ``settle_timeout`` seconds have passed.
+- **none**: the device does not need to settle.
+
+The measurement loop touches devices, then calls
+:func:`wait_until_settled` once. Settle times of different devices run
+concurrently, so the loop only waits as long as the slowest device
+touched in that step needs.
+"""
+
+import logging
+from time import perf_counter, sleep
+from typing import Any, Dict, Iterable, Optional
+
+from qupyt.mixins import ConfigurationError
+
+SETTLE_POLICIES = ["fixed", "ready", "none"]
+
+
+class SettleMixin:
+    """
+    Mixin class adding a settle policy to a device.
+
+    Configuration values (where the device exposes them):
+        - **settle_policy** (str): 'fixed', 'ready' or 'none'.
+        - **settle_time** (float, s): Settle time for the 'fixed' policy.
+        - **settle_timeout** (float, s): Longest wait for the 'ready' policy.
+    """
+
+    settle_policy: str
+    settle_time: float
+    settle_timeout: float
+    _touched_at: Optional[float]
+
+    def _init_settle(self, settle_time: float, settle_policy: str = "fixed") -> None:
+        self.settle_policy = settle_policy
+        self.settle_time = float(settle_time)
+        self.settle_timeout = 10.0
+        self._touched_at = None
+
+    def _set_settle_policy(self, settle_policy: str) -> None:
+        if settle_policy not in SETTLE_POLICIES:
+            raise ConfigurationError("settle_policy", settle_policy, SETTLE_POLICIES)
+        self.settle_policy = settle_policy
+
+    def _set_settle_time(self, settle_time: float) -> None:
+        self.settle_time = float(settle_time)
+
+    def _set_settle_timeout(self, settle_timeout: float) -> None:
+        self.settle_timeout = float(settle_timeout)
+
+    def configure_settle(self, configuration: Any) -> None:
+        """
+        Apply settle_policy, settle_time and settle_timeout
+        if present in the configuration dictionary.
+        """
+        if not configuration:
+            return
+        if "settle_policy" in configuration:
+            self._set_settle_policy(configuration["settle_policy"])
+        if "settle_time" in configuration:
+            self._set_settle_time(configuration["settle_time"])
+        if "settle_timeout" in configuration:
+            self._set_settle_timeout(configuration["settle_timeout"])
+
+    def is_ready(self) -> bool:
+        """
+        Readiness query used by the 'ready' policy.
+        Devices that can report their state override this.
+        """
+        return True
+
+    def mark_touched(self) -> None:
+        """
+        Start the settle period of the device.
+        """
+        self._touched_at = perf_counter()
+
+    def mark_settled(self) -> None:
+        """
+        End the settle period of the device.
+        """
+        self._touched_at = None
+
+    def time_to_settle(self, now: float) -> Optional[float]:
+        """
+        :return: None if settled, otherwise the time to wait
+         before checking again.
+        """
+        if self._touched_at is None or self.settle_policy == "none":
+            return None
+        if self.settle_policy == "fixed":
+            remaining = self._touched_at + self.settle_time - now
+            return remaining if remaining > 0 else None
+        if self.is_ready():
+            return None
+        if now - self._touched_at >= self.settle_timeout:
+            logging.warning(
+                f"{self} not ready after {self.settle_timeout} s".ljust(65, ".")
+                + "[timeout]"
+            )
+            return None
+        return 0.0
+
+
+def wait_until_settled(devices: Iterable[Any], poll_interval: float = 1e-3) -> float:
+    """
+    Block until all touched devices have settled.
+    Devices without a settle policy are ignored.
+
+    :param devices: Devices that may have been touched.
+    :type devices: Iterable
+    :param poll_interval: Time between readiness queries in seconds.
+    :type poll_interval: float
+    :return: Time waited in seconds.
+    :rtype: float
+    """
+    time_1 = perf_counter()
+    pending = [device for device in devices if isinstance(device, SettleMixin)]
+    while pending:
+        now = perf_counter()
+        waits: Dict[SettleMixin, float] = {}
+        for device in pending:
+            wait = device.time_to_settle(now)
+            if wait is None:
+                device.mark_settled()
+            else:
+                waits[device] = wait
+        pending = list(waits)
+        if pending:
+            sleep(min(max(wait, poll_interval) for wait in waits.values()))
+    return perf_counter() - time_1
@@ -12,6 +12,7 @@ import serial
 from windfreak import SynthHD
 from pydantic import validate_call
 from qupyt.hardware import visa_handler
+from qupyt.hardware.settle import SettleMixin
 from qupyt.mixins import UpdateConfigurationType, ConfigurationMixin, ConfigurationError
 from qupyt.utils.decorators import coerce_device_config_shape, loop_inputs
 
@@ -51,6 +52,11 @@ class DeviceFactory:
           is a static method. This means you don't have to create a class
           instance to call it.
 
+    Besides 'address', 'device_type' and 'config', a device entry may
+    contain 'settle_policy', 'settle_time' and 'settle_timeout'
+    (see :mod:`qupyt.hardware.settle`). They define how long the measurement
+    waits after the device's values were changed. The default is a fixed 0.1 s.
+
     Example:
         >>> device = DeviceFactory.create_device('EoSense1.1CXP', {'number_measurements_referenced': 10})
     """
@@ -64,6 +70,12 @@ class DeviceFactory:
         :rtype:
         :raises ConfigurationError:
         """
+        device = DeviceFactory._instantiate_device(device_info)
+        device.configure_settle(device_info)
+        return device
+
+    @staticmethod
+    def _instantiate_device(device_info: Dict[str, Any]) -> "SignalSource":
         known_devices = [
             "WindFreak",
             "WindFreakHDM",
@@ -126,7 +138,7 @@ class DeviceFactory:
             raise exc
 
 
-class SignalSource(ABC, ConfigurationMixin):
+class SignalSource(ABC, ConfigurationMixin, SettleMixin):
     attribute_map: UpdateConfigurationType
 
     def __init__(self, configuration: Dict[str, Any]) -> None:
@@ -134,6 +146,9 @@ class SignalSource(ABC, ConfigurationMixin):
         # configuration is not used in the ABC, however
         # all child classes must take it as input.
         self.configuration = configuration
+        # Settle settings are read from the top level of the device
+        # entry by the DeviceFactory, since 'config' holds the sweep values.
+        self._init_settle(0.1)
         self.attribute_map = {
             "frequency": self.set_frequency,
             "amplitude": self.set_amplitude,
@@ -5,11 +5,14 @@ Handle AWG input and output.
 """
 
 from __future__ import annotations
+import hashlib
 import logging
 import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from time import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Tuple, List, Union
+from typing import Any, Callable, Dict, Tuple, List, Optional, Set, Union
 from pathlib import Path
 import sys
 import ctypes as ct
@@ -20,18 +23,26 @@ import numpy as np
 from tqdm import tqdm
 from termcolor import colored
 
-from qupyt.set_up import get_seq_dir
 from qupyt.pulse_sequences.SequenceDesigner import (
     PulseSequenceYaml,
     PulseBlasterSequence,
+    PulseRecords,
 )
+from qupyt.pulse_sequences import sequence_cache
+from qupyt.pulse_sequences.compiled_sequence import load_compiled_sequence
 from pulsestreamer import PulseStreamer
 from pulsestreamer import findPulseStreamers
 from pulsestreamer import TriggerStart, TriggerRearm
 from pulsestreamer import Sequence, OutputState
 from qupyt.hardware.visa_handler import VisaObject
+from qupyt.hardware.settle import SettleMixin
 from qupyt import set_up
-from qupyt.mixins import ConfigurationMixin, UpdateConfigurationType, PulseSequenceError
+from qupyt.mixins import (
+    ConfigurationMixin,
+    UpdateConfigurationType,
+    PulseSequenceError,
+    ConfigurationError,
+)
 
 try:
     import qupyt.hardware.wrappers.spinapi_adapted as spapi
@@ -43,6 +54,14 @@ except (ImportError, NameError):
     )
 
 
+#: Number of worker processes compiling pulse sequences ahead of time,
+#: if not configured otherwise.
+PRECOMPILE_WORKERS = 4
+#: Sequence files smaller than this in total (in bytes) are compiled in
+#: this process, starting workers would take longer than compiling.
+PRECOMPILE_IN_PROCESS_BYTES = 2**20
+
+
 class SynchroniserFactory:
     """
     Synchroniser Factory responsible for creating and returning an instance of the
@@ -89,7 +108,280 @@ class SynchroniserFactory:
         raise ValueError(f"Unknown synchroniser type {sync_type}")
 
 
-class Synchroniser(ABC, ConfigurationMixin):
+def compile_awg_sequence(
+    yaml_file: Path,
+    channel_mapping: Dict[str, Any],
+    awg_sources: List[int],
+    samprate: float,
+) -> Path:
+    """
+    :return: Path of the compiled AWG sequence (.npz), see
+     :class:`qupyt.pulse_sequences.SequenceDesigner.PulseRecords`.
+    :rtype: Path
+    """
+    sequence_translator = PulseSequenceYaml(
+        channel_mapping, awg_sources, samprate=samprate, yaml_file=yaml_file
+    )
+    return sequence_translator.translate_yaml_to_numeric_instructions()
+
+
+PulseStreamerPatterns = Tuple[
+    List[str], List[int], Dict[str, Dict[int, Tuple[np.ndarray, np.ndarray]]]
+]
+
+
+def pulse_streamer_pattern(
+    channel_key: str, pulses: np.ndarray, total_duration: Optional[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the (duration, level) sequence for the
+    PulseStreamer of the given channel: LASER, MW or READ,
+    as two integer arrays (durations in ns). All pulses are
+    translated at once, into a low and a high step each: ___----
+
+    :param channel_key: channel_key of the pulse to be written
+     (LASER, MW or READ).
+    :type channel_key: str
+    :param pulses: Pulses of this channel in one block, see
+     :class:`qupyt.pulse_sequences.compiled_sequence.CompiledSequence`.
+    :type pulses: np.ndarray
+    :param total_duration: Duration of the block in ns, or None if the
+     pattern ends with its last pulse.
+    :type total_duration: Optional[int]
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    pulses = np.sort(pulses, order="start", kind="stable")
+
+    # Check for unsupported analog signals
+    if np.any(pulses["frequency"] != 0):
+        logging.warning(
+            "Warning: Frequency different than 0. This programm does not support analog signals. Set frequency to 0."
+        )
+        raise PulseSequenceError
+    if np.any(pulses["amplitude"] != 1):
+        logging.warning(
+            "Warning: Amplitude of the pulse different than 1 (can only be 0 or 1). This programm does not support analog signals. Set amplitude to 1."
+        )
+        raise PulseSequenceError
+    if np.any(pulses["phase"] != 0):
+        logging.warning(
+            "Warning: Phase of the pulse different than 0. This programm does not support analog signals. Set amplitude to 1."
+        )
+        raise PulseSequenceError
+
+    # Check for non-multples of the sampling time.
+    lengths = pulses["stop"] - pulses["start"]
+    if np.any(pulses["start"] % 1000 != 0) or np.any(lengths % 1000 != 0):
+        logging.warning(
+            "Warning: Sampling unit is 1ns. Time values are being rounded."
+        )
+    # Round the values to ns
+    starts = np.round(pulses["start"] / 1000).astype(np.int64)
+    lengths = np.round(lengths / 1000).astype(np.int64)
+    # Pointer in time (ns) before each pulse and after the last one.
+    pointers = np.concatenate(([0], starts + lengths))
+
+    # Check if pulses are well defined
+    if np.any(pointers[:-1] * 1000 > pulses["start"]):
+        logging.error(
+            "Error: "
+            + channel_key
+            + " sequence definition makes no sense, pulses are overlaping!"
+        )
+        raise PulseSequenceError
+
+    durations = np.empty(2 * len(pulses), dtype=np.int64)
+    durations[0::2] = starts - pointers[:-1]
+    durations[1::2] = lengths
+    levels = np.tile(np.array([0, 1], dtype=np.int64), len(pulses))
+
+    if total_duration is None:
+        return durations, levels
+    # Check if the sequence is longer than the defined total time.
+    if pointers[-1] > total_duration:
+        logging.error(
+            f"Error: {channel_key} duration exceeds the defined total time."
+        )
+        raise PulseSequenceError
+    # Add the final low to make the sequence last its length
+    durations = np.append(durations, total_duration - pointers[-1])
+    levels = np.append(levels, 0)
+    return durations, levels
+
+
+def compile_pulse_streamer_patterns(
+    yaml_file: Path, channel_mapping: Dict[str, Any]
+) -> PulseStreamerPatterns:
+    """
+    Translate a YAML sequence into digital patterns per block and
+    output channel.
+
+    Every block holds a pattern for every output channel of the
+    sequence, padded to the duration of the block as the Pulse
+    Streamer's Sequence would pad it (with the last level, channels
+    missing from the block are low). Blocks can then be repeated and
+    concatenated channel by channel.
+
+    :return: Sequencing order, sequencing repeats and the patterns.
+    :rtype: PulseStreamerPatterns
+    """
+    compiled_sequence = load_compiled_sequence(yaml_file)
+
+    total_duration = None
+    if compiled_sequence.total_duration is not None:
+        if compiled_sequence.total_duration % 1000 != 0:
+            logging.warning(
+                "Warning: The total duration is not multiple of the\
+                        sampling time and is being rounded!".ljust(
+                    65, "."
+                )
+                + "[WARNING]"
+            )
+        # convert to ns
+        total_duration = int(round(compiled_sequence.total_duration / 1000))
+
+    patterns: Dict[str, Dict[int, Tuple[np.ndarray, np.ndarray]]] = {}
+    for block in compiled_sequence.blocks:
+        patterns[block] = {}
+        for channel in compiled_sequence.channels_of(block):
+            patterns[block][channel_mapping[channel]] = pulse_streamer_pattern(
+                channel, compiled_sequence.pulses_of(block, channel), total_duration
+            )
+    output_channels = sorted(
+        {channel for block_patterns in patterns.values() for channel in block_patterns}
+    )
+    for block_patterns in patterns.values():
+        block_duration = max(
+            [int(durations.sum()) for durations, _ in block_patterns.values()],
+            default=0,
+        )
+        for port in output_channels:
+            durations, levels = block_patterns.get(
+                port, (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+            )
+            padding = block_duration - int(durations.sum())
+            if padding > 0:
+                durations = np.append(durations, padding)
+                levels = np.append(levels, levels[-1] if len(levels) else 0)
+            block_patterns[port] = (durations, levels)
+    return (
+        compiled_sequence.sequencing_order,
+        compiled_sequence.repeats.tolist(),
+        patterns,
+    )
+
+
+def save_pulse_streamer_patterns(path: Path, compiled: PulseStreamerPatterns) -> None:
+    """
+    Write patterns as returned by :func:`compile_pulse_streamer_patterns`
+    to an .npz file. Blocks are stored by their index, as block names
+    need not be valid array names.
+    """
+    sequencing_order, sequencing_repeats, patterns = compiled
+    blocks = list(patterns)
+    arrays: Dict[str, Any] = {
+        "blocks": np.array(blocks, dtype=str),
+        "sequencing_order": np.array(sequencing_order, dtype=str),
+        "sequencing_repeats": np.array(sequencing_repeats, dtype=np.int64),
+    }
+    for index, block in enumerate(blocks):
+        for port, (durations, levels) in patterns[block].items():
+            arrays[f"durations_{index}_{port}"] = durations
+            arrays[f"levels_{index}_{port}"] = levels
+    np.savez(path, **arrays)
+
+
+def load_pulse_streamer_patterns(path: Path) -> PulseStreamerPatterns:
+    """
+    Read patterns written by :func:`save_pulse_streamer_patterns`.
+
+    :rtype: PulseStreamerPatterns
+    """
+    with np.load(path) as arrays:
+        blocks = arrays["blocks"].tolist()
+        patterns: Dict[str, Dict[int, Tuple[np.ndarray, np.ndarray]]] = {
+            block: {} for block in blocks
+        }
+        for name in arrays.files:
+            if not name.startswith("durations_"):
+                continue
+            _, index, port = name.split("_")
+            patterns[blocks[int(index)]][int(port)] = (
+                arrays[name],
+                arrays[f"levels_{index}_{port}"],
+            )
+        return (
+            arrays["sequencing_order"].tolist(),
+            arrays["sequencing_repeats"].tolist(),
+            patterns,
+        )
+
+
+def compile_pulse_streamer_sequence(
+    yaml_file: Path, channel_mapping: Dict[str, Any]
+) -> Path:
+    """
+    :return: Path of the compiled sequencing order, sequencing repeats
+     and digital patterns per block (.npz), see
+     :func:`compile_pulse_streamer_patterns`.
+    :rtype: Path
+    """
+    cache = sequence_cache.get_sequence_cache()
+    key = cache.key(
+        yaml_file,
+        backend="PulseStreamer",
+        channel_mapping=channel_mapping,
+        pattern_format="arrays",
+    )
+    cached = cache.lookup(key, ".npz")
+    if cached is not None:
+        return cached
+    compiled = compile_pulse_streamer_patterns(yaml_file, channel_mapping)
+    return cache.store(
+        key, ".npz", lambda path: save_pulse_streamer_patterns(path, compiled)
+    )
+
+
+def compile_pulse_blaster_sequence(
+    yaml_file: Path, channel_mapping: Dict[str, Any]
+) -> Path:
+    """
+    :return: Path of the compiled channel bit masks and pulse durations
+     (.npz).
+    :rtype: Path
+    """
+    cache = sequence_cache.get_sequence_cache()
+    key = cache.key(
+        yaml_file,
+        backend="PulseBlaster",
+        channel_mapping=channel_mapping,
+        instruction_format="loops",
+    )
+    cached = cache.lookup(key, ".npz")
+    if cached is not None:
+        return cached
+    yaml_sequence_transpiler = PulseBlasterSequence(channel_mapping, yaml_file)
+    yaml_sequence_transpiler.parse_pulse_sequence_file()
+    (
+        channel_bit_mask,
+        pulse_duration_list,
+        instructions,
+        instruction_data,
+    ) = yaml_sequence_transpiler.compile()
+    return cache.store(
+        key,
+        ".npz",
+        lambda path: np.savez(
+            path,
+            channel_bit_mask=np.array(channel_bit_mask, dtype=np.int64),
+            pulse_duration_list=np.array(pulse_duration_list, dtype=np.float64),
+            instructions=np.array(instructions, dtype=np.int64),
+            instruction_data=np.array(instruction_data, dtype=np.int64),
+        ),
+    )
+
+
+class Synchroniser(ABC, ConfigurationMixin, SettleMixin):
     """Abstract Base Class for all synchronisers. All synchronisers implemented in QuPyt
     should inherit from this class. This helps ensure compliance with the
     synchroniser API.
@@ -114,21 +406,174 @@ class Synchroniser(ABC, ConfigurationMixin):
           Possible configuration values:
             - **address** (str): Address used to open a connection to the device.
               For VISA devices this could for example be: "TCPIP::<idaddress>::INSTR".
+            - **settle_policy** (str): How to wait after :meth:`run`. 'fixed'
+              (default), 'ready' or 'none'. See :mod:`qupyt.hardware.settle`.
+            - **settle_time** (float, s): Settle time of the 'fixed' policy.
+              Defaults to 0.1 s.
+            - **settle_timeout** (float, s): Longest wait of the 'ready' policy.
 
           Concrete sensor classes may have additional configuration values.
+
+    Attributes:
+        - **is_open** (bool): True between :meth:`ensure_open` and
+          :meth:`ensure_closed`.
+        - **connection_keys** (list[str]): Configuration keys identifying
+          the physical device. A cached synchroniser is only reused if these
+          match. See :class:`qupyt.hardware.device_handler.SynchroniserHandler`.
     """
 
     attribute_map: UpdateConfigurationType
+    connection_keys: List[str] = ["address"]
 
     def __init__(self) -> None:
         self.address: str
+        self.sequence_repeats: int = 1
+        self.is_open: bool = False
+        self._init_settle(0.1)
         self.attribute_map = {
             "address": self._set_address,
+            "settle_policy": self._set_settle_policy,
+            "settle_time": self._set_settle_time,
+            "settle_timeout": self._set_settle_timeout,
         }
 
     def _set_address(self, address: str) -> None:
         self.address = address
 
+    def set_sequence_repeats(self, sequence_repeats: int) -> None:
+        """
+        Play the pulse sequence this many times per :meth:`trigger`,
+        so the sensor can record several averages per trigger.
+        Takes effect with the next :meth:`load_sequence` and :meth:`run`.
+
+        :param sequence_repeats: Repetitions of the sequence per trigger.
+        :type sequence_repeats: int
+        """
+        if int(sequence_repeats) < 1:
+            raise ValueError(f"sequence_repeats must be at least 1, got {sequence_repeats}")
+        self.sequence_repeats = int(sequence_repeats)
+
+    def reconfigure(self, configuration: Dict[str, Any]) -> None:
+        """
+        Apply changed configuration values to the synchroniser, e.g. when
+        it is reused for the next measurement. They take effect on the
+        device with the next :meth:`ensure_open`.
+
+        :param configuration: Configuration values to change.
+        :type configuration: Dict[str, Any]
+        """
+        self._update_from_configuration(configuration)
+        self.is_open = False
+
+    def ensure_open(self) -> None:
+        """
+        :meth:`open` the synchroniser, unless it is already open.
+        """
+        if not self.is_open:
+            self.open()
+            self.is_open = True
+
+    def ensure_closed(self) -> None:
+        """
+        :meth:`close` the synchroniser, if it is open.
+        """
+        if self.is_open:
+            self.close()
+            self.is_open = False
+
+    def compile_job(
+        self, ps_yaml_file: Path
+    ) -> Optional[Tuple[Callable[..., Path], Tuple[Any, ...]]]:
+        """
+        Function and arguments that compile one pulse sequence into the
+        compiled sequence cache, see
+        :mod:`qupyt.pulse_sequences.sequence_cache`. Both have to be
+        picklable, as :meth:`precompile_sequences` runs them in worker
+        processes.
+
+        :return: (function, arguments), or None if the synchroniser
+         does not compile its sequences ahead of time.
+        """
+        return None
+
+    def precompile_sequences(
+        self, ps_yaml_files: List[Path], workers: Optional[int] = None
+    ) -> int:
+        """
+        Compile the pulse sequences of all steps in parallel before the
+        measurement starts, so :meth:`load_sequence` only has to upload
+        them from the compiled sequence cache.
+
+        :param ps_yaml_files: Pulse sequence file of every step.
+        :type ps_yaml_files: List[Path]
+        :param workers: Number of worker processes. Defaults to
+         PRECOMPILE_WORKERS, or to compiling in this process if the
+         sequence files are smaller than PRECOMPILE_IN_PROCESS_BYTES.
+         With one worker, the sequences are compiled in this process.
+        :type workers: Optional[int]
+        :return: Number of compiled sequences.
+        :rtype: int
+        """
+        jobs = []
+        size = 0
+        for ps_yaml_file in ps_yaml_files:
+            job = self.compile_job(ps_yaml_file)
+            if job is not None:
+                jobs.append(job)
+                size += (set_up.get_seq_dir() / ps_yaml_file).stat().st_size
+        if not jobs:
+            return 0
+        if workers is None:
+            workers = 1 if size < PRECOMPILE_IN_PROCESS_BYTES else PRECOMPILE_WORKERS
+        workers = min(workers, len(jobs))
+        time_1 = time()
+        if workers <= 1:
+            for function, args in jobs:
+                function(*args)
+        else:
+            cache = sequence_cache.get_sequence_cache()
+            # Workers do not share this process's state if they are
+            # spawned, they are pointed to the same cache explicitly.
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=sequence_cache.set_sequence_cache,
+                initargs=(cache.directory, cache.capacity),
+            ) as executor:
+                futures = [executor.submit(function, *args) for function, args in jobs]
+                for future in futures:
+                    future.result()
+        logging.info(
+            f"Precompiled {len(jobs)} pulse sequences in {time() - time_1} s".ljust(
+                65, "."
+            )
+            + "[done]"
+        )
+        return len(jobs)
+
+    def preload_sequences(self, ps_yaml_files: List[Path]) -> bool:
+        """
+        Upload the pulse sequences of all pulse sequence steps at once,
+        so :meth:`select_sequence` can switch between them without
+        reloading. Synchronisers that cannot hold several sequences
+        return False and are loaded step by step with :meth:`load_sequence`.
+
+        :param ps_yaml_files: Pulse sequence file of every step, in order.
+        :type ps_yaml_files: List[Path]
+        :return: True if the sequences were preloaded.
+        :rtype: bool
+        """
+        return False
+
+    def select_sequence(self, ps_step: int) -> None:
+        """
+        Switch to a sequence uploaded with :meth:`preload_sequences`.
+        Synchronisers that do not preload keep playing the sequence of
+        the last :meth:`load_sequence` call, there is nothing to switch.
+
+        :param ps_step: Index of the pulse sequence step.
+        :type ps_step: int
+        """
+
     @abstractmethod
     def load_sequence(self, ps_yaml_file: Path) -> None:
         """
@@ -177,11 +622,154 @@ class Synchroniser(ABC, ConfigurationMixin):
         """
 
 
+WAVEFORM_FORMATS = ["real", "integer"]
+
+
+def pack_integer_waveform(waveform: np.ndarray, dac_resolution: int) -> np.ndarray:
+    """
+    Pack the analog and marker rows of a waveform into the AWG's
+    native 16 bit integer format. The lower ``dac_resolution`` bits hold
+    the analog value, the bits above hold markers 1, 2, ... in order.
+
+    :param waveform: Array of shape [2, samples]. Row 0 is the analog
+     signal in [-1, 1], row 1 the marker byte with marker 1 to 4 in
+     bits 7 to 4.
+    :type waveform: np.ndarray
+    :param dac_resolution: DAC resolution in bits (12 to 16). Leaves
+     16 - dac_resolution bits for markers.
+    :type dac_resolution: int
+    :rtype: np.ndarray
+    :raises ValueError: If the waveform uses more markers than fit
+     next to the analog bits.
+    """
+    number_markers = min(16 - dac_resolution, 4)
+    markers = waveform[1].astype(np.uint16)
+    if np.any(markers & (0xF0 >> number_markers) & 0xF0):
+        raise ValueError(
+            f"A DAC resolution of {dac_resolution} bit leaves room for {number_markers} markers only."
+        )
+    full_scale = 2**dac_resolution - 1
+    packed: np.ndarray = np.rint((np.clip(waveform[0], -1.0, 1.0) + 1.0) * (full_scale / 2.0))
+    packed = packed.astype(np.uint16)
+    for marker in range(number_markers):
+        packed |= ((markers >> (7 - marker)) & 1) << (dac_resolution + marker)
+    return packed
+
+
+class WaveformCache:
+    """
+    Index of the waveforms resident in the AWG's waveform list,
+    keyed by a hash of their content.
+
+    Waveforms are kept in least recently used order. If a new waveform
+    does not fit into the memory budget, the least recently used ones are
+    evicted first. Waveforms needed by the sequence being loaded are
+    never evicted.
+
+    :param capacity: Memory budget in samples.
+    :type capacity: int
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = int(capacity)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[str, int]] = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """
+        Number of samples held by all resident waveforms.
+        """
+        return self._size
+
+    @staticmethod
+    def digest(waveform: np.ndarray) -> str:
+        """
+        :return: Content hash of a waveform.
+        :rtype: str
+        """
+        waveform = np.ascontiguousarray(waveform)
+        content = hashlib.sha1(f"{waveform.shape}{waveform.dtype}".encode("utf-8"))
+        content.update(waveform.tobytes())
+        return content.hexdigest()
+
+    def lookup(self, digest: str) -> Optional[str]:
+        """
+        :return: Name of the resident waveform with this content hash,
+         or None if it has to be uploaded.
+        :rtype: Optional[str]
+        """
+        if digest not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(digest)
+        return self._entries[digest][0]
+
+    def insert(self, digest: str, name: str, size: int, keep: Set[str]) -> List[str]:
+        """
+        Add an uploaded waveform to the index.
+
+        :param keep: Content hashes that must not be evicted.
+        :type keep: Set[str]
+        :return: Names of the evicted waveforms, which have to be
+         deleted from the AWG before the upload.
+        :rtype: List[str]
+        """
+        evicted = []
+        for old_digest in list(self._entries):
+            if self._size + size <= self.capacity:
+                break
+            if old_digest in keep:
+                continue
+            old_name, old_size = self._entries.pop(old_digest)
+            self._size -= old_size
+            evicted.append(old_name)
+        if self._size + size > self.capacity:
+            logging.warning(
+                "AWG waveform memory budget exceeded".ljust(65, ".") + "[warning]"
+            )
+        self._entries[digest] = (name, int(size))
+        self._size += int(size)
+        return evicted
+
+    def clear(self) -> None:
+        """
+        Forget all resident waveforms.
+        """
+        self._entries.clear()
+        self._size = 0
+
+
 class AWGenerator(VisaObject, Synchroniser):
     """
     Synchroniser implementation for the Tektronix AWG 5000 series.
+
+    Uploaded waveforms stay in the AWG's waveform list between sequences.
+    Waveforms are identified by their content, so only blocks that changed
+    since earlier sequences are uploaded.
+
+    Possible configuration values (in addition to :class:`Synchroniser`):
+        - **device_type** (str): 'TekAWG'.
+        - **sampling_rate** (float, S/s)
+        - **channels** (list[int]): Analog channels used.
+        - **waveform_memory** (int): Samples the waveform list may hold before
+          least recently used waveforms are deleted. Defaults to 2e9.
+        - **dac_resolution** (int): DAC resolution in bits. Defaults to 12.
+        - **waveform_format** (str): 'real' (default) sends the analog signal
+          as float32 and the markers in a second transfer. 'integer' packs
+          both into the AWG's 16 bit integer format
+          (see :func:`pack_integer_waveform`), which is 2.5 times less
+          data and one transfer per waveform.
     """
 
+    connection_keys = ["address", "device_type"]
+
     def __init__(
         self, configuration: Dict[str, Any], channel_mapping: Dict[str, Any]
     ) -> None:
@@ -192,17 +780,24 @@ class AWGenerator(VisaObject, Synchroniser):
 
         self.wavenames: list[str]
         self.seqrepeats: list[int]
-        self.waveform_block: np.ndarray
+        self.waveform_block: PulseRecords
         self.analog_amplitude: float = 1.0
         self.marker_amplitude: float = 1.75
         self.dac_resolution: int = 12
+        self.waveform_format: str = "real"
         self.channels: list[int] = [1, 2]
         self.marker_channels: list[int] = [1, 2, 3, 4]
+        self._applied_settings: Dict[Tuple[Any, ...], Any] = {}
+        self.waveform_cache = WaveformCache(int(2e9))
+        self.waveform_names: Dict[Tuple[str, int], str] = {}
 
         Synchroniser.__init__(self)
         self.attribute_map["device_type"] = self._set_device_type
         self.attribute_map["sampling_rate"] = self._set_sampling_rate_attribute
         self.attribute_map["channels"] = self._set_channels_attribute
+        self.attribute_map["waveform_memory"] = self._set_waveform_memory
+        self.attribute_map["dac_resolution"] = self._set_dac_resolution_attribute
+        self.attribute_map["waveform_format"] = self._set_waveform_format
         if configuration is not None:
             self._update_from_configuration(configuration)
         VisaObject.__init__(self, self.address, self.device_type)
@@ -216,139 +811,240 @@ class AWGenerator(VisaObject, Synchroniser):
         ]
 
     def open(self) -> None:
+        # The device may have been reset or used by others while
+        # closed, forget what was applied and uploaded before.
+        self._applied_settings = {}
+        self.waveform_cache.clear()
         self._configure()
 
     def close(self) -> None:
         """Passing"""
 
     def run(self) -> None:
-        self.instance.write("awgcontrol:run:immediate")
+        self.write("awgcontrol:run:immediate")
         logging.info("Turned on AWG output to RUN immediate".ljust(
             65, ".") + "[done]")
         self.opc_wait()
 
     def stop(self) -> None:
-        self.instance.write("awgcontrol:stop:immediate")
+        self.write("awgcontrol:stop:immediate")
         logging.info("Turned on AWG output to STOP immediate".ljust(
             65, ".") + "[done]")
         self.opc_wait()
 
     def trigger(self) -> None:
-        self.instance.write("trigger:immediate atrigger")
+        self.write("trigger:immediate atrigger")
         logging.info("Sent trigger to AWG".ljust(65, ".") + "[done]")
 
     def load_sequence(self, ps_yaml_file: str = "sequence_0.yaml") -> None:
-        self.stop()
-        self._clear_awg()
-        sequence_translator = PulseSequenceYaml(
-            self.channel_mapping, self.channels, samprate=self.samprate, yaml_file = ps_yaml_file)
-        sequence_translator.translate_yaml_to_numeric_instructions()
-        self._load_sequence_block(get_seq_dir() / "sequence.npz")
-        self._upload_waveforms()
-        self._sequence("autoseq", nongatereps=1)
+        with self.batch():
+            self.stop()
+            self._clear_sequences()
+            compile_sequence, args = self.compile_job(Path(ps_yaml_file))
+            self._load_sequence_block(compile_sequence(*args))
+            self._upload_waveforms()
+            self._sequence("autoseq", nongatereps=self.sequence_repeats)
+            logging.info(
+                "Loaded and sequenced current pulse sequence".ljust(
+                    65, ".") + "[done]"
+            )
+            self.opc_wait()
+
+    def compile_job(
+        self, ps_yaml_file: Path
+    ) -> Tuple[Callable[..., Path], Tuple[Any, ...]]:
+        return compile_awg_sequence, (
+            ps_yaml_file,
+            self.channel_mapping,
+            self.channels,
+            self.samprate,
+        )
+
+    def preload_sequences(self, ps_yaml_files: List[Path]) -> bool:
+        """
+        Uploads the waveforms of every step and builds one named sequence
+        per step (prefix ``ps<i>_``). Steps are then switched by assigning
+        the step's sequence to the channels (casset).
+        """
+        time_1 = time()
+        with self.batch():
+            self.stop()
+            self._clear_sequences()
+            # Waveforms of earlier steps must stay resident.
+            keep: Set[str] = set()
+            for ps_step, ps_yaml_file in enumerate(ps_yaml_files):
+                compile_sequence, args = self.compile_job(ps_yaml_file)
+                self._load_sequence_block(compile_sequence(*args))
+                prefix = f"ps{ps_step}_"
+                self._upload_waveforms(keep)
+                self._sequence(
+                    f"{prefix}autoseq",
+                    nongatereps=self.sequence_repeats,
+                    prefix=prefix,
+                    assign=False,
+                )
         logging.info(
-            "Loaded and sequenced current pulse sequence".ljust(
-                65, ".") + "[done]"
+            f"Preloaded {len(ps_yaml_files)} pulse sequences in {time() - time_1} s".ljust(
+                65, "."
+            )
+            + "[done]"
+        )
+        return True
+
+    def select_sequence(self, ps_step: int) -> None:
+        with self.batch():
+            for channel in self.channels:
+                self.write(
+                    f'source{channel}:casset:sequence "ps{ps_step}_autoseq_{channel}",1'
+                )
+            self.opc_wait()
+        logging.info(
+            f"Selected preloaded sequence of step {ps_step}".ljust(65, ".") + "[done]"
         )
-        self.opc_wait()
 
     def _configure(self) -> None:
-        self._set_sampling_rate()
-        for channel in self.channels:
-            self._set_daq_resolution(channel, self.dac_resolution)
-            self._set_analog_amplitude(channel, self.analog_amplitude)
-            self._set_output_on(channel)
-            for marker in self.marker_channels:
-                self._set_marker_amplitude(
-                    channel, marker, self.marker_amplitude)
-        print("\nConfiguring AWG".ljust(65, ".") + colored(" [done]", "green"))
+        with self.batch():
+            # Only settings that changed since the last call are sent.
+            self._apply_setting(("sampling_rate",), self.samprate, self._set_sampling_rate)
+            for channel in self.channels:
+                self._apply_setting(
+                    ("dac_resolution", channel),
+                    self.dac_resolution,
+                    self._set_daq_resolution,
+                    channel,
+                    self.dac_resolution,
+                )
+                self._apply_setting(
+                    ("analog_amplitude", channel),
+                    self.analog_amplitude,
+                    self._set_analog_amplitude,
+                    channel,
+                    self.analog_amplitude,
+                )
+                self._apply_setting(("output", channel), True, self._set_output_on, channel)
+                for marker in self.marker_channels:
+                    self._apply_setting(
+                        ("marker_amplitude", channel, marker),
+                        self.marker_amplitude,
+                        self._set_marker_amplitude,
+                        channel,
+                        marker,
+                        self.marker_amplitude,
+                    )
+            print("\nConfiguring AWG".ljust(65, ".") + colored(" [done]", "green"))
+
+    def _apply_setting(
+        self, key: Tuple[Any, ...], value: Any, setter: Any, *args: Any
+    ) -> None:
+        if key in self._applied_settings and self._applied_settings[key] == value:
+            return
+        setter(*args)
+        self._applied_settings[key] = value
+
+    def _encode_waveform(self, waveform: np.ndarray) -> np.ndarray:
+        if self.waveform_format == "integer":
+            return pack_integer_waveform(waveform, self.dac_resolution)
+        return waveform
 
     def _upload_waveform(self, wavename: str, waveform: np.ndarray) -> None:
-        self.instance.write('wlist:waveform:delete "' + wavename + '"')
-        self.instance.write(
+        """
+        :param waveform: Waveform as returned by :meth:`_encode_waveform`.
+        """
+        self.write('wlist:waveform:delete "' + wavename + '"')
+        self.write(
             'wlist:waveform:new "' + wavename +
-            '",' + str(waveform.shape[1]) + ",real"
-        )
-        self.instance.write_binary_values(
-            'wlist:waveform:data "' + wavename + '",', waveform[0, :]
-        )
-        self.instance.write_binary_values(
-            'wlist:waveform:marker:data "' + wavename + '",',
-            waveform.astype(np.uint8)[1, :],
-            datatype="B",
+            '",' + str(waveform.shape[-1]) + "," + self.waveform_format
         )
+        if self.waveform_format == "integer":
+            self.write_binary_values(
+                'wlist:waveform:data "' + wavename + '",', waveform, datatype="H"
+            )
+        else:
+            self.write_binary_values(
+                'wlist:waveform:data "' + wavename + '",', waveform[0, :]
+            )
+            self.write_binary_values(
+                'wlist:waveform:marker:data "' + wavename + '",',
+                waveform.astype(np.uint8)[1, :],
+                datatype="B",
+            )
         logging.info(f"Uploaded waveform {wavename}".ljust(65, ".") + "[done]")
         self.opc_wait()
 
-    def _sequence(self, seqname: str, nongatereps: int = 1) -> None:
-        print("Setting up sequencer".ljust(65, "."), end="")
-        for channel in self.channels:
-            self.instance.write(f'slist:sequence:delete "sub_{channel}"')
-            self.instance.write(
-                f'slist:sequence:new "sub_{channel}",{len(self.wavenames)},1'
-            )
-            self.instance.write(
-                f'slist:sequence:event:jtiming "sub_{channel}" immediate'
-            )
-            for i, wavename in enumerate(self.wavenames):
-                self.instance.write(
-                    f'slist:sequence:step{i+1}:rcount "sub_{channel}",{self.seqrepeats[i]}'
+    def _sequence(
+        self, seqname: str, nongatereps: int = 1, prefix: str = "", assign: bool = True
+    ) -> None:
+        with self.batch():
+            print("Setting up sequencer".ljust(65, "."), end="")
+            for channel in self.channels:
+                subname = f"{prefix}sub_{channel}"
+                self.write(f'slist:sequence:delete "{subname}"')
+                self.write(
+                    f'slist:sequence:new "{subname}",{len(self.wavenames)},1'
                 )
-                self.instance.write(
-                    f'slist:sequence:step{i+1}:tasset1:waveform "sub_{channel}","{wavename}_{channel}"'
+                self.write(
+                    f'slist:sequence:event:jtiming "{subname}" immediate'
                 )
+                for i, wavename in enumerate(self.wavenames):
+                    self.write(
+                        f'slist:sequence:step{i+1}:rcount "{subname}",{self.seqrepeats[i]}'
+                    )
+                    self.write(
+                        f'slist:sequence:step{i+1}:tasset1:waveform "{subname}","{self.waveform_names[(wavename, channel)]}"'
+                    )
 
-                for flag_channel in self.flag_channels:
-                    if flag_channel in self.flag_values[wavename]:
-                        self.instance.write(
-                            f'slist:sequence:step{i+1}:tflag1:{flag_channel}flag "sub_{channel}",HIGH'
-                        )
-                    else:
-                        self.instance.write(
-                            f'slist:sequence:step{i+1}:tflag1:{flag_channel}flag "sub_{channel}",LOW'
-                        )
-
-            self.instance.write(f'slist:sequence:delete "{seqname}_{channel}"')
-            self.instance.write(
-                f'slist:sequence:new "{seqname}_{channel}",2,1')
-            self.instance.write(
-                f'slist:sequence:step2:goto "{seqname}_{channel}",first'
-            )
-            self.instance.write(
-                f'slist:sequence:event:jtiming "{seqname}_{channel}" immediate'
-            )
+                    for flag_channel in self.flag_channels:
+                        if flag_channel in self.flag_values[wavename]:
+                            self.write(
+                                f'slist:sequence:step{i+1}:tflag1:{flag_channel}flag "{subname}",HIGH'
+                            )
+                        else:
+                            self.write(
+                                f'slist:sequence:step{i+1}:tflag1:{flag_channel}flag "{subname}",LOW'
+                            )
+
+                self.write(f'slist:sequence:delete "{seqname}_{channel}"')
+                self.write(
+                    f'slist:sequence:new "{seqname}_{channel}",2,1')
+                self.write(
+                    f'slist:sequence:step2:goto "{seqname}_{channel}",first'
+                )
+                self.write(
+                    f'slist:sequence:event:jtiming "{seqname}_{channel}" immediate'
+                )
 
-            # for gating pulse
-            self.instance.write(
-                f'slist:sequence:step1:goto "{seqname}_{channel}", first'
-            )
-            self.instance.write(
-                f'slist:sequence:step1:ejinput "{seqname}_{channel}", ATR'
-            )
-            self.instance.write(
-                f'slist:sequence:step1:ejump "{seqname}_{channel}", 2'
-            )
-            self.instance.write(
-                f'slist:sequence:step1:tasset1:waveform "{seqname}_{channel}","{self.wavenames[0]}_{channel}"'
-            )
+                # for gating pulse
+                self.write(
+                    f'slist:sequence:step1:goto "{seqname}_{channel}", first'
+                )
+                self.write(
+                    f'slist:sequence:step1:ejinput "{seqname}_{channel}", ATR'
+                )
+                self.write(
+                    f'slist:sequence:step1:ejump "{seqname}_{channel}", 2'
+                )
+                self.write(
+                    f'slist:sequence:step1:tasset1:waveform "{seqname}_{channel}","{self.waveform_names[(self.wavenames[0], channel)]}"'
+                )
 
-            # for actual seq
-            self.instance.write(
-                f'slist:sequence:step2:rcount "{seqname}_{channel}", {nongatereps}'
-            )
-            self.instance.write(
-                f'slist:sequence:step2:tasset1:sequence "{seqname}_{channel}","sub_{channel}"'
-            )
+                # for actual seq
+                self.write(
+                    f'slist:sequence:step2:rcount "{seqname}_{channel}", {nongatereps}'
+                )
+                self.write(
+                    f'slist:sequence:step2:tasset1:sequence "{seqname}_{channel}","{subname}"'
+                )
 
-            self.instance.write(
-                f'source{channel}:casset:sequence "{seqname}_{channel}",1'
-            )
-        self.opc_wait()
-        print(colored(" [done]", "green"))
+                if assign:
+                    self.write(
+                        f'source{channel}:casset:sequence "{seqname}_{channel}",1'
+                    )
+            self.opc_wait()
+            print(colored(" [done]", "green"))
 
     def _load_sequence_block(self, seqname: Path) -> None:
         block = np.load(seqname)
-        self.waveform_block = block["arr_0"]
+        self.waveform_block = PulseRecords.from_npz(block)
         self.seqrepeats = list(block["arr_1"])
         self.wavenames = list(block["arr_2"])
         self.flag_values = pickle.loads(block["arr_5"])
@@ -356,55 +1052,87 @@ class AWGenerator(VisaObject, Synchroniser):
             65, ".") + f"{seqname}")
 
     def _clear_awg(self) -> None:
-        self.instance.write("slist:sequence:delete all")
-        self.instance.write("wlist:waveform:delete all")
+        self.write("slist:sequence:delete all")
+        self.write("wlist:waveform:delete all")
+        self.waveform_cache.clear()
         logging.info("Clear all AWG slist and wlist".ljust(65, ".") + "[done]")
         self.opc_wait()
 
-    def _upload_waveforms(self) -> None:
-        time_1 = time()
-        sorted_wavenames = sorted(set(self.wavenames))
-        for i, wavename in tqdm(
-            enumerate(sorted_wavenames),
-            total=len(sorted_wavenames),
-            ascii=True,
-            desc="uploading waveforms",
-        ):
-            for channel_index, channel in enumerate(self.channels):
-                self._upload_waveform(
-                    f"{wavename}_{channel}",
-                    self.waveform_block[i, channel_index *
-                                        2: (channel_index * 2) + 2],
+    def _clear_sequences(self) -> None:
+        if len(self.waveform_cache) == 0:
+            # Nothing known about the waveform list yet, start from scratch.
+            self._clear_awg()
+            return
+        self.write("slist:sequence:delete all")
+        logging.info("Clear all AWG slist".ljust(65, ".") + "[done]")
+        self.opc_wait()
+
+    def _upload_waveforms(self, keep: Optional[Set[str]] = None) -> None:
+        """
+        Upload the waveforms of the loaded sequence block that are not
+        resident in the AWG yet and fill :attr:`waveform_names`.
+
+        :param keep: Content hashes that must not be evicted. The hashes
+         of this block are added to it.
+        :type keep: Optional[Set[str]]
+        """
+        with self.batch():
+            time_1 = time()
+            keep = set() if keep is None else keep
+            hits, misses = self.waveform_cache.hits, self.waveform_cache.misses
+            self.waveform_names = {}
+            sorted_wavenames = sorted(set(self.wavenames))
+            for i, wavename in tqdm(
+                enumerate(sorted_wavenames),
+                total=len(sorted_wavenames),
+                ascii=True,
+                desc="uploading waveforms",
+            ):
+                for channel_index, channel in enumerate(self.channels):
+                    waveform = self._encode_waveform(
+                        self.waveform_block.render(i, channel_index)
+                    )
+                    digest = WaveformCache.digest(waveform)
+                    keep.add(digest)
+                    name = self.waveform_cache.lookup(digest)
+                    if name is None:
+                        name = f"wf_{digest[:20]}"
+                        for evicted in self.waveform_cache.insert(
+                            digest, name, waveform.shape[-1], keep
+                        ):
+                            self.write(f'wlist:waveform:delete "{evicted}"')
+                        self._upload_waveform(name, waveform)
+                        self.opc_wait()
+                    self.waveform_names[(wavename, channel)] = name
+            logging.info(
+                f"Uploaded {self.waveform_cache.misses - misses} Tektronix AWG waveforms, "
+                f"reused {self.waveform_cache.hits - hits}, in {time() - time_1} seconds".ljust(
+                    65, "."
                 )
-                self.opc_wait()
-        logging.info(
-            f"Uploaded Tektronix AWG waveforms in {time() - time_1} seconds".ljust(
-                65, "."
+                + "[done]"
             )
-            + "[done]"
-        )
 
     def _set_output_on(self, channel: int) -> None:
-        self.instance.write(f"outp{channel} on")
+        self.write(f"outp{channel} on")
         logging.info(f"Set channel{channel} output to on".ljust(
             65, ".") + "[done]")
 
     def _set_daq_resolution(self, channel: int, dac_resolution: int) -> None:
-        self.instance.write(f"source{channel}:dac:resolution {dac_resolution}")
+        self.write(f"source{channel}:dac:resolution {dac_resolution}")
         logging.info(
             f"Set AWG channel{channel} resolution to bit".ljust(65, ".")
             + "{dac_resolution}"
         )
 
     def _set_sampling_rate(self) -> None:
-        self.instance.write(f"source:frequency {self.samprate}")
+        self.write(f"source:frequency {self.samprate}")
         logging.info("AWG sampling rate".ljust(65, ".") + f"{self.samprate}")
         self.opc_wait()
 
     def _set_marker_amplitude(
         self, channel: int, marker: int, voltage: float = 1.75
     ) -> None:
-        self.instance.write(
+        self.write(
             f"SOURCE{channel}:MARKER{marker}:VOLTAGE:LEVEL:IMMEDIATE:HIGH {voltage}"
         )
         self.opc_wait()
@@ -415,7 +1143,7 @@ class AWGenerator(VisaObject, Synchroniser):
 
     def _set_analog_amplitude(self, channel: int, amplitude: float = 1.0) -> None:
         # amplitude is given in fractions of the max amplitude.
-        self.instance.write(
+        self.write(
             f"source{channel}:voltage:level:immediate:amplitude {amplitude}"
         )
         self.opc_wait()
@@ -433,6 +1161,19 @@ class AWGenerator(VisaObject, Synchroniser):
     def _set_channels_attribute(self, channels: list[int]) -> None:
         self.channels = channels
 
+    def _set_waveform_memory(self, waveform_memory: int) -> None:
+        self.waveform_cache.capacity = int(float(waveform_memory))
+
+    def _set_dac_resolution_attribute(self, dac_resolution: int) -> None:
+        if int(dac_resolution) not in range(12, 17):
+            raise ConfigurationError("dac_resolution", dac_resolution, list(range(12, 17)))
+        self.dac_resolution = int(dac_resolution)
+
+    def _set_waveform_format(self, waveform_format: str) -> None:
+        if waveform_format not in WAVEFORM_FORMATS:
+            raise ConfigurationError("waveform_format", waveform_format, WAVEFORM_FORMATS)
+        self.waveform_format = waveform_format
+
     def plot_waveform(self, wavename: str) -> None:
         """
         Convenience function to query and plot the values that were previously
@@ -474,6 +1215,8 @@ class PStreamer(Synchroniser):
     ) -> None:
         super().__init__()
         self.channel_mapping = channel_mapping
+        # pulsestreamer.Sequence, built by _build_sequence when streamed.
+        self.sequence: Any = None
         self._update_from_configuration(configuration)
         self.initial_configuration_dict = configuration
         if configuration["address"] == "None":
@@ -558,130 +1301,12 @@ class PStreamer(Synchroniser):
                 + "[done]"
             )
 
-    def writeDigSeq(self, channel_key: str) -> List[Tuple[int, int]]:
-        """
-        Parameters
-        ----------
-        channel_key : str
-            channel_key of the pulse to be written (LASER, MW or READ)
-
-        Recieves a dictionary of pulses and returns sequence for the
-        PulseStreamer of the given channel: LASER, MW or READ.
-        """
-        self.channel_key = channel_key
-        self.seq = []  # sequence of the channel
-        pointer_i = 0  # pointer in time
-        # Check if the asked channel_key exists in the file
-        if self.channel_key not in list(self.pulse_list.keys()):
-            logging.error("KeyError: No element named " +
-                          str(self.channel_key) + ".")
-            raise KeyError
-
-        for i in range(len(self.pulse_list[self.channel_key])):
-            # Start and length of the pulse turned into
-            # float in case it has str format.
-            start_pulse_i = (
-                float(
-                    self.pulse_list.get(self.channel_key)
-                    .get("pulse" + str(i + 1))
-                    .get("start")
-                )
-                * 1e3
-            )
-            len_pulse_i = (
-                float(
-                    self.pulse_list.get(self.channel_key)
-                    .get("pulse" + str(i + 1))
-                    .get("duration")
-                )
-                * 1e3
-            )
-            # Check if pulses are well defined
-            if pointer_i > start_pulse_i:
-                logging.error(
-                    "Error: "
-                    + self.channel_key
-                    + " sequence definition makes no sense, pulses are overlaping!"
-                )
-                raise PulseSequenceError
-
-            # Check for unsupported analog signals
-            freq_pulse_i = (
-                self.pulse_list.get(self.channel_key)
-                .get("pulse" + str(i + 1))
-                .get("frequency")
-            )
-            if freq_pulse_i != 0:
-                logging.warning(
-                    "Warning: Frequency different than 0. This programm does not support analog signals. Set frequency to 0."
-                )
-                raise PulseSequenceError
-
-            ampl_pulse_i = (
-                self.pulse_list.get(self.channel_key)
-                .get("pulse" + str(i + 1))
-                .get("amplitude")
-            )
-            if ampl_pulse_i != 1 or ampl_pulse_i is None:
-                logging.warning(
-                    "Warning: Amplitude of the pulse different than 1 (can only be 0 or 1). This programm does not support analog signals. Set amplitude to 1."
-                )
-                raise PulseSequenceError
-
-            phase_pulse_i = (
-                self.pulse_list.get(self.channel_key)
-                .get("pulse" + str(i + 1))
-                .get("phase")
-            )
-            if phase_pulse_i != 0:
-                logging.warning(
-                    "Warning: Phase of the pulse different than 0. This programm does not support analog signals. Set amplitude to 1."
-                )
-                raise PulseSequenceError
-
-            # Check for non-multples of the sampling time.
-            if (start_pulse_i - round(start_pulse_i) != 0) or (
-                len_pulse_i - round(len_pulse_i) != 0
-            ):
-                logging.warning(
-                    "Warning: Sampling unit is 1ns. Time values are being rounded."
-                )
-                # Round the values and turn into integers
-                start_pulse_i = int(round(start_pulse_i))
-                len_pulse_i = int(round(len_pulse_i))
-                # Append a low and a high for each pulse: ___----
-                self.seq.append((start_pulse_i - pointer_i, 0))
-                self.seq.append((len_pulse_i, 1))
-                # Update pointer
-                pointer_i = start_pulse_i + len_pulse_i
-
-            else:
-                # Turn into integers
-                start_pulse_i = int(start_pulse_i)
-                len_pulse_i = int(len_pulse_i)
-                # Append a low and a high for each pulse: ___----
-                self.seq.append((start_pulse_i - pointer_i, 0))
-                self.seq.append((len_pulse_i, 1))
-                # Update pointer
-                pointer_i = start_pulse_i + len_pulse_i
-
-        # Check if the sequence is longer than the defined total time.
-        if pointer_i > self.total_duration and self.total_duration_unparsed != "ignore":
-            logging.error(
-                f"Error: {self.channel_key} duration exceeds the defined total time."
-            )
-            raise PulseSequenceError
-        # Add the final low to make the sequence last its length
-        if self.total_duration_unparsed != "ignore":
-            self.seq.append((self.total_duration - pointer_i, 0))
-        return self.seq
-
     def plot_sequence(self) -> None:
         """
         From the given file plots the defined sequences
         """
         # check if the sequence has been loaded.
-        if self.pulser.isStreaming() is True:
+        if self.pulser.isStreaming() is True and self.sequence is not None:
             self.sequence.plot()
         else:
             print(
@@ -690,60 +1315,65 @@ class PStreamer(Synchroniser):
 
     def load_sequence(self, ps_yaml_file: str = "sequence_0.yaml") -> None:
         """
-        Calls the WriteDigSig() function and loads the corresponding sequences
-        to the respective channels.
+        Loads the (duration, level) patterns of all blocks of the
+        sequence, see :func:`compile_pulse_streamer_patterns`. The Pulse Streamer sequence
+        itself is only built when it is streamed.
         """
         try:
             # Selected folder:
             self.yaml_file = set_up.get_seq_dir() / ps_yaml_file
-            with open(self.yaml_file, "r", encoding="utf-8") as file:
-                full_pulse_list = yaml.load(file, Loader=yaml.FullLoader)
-            sequence_order = full_pulse_list["sequencing_order"]
-            sequencing_repeats = full_pulse_list["sequencing_repeats"]
-
-            total_duration_unparsed = full_pulse_list["total_duration"]
-            self.total_duration_unparsed = total_duration_unparsed
-            if total_duration_unparsed == "ignore":
-                self.total_duration = np.inf
-            if total_duration_unparsed != "ignore":
-                total_duration = float(
-                    total_duration_unparsed) * 1e3  # convert to ns
-                if total_duration - round(total_duration) != 0:
-                    logging.warning(
-                        "Warning: The total duration is not multiple of the\
-                                sampling time and is being rounded!".ljust(
-                            65, "."
-                        )
-                        + "[WARNING]"
-                    )
-                    self.total_duration = int(round(total_duration))
-                else:
-                    self.total_duration = int(total_duration)
-
-            # Generate Sequence objects for all pulseseqeunce blocks.
-            # These will be sequenced together later.
-            sequences_to_write = {}
-            for block in set(sequence_order):
-                sequences_to_write[block] = Sequence()
-                self.pulse_list = full_pulse_list[block]
-                self.check_types(self.pulse_list)
-                for channel in self.pulse_list:
-                    sequences_to_write[block].setDigital(
-                        self.channel_mapping[channel], self.writeDigSeq(
-                            channel)
-                    )
-            self.sequence = Sequence()
-            for block, repetitions in zip(sequence_order, sequencing_repeats):
-                self.sequence += repetitions * sequences_to_write[block]
+            # Blocks and their repeats stay separate until the
+            # sequence is streamed, see _build_sequence.
+            self.compiled_patterns = load_pulse_streamer_patterns(
+                compile_pulse_streamer_sequence(self.yaml_file, self.channel_mapping)
+            )
+            self.sequence = None
 
         except AttributeError:
             logging.exception("pulseseqeunce upload failed")
 
-    def check_types(self, pulse_list) -> None:
-        for channel in pulse_list:
-            for pulse, pulse_params in pulse_list[channel].items():
-                for par, par_value in pulse_params.items():
-                    pulse_list[channel][pulse][par] = float(par_value)
+    def compile_job(
+        self, ps_yaml_file: Path
+    ) -> Tuple[Callable[..., Path], Tuple[Any, ...]]:
+        return compile_pulse_streamer_sequence, (
+            set_up.get_seq_dir() / ps_yaml_file,
+            self.channel_mapping,
+        )
+
+    def _build_sequence(self) -> Any:
+        """
+        Unroll the compiled patterns into one Pulse Streamer sequence.
+        Each channel is tiled and concatenated over all blocks at once,
+        instead of concatenating one Sequence per block repetition.
+
+        :rtype: Sequence
+        """
+        time_1 = time()
+        sequence_order, sequencing_repeats, patterns = self.compiled_patterns
+        sequence = Sequence()
+        steps = 0
+        for channel in patterns[sequence_order[0]]:
+            durations = np.concatenate(
+                [
+                    np.tile(patterns[block][channel][0], repetitions)
+                    for block, repetitions in zip(sequence_order, sequencing_repeats)
+                ]
+            )
+            levels = np.concatenate(
+                [
+                    np.tile(patterns[block][channel][1], repetitions)
+                    for block, repetitions in zip(sequence_order, sequencing_repeats)
+                ]
+            )
+            sequence.setDigital(channel, (durations, levels))
+            steps += len(durations)
+        logging.info(
+            f"Pulse Streamer sequence of {steps} steps built in {time() - time_1} s".ljust(
+                65, "."
+            )
+            + "[done]"
+        )
+        return sequence
 
     def run(self) -> None:
         """
@@ -752,8 +1382,8 @@ class PStreamer(Synchroniser):
         For now pass, write it later.
         """
         try:
-            # never runs the seq
-            n_runs = 1
+            # Plays the sequence sequence_repeats times per trigger.
+            n_runs = self.sequence_repeats
 
             # reset the device - all outputs 0V
             self.pulser.reset()
@@ -767,6 +1397,8 @@ class PStreamer(Synchroniser):
             self.pulser.setTrigger(start=start, rearm=rearm)
 
             # upload the sequence and arm the device
+            if self.sequence is None:
+                self.sequence = self._build_sequence()
             self.pulser.stream(self.sequence, n_runs, final)
             while self.pulser.isStreaming():
                 pass
@@ -843,12 +1475,27 @@ class MockGenerator(Synchroniser):
                 "Caught attribute error when writing loading from yaml pulse sequence"
             )
 
+    def preload_sequences(self, ps_yaml_files: List[Path]) -> bool:
+        self.preloaded_durations = []
+        for ps_yaml_file in ps_yaml_files:
+            self.load_sequence(str(ps_yaml_file))
+            self.preloaded_durations.append(self.total_duration)
+        return True
+
+    def select_sequence(self, ps_step: int) -> None:
+        self.total_duration = self.preloaded_durations[ps_step]
+        logging.info(
+            f"Selected preloaded sequence {ps_step} on MockSynchroniser".ljust(65, ".")
+            + "[done]"
+        )
+
     def run(self) -> None:
         logging.info("Sent run to MockSynchroniser".ljust(65, ".") + "[done]")
 
     def trigger(self) -> None:
-        logging.info("Sent trigger from MockSynchroniser".ljust(
-            65, ".") + "[done]")
+        logging.info(
+            f"Sent trigger from MockSynchroniser ({self.sequence_repeats} repeats)".ljust(
+                65, ".") + "[done]")
 
     def stop(self) -> None:
         logging.info("Stopped MockSynchroniser".ljust(65, ".") + "[done]")
@@ -948,10 +1595,19 @@ class PulseBlaster(Synchroniser):
         self.configure_pb()
 
     def load_sequence(self, ps_yaml_file: str = "sequence_0.yaml") -> None:
-        yaml_sequence_transpiler = PulseBlasterSequence(self.channel_mapping, ps_yaml_file)
-        yaml_sequence_transpiler.parse_pulse_sequence_file()
-        channel_bit_mask, pulse_duration_list = yaml_sequence_transpiler.compile()
-        self.program_pb(channel_bit_mask, pulse_duration_list)
+        cached = compile_pulse_blaster_sequence(Path(ps_yaml_file), self.channel_mapping)
+        instructions = np.load(cached)
+        self.program_pb(
+            instructions["channel_bit_mask"].tolist(),
+            instructions["pulse_duration_list"].tolist(),
+            instructions["instructions"].tolist(),
+            instructions["instruction_data"].tolist(),
+        )
+
+    def compile_job(
+        self, ps_yaml_file: Path
+    ) -> Tuple[Callable[..., Path], Tuple[Any, ...]]:
+        return compile_pulse_blaster_sequence, (ps_yaml_file, self.channel_mapping)
 
     def close(self) -> None:
         """
@@ -1052,14 +1708,30 @@ class PulseBlaster(Synchroniser):
         return pulse_duration
 
     def program_pb(
-        self, channel_bit_masks: List[int], pulse_duration_list: List[float]
+        self,
+        channel_bit_masks: List[int],
+        pulse_duration_list: List[float],
+        instructions: Optional[List[int]] = None,
+        instruction_data: Optional[List[int]] = None,
     ) -> None:
         """
         Program the PB pulse program memory by sending instructions
         for each channel bit mask and corresponding pulse duration.
         Channel bit mask can be a decimal, hexadecimal or binary.
+
+        Instructions and their data are given as returned by
+        :meth:`qupyt.pulse_sequences.SequenceDesigner.PulseBlasterSequence.compile`,
+        with END_LOOP and BRANCH targets relative to the first instruction.
+        Without them, all instructions CONTINUE and the last one
+        branches back to the start.
         """
+        if instructions is None or instruction_data is None:
+            instructions = [spapi.Inst.CONTINUE] * len(channel_bit_masks)
+            instructions[-1] = spapi.Inst.BRANCH
+            instruction_data = [0] * len(channel_bit_masks)
         self.start_programming()
+        # Programming starts at instruction 0.
+        start_instr_num = 0
 
         # Send instructions to the pulse program
         # Instruction format:
@@ -1114,30 +1786,19 @@ class PulseBlaster(Synchroniser):
             t_min = 1
 
             # Instructions for pulse sequence
+            data = instruction_data[i]
+            if instructions[i] in (spapi.END_LOOP, spapi.BRANCH):
+                # Relative to the first instruction of the program.
+                data += start_instr_num
+            status = spapi.pb_inst_pbonly(
+                channel_bit_mask,
+                instructions[i],
+                data,
+                pulse_duration * t_min * spapi.us,
+            )
+            self.error_catcher(status)
             if i == 0:
-                start_instr_num = spapi.pb_inst_pbonly(
-                    channel_bit_mask,
-                    spapi.Inst.CONTINUE,
-                    0,
-                    pulse_duration * t_min * spapi.us,
-                )
-                self.error_catcher(start_instr_num)
-            elif i != len(channel_bit_masks) - 1:
-                status = spapi.pb_inst_pbonly(
-                    channel_bit_mask,
-                    spapi.Inst.CONTINUE,
-                    0,
-                    pulse_duration * t_min * spapi.us,
-                )
-                self.error_catcher(status)
-            else:
-                status = spapi.pb_inst_pbonly(
-                    channel_bit_mask,
-                    spapi.Inst.BRANCH,
-                    start_instr_num,
-                    pulse_duration * t_min * spapi.us,
-                )
-                self.error_catcher(status)
+                start_instr_num = status
 
         status = spapi.pb_inst_pbonly(
             0, spapi.Inst.STOP, 0, self.pb_min_instr_clk_cycles * t_min * spapi.us
@@ -5,9 +5,10 @@ an output power are unified by storing the device speicif commands in a
 dictionary for each device.
 """
 
+from contextlib import contextmanager
 from time import sleep
 import logging
-from typing import Dict
+from typing import Any, Dict, Iterator, List
 import pyvisa
 from qupyt.mixins import ConfigurationError
 
@@ -16,8 +17,17 @@ class VisaObject:
     """
     Visa class acting as parent for all devices intended
     to connect via the VISA protocol.
+
+    Commands sent through :meth:`write` inside a :meth:`batch` block are
+    joined with ``;:`` into a few large writes, and all :meth:`opc_wait`
+    calls of the block collapse into a single one at its end.
+    Every write or query on the bus counts as one round trip
+    (:attr:`round_trips`).
     """
 
+    #: Longest joined command string sent in one write, in characters.
+    batch_size: int = 8192
+
     def __init__(self, handle: str, s_type: str) -> None:
         """
         handle: visa adress of signal source
@@ -31,6 +41,11 @@ class VisaObject:
                 "the VISA device type", self.s_type, self.known_s_types
             )
         self.command: Dict[str, str]
+        self.round_trips = 0
+        self._batch: List[str] = []
+        self._batch_depth = 0
+        self._batch_commands = 0
+        self._batch_syncs = 0
         self._get_instructions()
         try:
             resource_manager = pyvisa.ResourceManager()
@@ -138,17 +153,113 @@ class VisaObject:
                 "OPC": "OUTPut1:IMPedance?",
             }
 
+    def write(self, command: str) -> None:
+        """
+        Send a command, or queue it if inside a :meth:`batch` block.
+        """
+        if self._batch_depth > 0:
+            self._batch.append(command)
+            self._batch_commands += 1
+            return
+        self.instance.write(command)
+        self.round_trips += 1
+
+    def query(self, command: str) -> str:
+        """
+        Send all queued commands, then query the device.
+        """
+        self._flush_batch()
+        self.round_trips += 1
+        return str(self.instance.query(command))
+
+    def write_binary_values(self, command: str, values: Any, **kwargs: Any) -> None:
+        """
+        Send all queued commands, then a binary block.
+        Keyword arguments are passed on to pyvisa.
+        """
+        self._flush_batch()
+        self.instance.write_binary_values(command, values, **kwargs)
+        self.round_trips += 1
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Group the enclosed commands into one transaction.
+        Blocks may be nested, the outermost one sends the queued
+        commands and syncs once with :meth:`opc_wait` if any of the
+        enclosed commands asked for it.
+
+        Example:
+            >>> with awg.batch():
+            ...     awg.write("source1:dac:resolution 12")
+            ...     awg.opc_wait()  # deferred to the end of the block
+        """
+        self._batch_depth += 1
+        round_trips = self.round_trips
+        try:
+            yield
+        except Exception:
+            if self._batch_depth == 1:
+                # Drop the unfinished transaction.
+                self._batch = []
+                self._batch_commands = 0
+                self._batch_syncs = 0
+            raise
+        finally:
+            self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return
+        commands, syncs = self._batch_commands, self._batch_syncs
+        self._batch_commands = 0
+        self._batch_syncs = 0
+        self._flush_batch()
+        if syncs:
+            self.opc_wait()
+        logging.info(
+            f"{commands} commands and {syncs} syncs to {self.s_type} took "
+            f"{self.round_trips - round_trips} round trips".ljust(65, ".")
+            + "[done]"
+        )
+
+    def _flush_batch(self) -> None:
+        message = ""
+        for command in self._batch:
+            if message and len(message) + len(command) + 2 > self.batch_size:
+                self.instance.write(message)
+                self.round_trips += 1
+                message = ""
+            message = f"{message};:{command}" if message else command
+        if message:
+            self.instance.write(message)
+            self.round_trips += 1
+        self._batch = []
+
     def opc_wait(self) -> None:
         """
         Check if the device has finished all tasks and is
         ready to execute the next command.
         Pauses execution until the device is ready.
+        Inside a :meth:`batch` block, the check is deferred to its end.
         """
+        if self._batch_depth > 0:
+            self._batch_syncs += 1
+            return
+        self._flush_batch()
         opc_val = 0
         while opc_val == 0:
             opc = self.instance.query(self.command["OPC"])
+            self.round_trips += 1
             opc_val = int(opc)
 
+    def is_ready(self) -> bool:
+        """
+        Operation complete query, used by the 'ready' settle policy.
+        Blocks until the device answers, but unlike :meth:`opc_wait`
+        it queries only once instead of until the device reports ready.
+        Queued batch commands are sent first.
+        """
+        return int(self.query(self.command["OPC"])) != 0
+
     def close(self) -> None:
         if self.s_type == "TekAWG":
             print("Sleeping for 5 seconds in close to prevent TCPIP issues:")
@@ -24,13 +24,16 @@ from watchdog.events import (
     FileClosedEvent,
 )
 
-from qupyt.hardware.device_handler import DeviceHandler, DynamicDeviceHandler
+from qupyt.hardware.device_handler import (
+    DeviceHandler,
+    DynamicDeviceHandler,
+    SensorHandler,
+    SynchroniserHandler,
+)
 from qupyt.pulse_sequences.pulse_sequence_handler import (
     write_user_ps,
     update_params_dict,
 )
-from qupyt.hardware.synchronisers import SynchroniserFactory
-from qupyt.hardware.sensors import SensorFactory
 from qupyt.measurement_logic.run_measurement import run_measurement
 from qupyt.hardware.signal_sources import SignalSource
 from qupyt.set_up import get_waiting_room, make_userdirs, get_log_dir, get_home_dir
@@ -102,11 +105,15 @@ def _set_ready() -> None:
 def parse_input() -> None:
     static_devices = DeviceHandler({})
     dynamic_devices = DynamicDeviceHandler({}, number_dynamic_steps=1)
+    sensor_handler = SensorHandler()
+    synchroniser_handler = SynchroniserHandler()
     processed_files = set()  # track files already picked from the queue
     while True:
         if queue.empty():
             static_devices.update_devices({})
             dynamic_devices.update_devices({})
+            sensor_handler.close()
+            synchroniser_handler.close()
             _set_ready()
             event_thread.wait()
             continue
@@ -156,12 +163,12 @@ def parse_input() -> None:
             update_params_dict(params, parameter_update)
 
             # Create measurement objects
-            synchroniser = SynchroniserFactory.create_synchroniser(
+            synchroniser = synchroniser_handler.get_synchroniser(
                 params["synchroniser"]["type"],
                 params["synchroniser"]["config"],
                 params["synchroniser"]["channel_mapping"],
             )
-            sensor = SensorFactory.create_sensor(
+            sensor = sensor_handler.get_sensor(
                 params["sensor"]["type"], params["sensor"]["config"]
             )
 
@@ -172,7 +179,13 @@ def parse_input() -> None:
 
             # Run the measurement
             success_status = run_measurement(
-                static_devices, dynamic_devices, sensor, synchroniser, params
+                static_devices,
+                dynamic_devices,
+                sensor,
+                synchroniser,
+                params,
+                close_sensor=sensor is not sensor_handler.sensor,
+                close_synchroniser=False,
             )
 
             # Handle post-measurement file renames
@@ -180,6 +193,9 @@ def parse_input() -> None:
                 if os.path.exists(running_file):
                     os.remove(running_file)
             elif success_status == "failed":
+                # Start the next measurement from a fresh sensor and synchroniser.
+                sensor_handler.close()
+                synchroniser_handler.close()
                 failed_file = f"{instruction_file}_failed_{timestamp}"
                 if os.path.exists(running_file):
                     os.replace(running_file, failed_file)
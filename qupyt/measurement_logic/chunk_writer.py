@@ -0,0 +1,129 @@
+"""
+Write chunks of accumulated data to disk without blocking the acquisition.
+
+When ``save_in_chunks`` is set, the :class:`Data` container periodically
+hands its full accumulator to a :class:`ChunkWriter` and continues on an
+empty spare buffer. The full buffer is written to disk on a background
+thread, cleared and recycled as the next spare.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from queue import Queue
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+_STOP = None
+
+
+class ChunkWriter:
+    """
+    Background writer for data chunks.
+
+    :param directory: Directory the chunks and manifest are written to.
+    :type directory: Path
+    :param prefix: Prefix of all chunk file names.
+    :type prefix: str
+    :param allocate: Callable returning a new, zero initialised accumulator.
+    :type allocate: Callable[[], np.ndarray]
+    :param spare_buffers: Number of spare accumulators. With one spare,
+     acquisition only waits if a chunk is still being written when the
+     next one is full.
+    :type spare_buffers: int
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str,
+        allocate: Callable[[], np.ndarray],
+        spare_buffers: int = 1,
+    ) -> None:
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.manifest_file = self.directory / f"{prefix}_chunks.yaml"
+        self.chunks: List[Dict[str, Any]] = []
+        self._index = 0
+        self._exception: Optional[BaseException] = None
+        self._spares: Queue[np.ndarray] = Queue()
+        for _ in range(spare_buffers):
+            self._spares.put(allocate())
+        self._pending: Queue[Optional[Tuple[np.ndarray, Dict[str, Any]]]] = Queue()
+        self._worker = threading.Thread(
+            target=self._work, name="qupyt-chunk-writer", daemon=True
+        )
+        self._worker.start()
+
+    def swap(
+        self, full: np.ndarray, ps_step: int, dynamic_step: int, avg_step: int
+    ) -> np.ndarray:
+        """
+        Queue a full accumulator for writing and return an empty spare.
+        This does not touch the data itself and returns immediately
+        unless all spares are still waiting to be written.
+
+        :return: Zeroed accumulator to continue the measurement with.
+        :rtype: np.ndarray
+        """
+        if self._exception is not None:
+            raise RuntimeError("Writing data chunk failed") from self._exception
+        entry = {
+            "index": self._index,
+            "file": f"{self.prefix}_chunk_{self._index:05d}_ps{ps_step}_dyn{dynamic_step}_avg{avg_step}.npy",
+            "ps_step": int(ps_step),
+            "dynamic_step": int(dynamic_step),
+            "avg_step": int(avg_step),
+        }
+        self._index += 1
+        spare = self._spares.get()
+        self._pending.put((full, entry))
+        return spare
+
+    def _work(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is _STOP:
+                return
+            buffer, entry = item
+            try:
+                np.save(self.directory / entry["file"], buffer)
+                self.chunks.append(entry)
+                self._write_manifest(buffer)
+                logging.info(
+                    f"Saved data chunk {entry['file']}".ljust(65, ".") + "[done]"
+                )
+            except BaseException as exc:  # pylint: disable=broad-except
+                logging.exception("Saving data chunk failed")
+                self._exception = exc
+            buffer.fill(0)
+            self._spares.put(buffer)
+
+    def _write_manifest(self, buffer: np.ndarray) -> None:
+        manifest = {
+            "prefix": self.prefix,
+            "shape": list(buffer.shape),
+            "dtype": str(buffer.dtype),
+            "chunks": self.chunks,
+        }
+        with open(self.manifest_file, "w", encoding="utf-8") as file:
+            yaml.dump(manifest, file)
+
+    def close(self) -> List[np.ndarray]:
+        """
+        Wait for all queued chunks to be written and stop the writer thread.
+
+        :return: The spare accumulators, so their resources can be released.
+        :rtype: List[np.ndarray]
+        """
+        if self._worker.is_alive():
+            self._pending.put(_STOP)
+            self._worker.join()
+        spares = []
+        while not self._spares.empty():
+            spares.append(self._spares.get())
+        if self._exception is not None:
+            raise RuntimeError("Writing data chunk failed") from self._exception
+        return spares
@@ -0,0 +1,285 @@
+"""
+Chunked, compressed container for measurement output.
+
+Data, measurement parameters and per step metadata are stored in one zip
+file laid out as a Zarr (v2) array in a zip store, so besides
+:func:`load_chunked` it can also be opened with
+``zarr.open(zarr.ZipStore(path, mode="r"))``:
+
+- ``.zarray``: JSON array description (shape, dtype, chunks, codecs).
+- ``.zattrs``: JSON attributes holding the measurement parameters and
+  the metadata of every recorded step.
+- ``<c>.<p>.<d>.0...``: one chunk per reference channel ``c``,
+  pulse sequence step ``p`` and dynamic step ``d``.
+
+Chunks are byte shuffled and compressed with zlib or lzma from the
+standard library. Every chunk is a separate zip entry, so a single
+dynamic step can be read without touching the rest of the file, and
+chunks can be appended while the measurement is still running.
+"""
+
+import json
+import lzma
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+COMPRESSION_OPTIONS = ["zlib", "lzma", "none"]
+
+
+def _shuffle(raw: bytes, itemsize: int) -> bytes:
+    if itemsize == 1:
+        return raw
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, itemsize).T.tobytes()
+
+
+def _unshuffle(shuffled: bytes, itemsize: int) -> bytes:
+    if itemsize == 1:
+        return shuffled
+    return np.frombuffer(shuffled, dtype=np.uint8).reshape(itemsize, -1).T.tobytes()
+
+
+def _compressor_config(compression: str, level: int) -> Optional[Dict[str, Any]]:
+    if compression == "zlib":
+        return {"id": "zlib", "level": level}
+    if compression == "lzma":
+        return {"id": "lzma", "format": lzma.FORMAT_XZ, "check": -1, "preset": level, "filters": None}
+    return None
+
+
+def encode_chunk(chunk: np.ndarray, compression: str = "zlib", level: int = 5) -> bytes:
+    """
+    Byte shuffle and compress one chunk.
+
+    :param chunk: Array to encode.
+    :type chunk: np.ndarray
+    :param compression: One of 'zlib', 'lzma' or 'none'.
+    :type compression: str
+    :param level: Compression level (zlib) or preset (lzma).
+    :type level: int
+    :return: Encoded bytes.
+    :rtype: bytes
+    """
+    shuffled = _shuffle(np.ascontiguousarray(chunk).tobytes(), chunk.dtype.itemsize)
+    if compression == "zlib":
+        return zlib.compress(shuffled, level)
+    if compression == "lzma":
+        return lzma.compress(shuffled, format=lzma.FORMAT_XZ, preset=level)
+    return shuffled
+
+
+def decode_chunk(
+    encoded: bytes, metadata: Dict[str, Any]
+) -> np.ndarray:
+    """
+    Inverse of :func:`encode_chunk`.
+
+    :param encoded: Bytes as stored in the container.
+    :type encoded: bytes
+    :param metadata: Array description as stored in ``.zarray``.
+    :type metadata: Dict[str, Any]
+    :return: Decoded chunk.
+    :rtype: np.ndarray
+    """
+    dtype = np.dtype(metadata["dtype"])
+    compressor = metadata["compressor"]
+    if compressor is None:
+        shuffled = encoded
+    elif compressor["id"] == "zlib":
+        shuffled = zlib.decompress(encoded)
+    elif compressor["id"] == "lzma":
+        shuffled = lzma.decompress(encoded)
+    else:
+        raise ValueError(f"Unknown compressor {compressor['id']}")
+    if metadata["filters"]:
+        shuffled = _unshuffle(shuffled, dtype.itemsize)
+    return np.frombuffer(shuffled, dtype=dtype).reshape(metadata["chunks"]).copy()
+
+
+class ChunkedDatasetWriter:
+    """
+    Incrementally write a data array of shape
+    ``[reference_channels, ps_steps, dynamic_steps, ...]`` to a chunked
+    container. Each ``[channel, ps_step, dynamic_step]`` slice is one chunk.
+
+    :param path: File to write.
+    :type path: Path
+    :param shape: Shape of the full data array.
+    :type shape: Tuple[int, ...]
+    :param dtype: Data type of the array.
+    :type dtype: np.dtype
+    :param compression: One of 'zlib', 'lzma' or 'none'.
+    :type compression: str
+    :param level: Compression level (zlib) or preset (lzma).
+    :type level: int
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        shape: Tuple[int, ...],
+        dtype: np.dtype,
+        compression: str = "zlib",
+        level: int = 5,
+    ) -> None:
+        if compression not in COMPRESSION_OPTIONS:
+            raise ValueError(
+                f"Unknown compression {compression}, options are {COMPRESSION_OPTIONS}"
+            )
+        self.path = Path(path)
+        self.shape = tuple(int(dim) for dim in shape)
+        self.dtype = np.dtype(dtype)
+        self.compression = compression
+        self.level = int(level)
+        self.steps: List[Dict[str, Any]] = []
+        self._written: Set[Tuple[int, int, int]] = set()
+        self.metadata = {
+            "zarr_format": 2,
+            "shape": list(self.shape),
+            "chunks": [1, 1, 1, *self.shape[3:]],
+            "dtype": self.dtype.str,
+            "compressor": _compressor_config(compression, self.level),
+            "filters": (
+                [{"id": "shuffle", "elementsize": self.dtype.itemsize}]
+                if self.dtype.itemsize > 1
+                else None
+            ),
+            "fill_value": 0,
+            "order": "C",
+            "dimension_separator": ".",
+        }
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED) as container:
+            container.writestr(".zarray", json.dumps(self.metadata, indent=2))
+
+    def _chunk_key(self, channel: int, ps_step: int, dynamic_step: int) -> str:
+        return ".".join(
+            str(index) for index in [channel, ps_step, dynamic_step] + [0] * (len(self.shape) - 3)
+        )
+
+    def write_step(
+        self,
+        data: np.ndarray,
+        ps_step: int,
+        dynamic_step: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Append the chunks of one finished step for all reference channels.
+
+        :param data: Full data array, of which only the step is read.
+        :type data: np.ndarray
+        :param metadata: Optional metadata describing the step.
+        :type metadata: Optional[Dict[str, Any]]
+        """
+        with zipfile.ZipFile(self.path, "a", zipfile.ZIP_STORED) as container:
+            self._write_chunks(container, data, [(ps_step, dynamic_step)])
+        step_metadata = {"ps_step": int(ps_step), "dynamic_step": int(dynamic_step)}
+        step_metadata.update(metadata or {})
+        self.steps.append(step_metadata)
+
+    def _write_chunks(
+        self,
+        container: zipfile.ZipFile,
+        data: np.ndarray,
+        steps: List[Tuple[int, int]],
+    ) -> None:
+        for ps_step, dynamic_step in steps:
+            for channel in range(self.shape[0]):
+                if (channel, ps_step, dynamic_step) in self._written:
+                    continue
+                chunk = np.asarray(data[channel, ps_step, dynamic_step], dtype=self.dtype)
+                container.writestr(
+                    self._chunk_key(channel, ps_step, dynamic_step),
+                    encode_chunk(chunk, self.compression, self.level),
+                )
+                self._written.add((channel, ps_step, dynamic_step))
+
+    def close(self, data: np.ndarray, attributes: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write all chunks that were not appended during the measurement,
+        as well as the parameters and step metadata.
+
+        :param data: Full data array.
+        :type data: np.ndarray
+        :param attributes: Measurement parameters to store alongside.
+        :type attributes: Optional[Dict[str, Any]]
+        """
+        all_steps = [
+            (ps_step, dynamic_step)
+            for ps_step in range(self.shape[1])
+            for dynamic_step in range(self.shape[2])
+        ]
+        with zipfile.ZipFile(self.path, "a", zipfile.ZIP_STORED) as container:
+            self._write_chunks(container, data, all_steps)
+            container.writestr(
+                ".zattrs",
+                json.dumps(
+                    {"params": attributes or {}, "steps": self.steps},
+                    indent=2,
+                    default=str,
+                ),
+            )
+
+
+def _iter_indices(size: int, index: Optional[int]) -> Iterator[int]:
+    if index is None:
+        return iter(range(size))
+    return iter([index])
+
+
+def load_chunked(
+    path: Path, ps_step: Optional[int] = None, dynamic_step: Optional[int] = None
+) -> np.ndarray:
+    """
+    Read data from a chunked container. Only the chunks of the requested
+    steps are read and decompressed.
+
+    :param path: Container file.
+    :type path: Path
+    :param ps_step: Pulse sequence step to read. Reads all if None.
+    :type ps_step: Optional[int]
+    :param dynamic_step: Dynamic step to read. Reads all if None.
+    :type dynamic_step: Optional[int]
+    :return: Array of shape ``[reference_channels, ps_steps, dynamic_steps, ...]``,
+     where the step axes have length one if a step was selected.
+    :rtype: np.ndarray
+    """
+    with zipfile.ZipFile(path, "r") as container:
+        metadata = json.loads(container.read(".zarray"))
+        shape = metadata["shape"]
+        ps_steps = list(_iter_indices(shape[1], ps_step))
+        dynamic_steps = list(_iter_indices(shape[2], dynamic_step))
+        data = np.full(
+            [shape[0], len(ps_steps), len(dynamic_steps), *shape[3:]],
+            metadata["fill_value"],
+            dtype=np.dtype(metadata["dtype"]),
+        )
+        stored = set(container.namelist())
+        for channel in range(shape[0]):
+            for ps_index, ps in enumerate(ps_steps):
+                for dynamic_index, dynamic in enumerate(dynamic_steps):
+                    key = ".".join(
+                        str(index) for index in [channel, ps, dynamic] + [0] * (len(shape) - 3)
+                    )
+                    if key in stored:
+                        data[channel, ps_index, dynamic_index] = decode_chunk(
+                            container.read(key), metadata
+                        )[0, 0, 0]
+    return data
+
+
+def load_chunked_attributes(path: Path) -> Dict[str, Any]:
+    """
+    :param path: Container file.
+    :type path: Path
+    :return: Measurement parameters and step metadata stored in the container.
+    :rtype: Dict[str, Any]
+    """
+    with zipfile.ZipFile(path, "r") as container:
+        if ".zattrs" not in container.namelist():
+            return {}
+        attributes: Dict[str, Any] = json.loads(container.read(".zattrs"))
+    return attributes
@@ -1,8 +1,19 @@
 import logging
-from typing import Dict, Any, List
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
+from numpy.lib.format import open_memmap
 from qupyt.hardware.sensors import Sensor
-from qupyt.mixins import ConfigurationMixin, UpdateConfigurationType
+from qupyt.measurement_logic.chunk_writer import ChunkWriter
+from qupyt.measurement_logic.reductions import ReductionFactory, ReductionStage
+from qupyt.measurement_logic.chunked_storage import (
+    COMPRESSION_OPTIONS,
+    ChunkedDatasetWriter,
+)
+from qupyt.mixins import ConfigurationMixin, UpdateConfigurationType, ConfigurationError
 
 
 class Data(ConfigurationMixin):
@@ -19,6 +30,28 @@ class Data(ConfigurationMixin):
         self.save_in_chunks: int = 0
         self.reference_channels: int = 2
         self.data: np.ndarray
+        self._reduction_buffer: np.ndarray
+        self._frame_means: Optional[np.ndarray] = None
+        self.storage: str = "auto"
+        self.memory_budget: float = 4.0
+        self.storage_dir: Path = Path.cwd()
+        self.output_name: str = "save_chunk"
+        self._chunk_writer: Optional[ChunkWriter] = None
+        self.output_format: str = "npy"
+        self.compression: str = "zlib"
+        self.compression_level: int = 5
+        self._dataset_writer: Optional[ChunkedDatasetWriter] = None
+        self.m2: np.ndarray
+        self.counts: np.ndarray
+        self.live_contrast: bool = False
+        self.contrast_only: bool = False
+        self.contrast_mean: np.ndarray
+        self.contrast_m2: np.ndarray
+        self.contrast_counts: np.ndarray
+        self._scratch: Dict[Tuple[str, Tuple[int, ...]], np.ndarray] = {}
+        self.reductions: List[ReductionStage] = []
+        self.averages_per_trigger: int = 1
+        self._spread_buffer: Optional[np.ndarray] = None
         self.attribute_map = {
             "dynamic_steps": self._set_number_dynamic_steps,
             "ps_steps": self._set_number_pulse_sequences,
@@ -29,11 +62,54 @@ class Data(ConfigurationMixin):
             "live_compression": self._set_live_compression,
             "save_in_chunks": self._set_save_chunk_size,
             "reference_channels": self._set_reference_channels,
+            "storage": self._set_storage,
+            "memory_budget": self._set_memory_budget,
+            "storage_dir": self._set_storage_dir,
+            "output_format": self._set_output_format,
+            "compression": self._set_compression,
+            "compression_level": self._set_compression_level,
+            "live_contrast": self._set_live_contrast,
+            "contrast_only": self._set_contrast_only,
+            "reductions": self._set_reductions,
         }
         self._update_from_configuration(configuration)
 
     def _set_save_chunk_size(self, save_in_chunks: int) -> None:
-        self.save_in_chunks = save_in_chunks
+        self.save_in_chunks = int(save_in_chunks)
+
+    def _set_storage(self, storage: str) -> None:
+        if storage not in ["auto", "ram", "memmap"]:
+            raise ConfigurationError("storage", storage, ["auto", "ram", "memmap"])
+        self.storage = storage
+
+    def _set_memory_budget(self, memory_budget: float) -> None:
+        # Given in GB.
+        self.memory_budget = float(memory_budget)
+
+    def _set_storage_dir(self, storage_dir: str) -> None:
+        self.storage_dir = Path(storage_dir)
+
+    def _set_output_format(self, output_format: str) -> None:
+        if output_format not in ["npy", "chunked"]:
+            raise ConfigurationError("output_format", output_format, ["npy", "chunked"])
+        self.output_format = output_format
+
+    def _set_compression(self, compression: str) -> None:
+        if compression not in COMPRESSION_OPTIONS:
+            raise ConfigurationError("compression", compression, COMPRESSION_OPTIONS)
+        self.compression = compression
+
+    def _set_compression_level(self, compression_level: int) -> None:
+        self.compression_level = int(compression_level)
+
+    def _set_live_contrast(self, live_contrast: bool) -> None:
+        self.live_contrast = bool(live_contrast)
+
+    def _set_contrast_only(self, contrast_only: bool) -> None:
+        self.contrast_only = bool(contrast_only)
+
+    def _set_reductions(self, reductions: List[Dict[str, Any]]) -> None:
+        self.reductions = ReductionFactory.create_chain(reductions)
 
     def _set_reference_channels(self, reference_channels: int) -> None:
         self.reference_channels = int(reference_channels)
@@ -66,32 +142,109 @@ class Data(ConfigurationMixin):
     def _set_roi_shape(self, roi_shape: List[int]) -> None:
         self.roi_shape = roi_shape
 
-    def set_dims_from_sensor(self, sensor: Sensor) -> None:
+    def set_dims_from_sensor(self, sensor: Sensor, averages: Optional[int] = None) -> None:
+        """
+        :param sensor: Sensor providing the frame shape and data type.
+        :type sensor: Sensor
+        :param averages: Number of frame stacks accumulated per step.
+         Used to pick an overflow safe integer accumulator for integer
+         sensors. If omitted, a 64 bit accumulator is used.
+        :type averages: Optional[int]
+        """
         self._set_ROI_from_sensor(sensor)
         self._set_number_measurements_from_sensor(sensor)
         if hasattr(sensor, "target_data_type"):
             self._set_dtype_from_sensor(sensor)
+        else:
+            self._negotiate_dtype(sensor, averages)
+
+    def _negotiate_dtype(self, sensor: Sensor, averages: Optional[int]) -> None:
+        """
+        Pick the accumulator for the sensor's native pixel type. Integer
+        frames are summed into the smallest integer type that cannot
+        overflow: bit_depth plus the bits needed to count all frames
+        and, with summing reduction stages, all pixels summed into one
+        element.
+        """
+        native = np.dtype(getattr(sensor, "native_data_type", float))
+        if native.kind not in "ui":
+            self.data_type = float
+            return
+        if averages is None:
+            self.data_type = np.uint64 if native.kind == "u" else np.int64
+            return
+        bit_depth = getattr(sensor, "bit_depth", None) or native.itemsize * 8
+        summed = max(int(self.number_measurements) * int(averages), 1)
+        roi_shape = list(self.roi_shape)
+        for stage in self.reductions:
+            summed *= stage.summed_pixels(roi_shape)
+            roi_shape = stage.output_shape(roi_shape)
+        required_bits = bit_depth + int(np.ceil(np.log2(summed)))
+        if native.kind == "i":
+            required_bits += 1
+        if required_bits <= 32:
+            self.data_type = np.uint32 if native.kind == "u" else np.int32
+        elif required_bits <= 64:
+            self.data_type = np.uint64 if native.kind == "u" else np.int64
+        else:
+            self.data_type = float
+        logging.info(
+            f"Accumulating {native} sensor data as {np.dtype(self.data_type)}".ljust(65, ".")
+            + "[done]"
+        )
 
     def _set_ROI_from_sensor(self, sensor: Sensor) -> None:
         self.roi_shape = sensor.roi_shape
 
     def _set_number_measurements_from_sensor(self, sensor: Sensor) -> None:
-        self.number_measurements = sensor.number_measurements
+        if sensor.number_measurements % self.averages_per_trigger != 0:
+            raise ValueError(
+                f"The sensor records {sensor.number_measurements} measurements, which cannot be split into {self.averages_per_trigger} averages."
+            )
+        self.number_measurements = sensor.number_measurements // self.averages_per_trigger
 
-    def create_array(self) -> None:
+    def set_averages_per_trigger(self, averages_per_trigger: int) -> None:
+        """
+        :param averages_per_trigger: Number of averages the sensor records
+         per acquisition. Every frame stack then holds this many blocks of
+         number_measurements frames, which are folded into the data in one
+         update. Has to be set before :meth:`set_dims_from_sensor`.
+         During normal usage as part of QuPyt, this will be assigned by the
+         main measurement loop.
+        :type averages_per_trigger: int
+        """
+        self.averages_per_trigger = int(averages_per_trigger)
+
+    def _get_array_dims(self) -> List[int]:
         # HeliCam gets number_images, whereas other get number_images / 2.
         # I suggest fixing this as number_images
         # Specifics have then to be dealt with in each class.
+        data_array_dim, self.data_type = self._array_layout()
         if self.live_compression:
             self.roi_shape = [1]
-            self.data_type = float
-        if self.averaging_mode == "sum":
+        return data_array_dim
+
+    def _array_layout(self) -> Tuple[List[int], type]:
+        """
+        Shape and data type of the data array, derived without changing
+        any attribute.
+        """
+        data_type = getattr(self, "data_type", float)
+        if self.live_compression:
+            roi_shape = [1]
+            data_type = float
+        else:
+            roi_shape, data_type = self._reduced_layout(data_type)
+        if self.averaging_mode == "variance":
+            # Running means are stored, independent of the sensor data type.
+            data_type = float
+        if self.averaging_mode in ["sum", "variance"]:
             data_array_dim = [
                 self.reference_channels,
                 self.number_pulse_sequences,
                 self.number_dynamic_steps,
                 1,
-                *self.roi_shape,
+                *roi_shape,
             ]
         elif self.averaging_mode == "spread":
             measurements_per_channel = self.number_measurements / self.reference_channels
@@ -103,7 +256,7 @@ class Data(ConfigurationMixin):
                 self.number_pulse_sequences,
                 self.number_dynamic_steps,
                 int(measurements_per_channel),
-                *self.roi_shape,
+                *roi_shape,
             ]
         else:
             logging.info(
@@ -113,52 +266,399 @@ class Data(ConfigurationMixin):
                 + "[failed]"
             )
             raise ValueError(f"averaging_mode {self.averaging_mode} not available")
+        return data_array_dim, data_type
+
+    def _reduced_layout(self, data_type: type) -> Tuple[List[int], type]:
+        """
+        Frame shape and data type after all reduction stages, e.g.
+        floats for weighted sums.
+        """
+        roi_shape = list(self.roi_shape)
+        if not self.reductions:
+            return roi_shape, data_type
+        dtype = np.dtype(data_type)
+        for stage in self.reductions:
+            roi_shape = stage.output_shape(roi_shape)
+            dtype = stage.output_dtype(dtype)
+        return roi_shape, dtype.type
+
+    def estimate_size(self) -> int:
+        """
+        :return: Size of the data array in bytes, without allocating it.
+        :rtype: int
+        """
+        data_array_dim, data_type = self._array_layout()
+        itemsize = np.dtype(data_type).itemsize
+        if self.averaging_mode == "variance":
+            # Mean and M2 array.
+            itemsize *= 2
+        return int(np.prod(data_array_dim, dtype=np.int64)) * itemsize
+
+    def _use_memmap(self) -> bool:
+        if self.storage == "memmap":
+            return True
+        if self.storage == "ram":
+            return False
+        return self.estimate_size() > self.memory_budget * 1e9
+
+    def _allocate_array(self, data_array_dim: List[int]) -> np.ndarray:
+        dtype = getattr(self, "data_type", float)
+        if not self._use_memmap():
+            logging.info(
+                f"Created data array of shape {data_array_dim}".ljust(65, ".") + "[done]"
+            )
+            return np.zeros(data_array_dim, dtype=dtype)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        file_descriptor, backing_file = tempfile.mkstemp(
+            suffix=".npy", prefix="qupyt_data_", dir=self.storage_dir
+        )
+        os.close(file_descriptor)
         logging.info(
-            f"Created data array of shape {data_array_dim}".ljust(65, ".") + "[done]"
+            f"Created memory mapped data array of shape {data_array_dim} in {backing_file}".ljust(
+                65, "."
+            )
+            + "[done]"
+        )
+        return open_memmap(backing_file, mode="w+", dtype=dtype, shape=tuple(data_array_dim))
+
+    def create_array(self) -> None:
+        if self.save_in_chunks != 0 and self.output_format == "chunked":
+            # Chunks reset the accumulator, the steps written to the
+            # chunked container would miss all data saved in chunks.
+            raise ValueError(
+                "save_in_chunks is not supported with output_format 'chunked'."
+            )
+        data_array_dim = self._get_array_dims()
+        if self.live_contrast:
+            self._create_contrast_arrays(data_array_dim)
+            if self.contrast_only:
+                # Raw data would be discarded on save, so it is never
+                # accumulated in the first place.
+                return
+        self.data = self._allocate_array(data_array_dim)
+        self._reduction_buffer = np.zeros(
+            [self.reference_channels, *data_array_dim[4:]], dtype=self.data.dtype
         )
-        self.data = np.zeros(data_array_dim, dtype=getattr(self, "data_type", float))
+        if self.averaging_mode == "spread" and self.averages_per_trigger > 1:
+            self._spread_buffer = np.zeros(
+                [data_array_dim[3], self.reference_channels, *data_array_dim[4:]],
+                dtype=self.data.dtype,
+            )
+        if self.averaging_mode == "variance":
+            if self.save_in_chunks != 0:
+                raise ValueError(
+                    "save_in_chunks is not supported with averaging_mode 'variance'."
+                )
+            self.m2 = self._allocate_array(data_array_dim)
+            self.counts = np.zeros(data_array_dim[1:3], dtype=np.int64)
+        if self.save_in_chunks != 0:
+            self._chunk_writer = ChunkWriter(
+                self.storage_dir,
+                self.output_name,
+                lambda: self._allocate_array(data_array_dim),
+            )
+        if self.output_format == "chunked":
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            self._dataset_writer = ChunkedDatasetWriter(
+                self.storage_dir / f"{self.output_name}.zarr.zip",
+                self.data.shape,
+                self.data.dtype,
+                self.compression,
+                self.compression_level,
+            )
+
+    def _create_contrast_arrays(self, data_array_dim: List[int]) -> None:
+        if self.reference_channels != 2:
+            raise ValueError(
+                f"live_contrast needs a signal and a reference channel, got {self.reference_channels} reference channels."
+            )
+        if self.contrast_only and self.output_format == "chunked":
+            raise ValueError("contrast_only cannot be combined with output_format 'chunked'.")
+        if self.contrast_only and self.save_in_chunks != 0:
+            raise ValueError("contrast_only cannot be combined with save_in_chunks.")
+        if self.averaging_mode == "spread":
+            # The readouts of a sequence stay separate, only averages are folded.
+            contrast_dim = data_array_dim[1:]
+        else:
+            contrast_dim = [*data_array_dim[1:3], *data_array_dim[4:]]
+        self.contrast_mean = np.zeros(contrast_dim, dtype=float)
+        self.contrast_m2 = np.zeros(contrast_dim, dtype=float)
+        self.contrast_counts = np.zeros(data_array_dim[1:3], dtype=np.int64)
+
+    def set_output_name(self, output_name: str) -> None:
+        """
+        :param output_name: Base name of all files written during the
+         measurement, e.g. data chunks. During normal usage as part of
+         QuPyt, this will be assigned by the main measurement loop.
+        :type output_name: str
+        """
+        self.output_name = output_name
 
     def update_data(self, data: np.ndarray, ps_step: int, dynamic_step: int, avg_step: int) -> None:
-        if self.save_in_chunks != 0 and avg_step % self.save_in_chunks == 0:
-            self.save(f"save_chunk_{avg_step}.npy")
-            self.create_array()
+        for stage in self.reductions:
+            data = stage.apply(data)
         if self.live_compression:
             self._update_data_compressed(data, ps_step, dynamic_step)
         else:
             self._update_data_full(data, ps_step, dynamic_step)
+        if self._chunk_writer is not None and (avg_step + 1) % self.save_in_chunks == 0:
+            self.data = self._chunk_writer.swap(self.data, ps_step, dynamic_step, avg_step)
+
+    def finish_step(
+        self, ps_step: int, dynamic_step: int, metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Mark a step as complete. With the chunked output format, its
+        chunks are appended to the output file right away.
+        :param metadata: Information about the step, e.g. a timestamp,
+         stored alongside the data.
+        :type metadata: Optional[Dict[str, Any]]
+        """
+        if self._dataset_writer is not None:
+            self._dataset_writer.write_step(self.data, ps_step, dynamic_step, metadata)
 
     def _update_data_full(self, data: np.ndarray, ps_step: int, dynamic_step: int) -> None:
-        if self.averaging_mode == "sum":
-            for i in range(self.reference_channels):
-                self.data[i, ps_step, dynamic_step] += data[i :: self.reference_channels].sum(
-                    axis=0
-                )
-            # np.save("C:/Users/ge54vec/.qupyt/data", self.data)
-        elif self.averaging_mode == "spread":
-            for i in range(self.reference_channels):
-                self.data[i, ps_step, dynamic_step] += data[i :: self.reference_channels]
-                # np.save("C:/Users/ge54vec/.qupyt/data", self.data)
+        self._accumulate(data, ps_step, dynamic_step)
 
     def _update_data_compressed(self, data: np.ndarray, ps_step: int, dynamic_step: int) -> None:
+        if self._frame_means is None or self._frame_means.shape[0] != data.shape[0]:
+            self._frame_means = np.empty(data.shape[0], dtype=float)
+        np.mean(data, axis=tuple(range(1, data.ndim)), out=self._frame_means)
+        self._accumulate(self._frame_means.reshape(-1, 1), ps_step, dynamic_step)
+
+    def _split_channels(self, data: np.ndarray) -> np.ndarray:
+        """
+        Return a view of shape [measurements_per_channel, reference_channels, *roi]
+        on a frame stack of shape [number_frames, *roi].
+        Frame i belongs to reference channel i % reference_channels.
+        """
+        if data.shape[0] % self.reference_channels != 0:
+            raise ValueError(
+                f"Received {data.shape[0]} frames, which cannot be distributed across {self.reference_channels} reference channels."
+            )
+        return data.reshape(-1, self.reference_channels, *data.shape[1:])
+
+    def _accumulate(self, data: np.ndarray, ps_step: int, dynamic_step: int) -> None:
+        """
+        Fold a stack of frames into the data array in a single pass.
+        Results are written in place, no temporaries the size of the
+        frame stack are created.
+        """
+        channel_frames = self._split_channels(data)
+        if self.live_contrast:
+            self._accumulate_contrast(channel_frames, ps_step, dynamic_step)
+            if self.contrast_only:
+                return
+        target = self.data[:, ps_step, dynamic_step]
         if self.averaging_mode == "sum":
-            for i in range(self.reference_channels):
-                ndim = data.ndim
-                self.data[i, ps_step, dynamic_step] += (
-                    data[i :: self.reference_channels].mean(axis=tuple(range(1, ndim))).sum(axis=0)
-                )
+            np.add.reduce(
+                channel_frames,
+                axis=0,
+                dtype=self._reduction_buffer.dtype,
+                out=self._reduction_buffer,
+            )
+            np.add(target[:, 0], self._reduction_buffer, out=target[:, 0])
         elif self.averaging_mode == "spread":
-            for i in range(self.reference_channels):
-                ndim = data.ndim
-                self.data[i, ps_step, dynamic_step] += (
-                    data[i :: self.reference_channels].mean(axis=tuple(range(1, ndim))).reshape(-1, 1)
+            spread_buffer = self._spread_buffer
+            if spread_buffer is None:
+                np.add(target, channel_frames.swapaxes(0, 1), out=target)
+            else:
+                # Fold the averages recorded with one trigger onto each other first.
+                np.add.reduce(
+                    channel_frames.reshape(
+                        self.averages_per_trigger, *spread_buffer.shape
+                    ),
+                    axis=0,
+                    dtype=spread_buffer.dtype,
+                    out=spread_buffer,
                 )
+                np.add(target, spread_buffer.swapaxes(0, 1), out=target)
+        elif self.averaging_mode == "variance":
+            self._accumulate_variance(channel_frames, ps_step, dynamic_step)
+
+    def _accumulate_variance(
+        self, channel_frames: np.ndarray, ps_step: int, dynamic_step: int
+    ) -> None:
+        self.counts[ps_step, dynamic_step] = self._welford_update(
+            channel_frames,
+            self.data[:, ps_step, dynamic_step, 0],
+            self.m2[:, ps_step, dynamic_step, 0],
+            int(self.counts[ps_step, dynamic_step]),
+        )
+
+    def _accumulate_contrast(
+        self, channel_frames: np.ndarray, ps_step: int, dynamic_step: int
+    ) -> None:
+        """
+        Referenced contrast (signal - reference) / (signal + reference)
+        of every frame pair, folded into its running mean and M2.
+        In spread mode, pairs from different readouts of the sequence
+        are kept apart.
+        """
+        signal = channel_frames[:, 0]
+        reference = channel_frames[:, 1]
+        contrast = self._scratch_buffer("contrast", signal.shape)
+        total = self._scratch_buffer("total", signal.shape)
+        # Computed in float, unsigned integer frames would wrap around.
+        np.subtract(signal, reference, out=contrast, dtype=float)
+        np.add(signal, reference, out=total, dtype=float)
+        np.divide(contrast, total, out=contrast, where=total != 0)
+        self.contrast_counts[ps_step, dynamic_step] = self._welford_update(
+            contrast.reshape(-1, *self.contrast_mean.shape[2:]),
+            self.contrast_mean[ps_step, dynamic_step],
+            self.contrast_m2[ps_step, dynamic_step],
+            int(self.contrast_counts[ps_step, dynamic_step]),
+        )
+
+    def _scratch_buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        key = (name, tuple(shape))
+        if key not in self._scratch:
+            self._scratch[key] = np.empty(shape, dtype=float)
+        return self._scratch[key]
+
+    def _welford_update(
+        self, samples: np.ndarray, mean: np.ndarray, m2: np.ndarray, previous: int
+    ) -> int:
+        """
+        Merge a batch of samples (along the first axis) into the running
+        mean and M2 (sum of squared deviations) with the parallel form of
+        Welford's algorithm (Chan et al.). mean and m2 are updated in place,
+        all intermediate results live in reused scratch buffers.
+        :return: Number of samples merged so far.
+        :rtype: int
+        """
+        batch = int(samples.shape[0])
+        total = previous + batch
+        batch_mean = self._scratch_buffer("batch_mean", samples.shape[1:])
+        batch_m2 = self._scratch_buffer("batch_m2", samples.shape[1:])
+        centered = self._scratch_buffer("centered", samples.shape)
+        np.add.reduce(samples, axis=0, dtype=float, out=batch_mean)
+        batch_mean /= batch
+        np.subtract(samples, batch_mean, out=centered)
+        np.einsum("m...,m...->...", centered, centered, out=batch_m2)
+        np.add(m2, batch_m2, out=m2)
+        delta = np.subtract(batch_mean, mean, out=batch_mean)
+        np.multiply(delta, delta, out=batch_m2)
+        batch_m2 *= previous * batch / total
+        np.add(m2, batch_m2, out=m2)
+        delta *= batch / total
+        np.add(mean, delta, out=mean)
+        return total
+
+    @staticmethod
+    def _standard_error(m2: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        counts = counts.reshape(*counts.shape, *[1] * (m2.ndim - counts.ndim))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sem: np.ndarray = np.sqrt(m2 / (counts * (counts - 1)))
+        sem[np.broadcast_to(counts < 2, sem.shape)] = np.nan
+        return sem
 
-    def save(self, filename: str) -> None:
+    @property
+    def sem(self) -> np.ndarray:
         """
-        Save data (without metadata) to a .npy file.
+        Standard error of the mean for every pixel and step,
+        only available with averaging_mode 'variance'.
+        Steps with fewer than two frames are NaN.
+        :rtype: np.ndarray
+        """
+        if self.averaging_mode != "variance":
+            raise ValueError("The standard error is only available with averaging_mode 'variance'.")
+        return self._standard_error(self.m2, self.counts[np.newaxis])
+
+    @property
+    def contrast_sem(self) -> np.ndarray:
+        """
+        Standard error of the live contrast for every pixel and step.
+        Steps with fewer than two frame pairs are NaN.
+        :rtype: np.ndarray
+        """
+        return self._standard_error(self.contrast_m2, self.contrast_counts)
+
+    def save(self, filename: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Save data to a .npy file, or to a .zarr.zip container if the
+        chunked output format is selected.
+        With averaging_mode 'variance', the standard errors are saved
+        to <filename>_sem.npy.
+        With live_contrast, mean contrast and its standard error are
+        saved to <filename>_contrast.npy. If contrast_only is set, no
+        raw data is kept during the measurement, so none is saved.
+        Memory mapped data is flushed and its backing file moved
+        to the requested location instead of being copied.
         :param filename: Name of the resulting data file.
          During normal usage as part of QuPyt, this will be assigned by the
          main measurement loop.
         :type filename: str
+        :param metadata: Measurement parameters. Only stored by the
+         chunked output format, which keeps them in the same file.
+        :type metadata: Optional[Dict[str, Any]]
+        """
+        if self.live_contrast:
+            np.save(f"{filename}_contrast", np.stack([self.contrast_mean, self.contrast_sem]))
+            if self.contrast_only:
+                return
+        if self.averaging_mode == "variance":
+            self._save_sem(filename)
+        if self._dataset_writer is not None:
+            self._save_chunked(filename, metadata)
+            return
+        if not isinstance(self.data, np.memmap):
+            np.save(filename, self.data)
+            return
+        # Memory mapped data already lives on disk. Move the file
+        # instead of writing a second copy of it.
+        self.data.flush()
+        backing_file = self.data.filename
+        assert backing_file is not None
+        target = Path(filename)
+        if target.suffix != ".npy":
+            target = target.with_name(target.name + ".npy")
+        del self.data
+        shutil.move(backing_file, target)
+        self.data = open_memmap(target, mode="r+")
+
+    def _save_sem(self, filename: str) -> None:
+        np.save(f"{filename}_sem", self.sem)
+        if isinstance(self.m2, np.memmap):
+            backing_file = self.m2.filename
+            assert backing_file is not None
+            del self.m2
+            os.remove(backing_file)
+
+    def _save_chunked(self, filename: str, metadata: Optional[Dict[str, Any]]) -> None:
+        assert self._dataset_writer is not None
+        self._dataset_writer.close(self.data, metadata)
+        target = Path(filename)
+        if not target.name.endswith(".zarr.zip"):
+            target = target.with_name(target.name + ".zarr.zip")
+        if self._dataset_writer.path.resolve() != target.resolve():
+            shutil.move(self._dataset_writer.path, target)
+        self._dataset_writer = None
+        logging.info(f"Saved data to {target}".ljust(65, ".") + "[done]")
+        # All data is in the container now, the backing file
+        # was only scratch space.
+        self._discard_data()
+
+    def _discard_data(self) -> None:
+        if isinstance(self.data, np.memmap):
+            backing_file = self.data.filename
+            assert backing_file is not None
+            del self.data
+            os.remove(backing_file)
+
+    def close(self) -> None:
+        """
+        Wait for all pending data chunks to be written and release
+        spare buffers.
         """
-        np.save(filename, self.data)
+        if self._chunk_writer is None:
+            return
+        spares = self._chunk_writer.close()
+        self._chunk_writer = None
+        while spares:
+            spare = spares.pop()
+            if isinstance(spare, np.memmap):
+                backing_file = spare.filename
+                assert backing_file is not None
+                del spare
+                os.remove(backing_file)
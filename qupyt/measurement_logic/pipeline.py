@@ -0,0 +1,159 @@
+"""
+Pipelined hand-off between data acquisition and data reduction.
+
+The sensor and the :class:`Data` container normally take turns: the
+camera sits idle while the last batch of frames is reduced on the CPU.
+The :class:`AcquisitionPipeline` moves the reduction onto a worker
+thread, so batch N is accumulated while batch N+1 is being grabbed.
+"""
+
+import logging
+import threading
+from queue import Queue
+from time import perf_counter
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from qupyt.measurement_logic.data_handling import Data
+
+_STOP = None
+
+
+class AcquisitionPipeline:
+    """
+    Bounded producer/consumer hand-off between the measurement loop and
+    a worker thread calling :meth:`Data.update_data`.
+
+    :param data_container: Data container frames are accumulated into.
+    :type data_container: Data
+    :param buffers: Number of frame stacks alive at the same time.
+     2 gives a double-buffered hand-off (one stack grabbed, one reduced),
+     3 a triple-buffered one that tolerates jitter in the reduction time.
+    :type buffers: int
+    """
+
+    def __init__(self, data_container: Data, buffers: int = 2) -> None:
+        if buffers < 2:
+            raise ValueError(
+                f"A pipelined acquisition needs at least 2 buffers, got {buffers}"
+            )
+        self.data_container = data_container
+        self.buffers = int(buffers)
+        # One stack is always held by the sensor, the rest may wait here.
+        self._queue: Queue[Optional[Tuple[str, Tuple[Any, ...]]]] = Queue(
+            maxsize=self.buffers - 1
+        )
+        self._exception: Optional[BaseException] = None
+        self.reduction_time: float = 0.0
+        self.blocked_time: float = 0.0
+        self.drain_time: float = 0.0
+        self.batches: int = 0
+        self._worker = threading.Thread(
+            target=self._work, name="qupyt-data-reduction", daemon=True
+        )
+        self._worker.start()
+        logging.info(
+            f"Started pipelined acquisition with {self.buffers} buffers".ljust(65, ".")
+            + "[done]"
+        )
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                if self._exception is not None:
+                    continue
+                kind, args = item
+                if kind == "finish_step":
+                    self.data_container.finish_step(*args)
+                    continue
+                time_1 = perf_counter()
+                self.data_container.update_data(*args)
+                self.reduction_time += perf_counter() - time_1
+                self.batches += 1
+            except BaseException as exc:  # pylint: disable=broad-except
+                logging.exception("Data reduction failed in pipeline worker")
+                self._exception = exc
+            finally:
+                self._queue.task_done()
+
+    def _raise_worker_exception(self) -> None:
+        if self._exception is not None:
+            raise RuntimeError("Data reduction failed in pipeline worker") from (
+                self._exception
+            )
+
+    def submit(
+        self, data: np.ndarray, ps_step: int, dynamic_step: int, avg_step: int
+    ) -> None:
+        """
+        Hand a freshly acquired frame stack to the worker thread.
+        Blocks only if all buffers are in use, i.e. when the reduction
+        is slower than the acquisition.
+        """
+        self._raise_worker_exception()
+        time_1 = perf_counter()
+        self._queue.put(("update", (data, ps_step, dynamic_step, avg_step)))
+        self.blocked_time += perf_counter() - time_1
+
+    def finish_step(
+        self, ps_step: int, dynamic_step: int, metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Queue :meth:`Data.finish_step` behind all stacks submitted so far,
+        so it only sees the step once it is fully accumulated.
+        """
+        self._raise_worker_exception()
+        self._queue.put(("finish_step", (ps_step, dynamic_step, metadata)))
+
+    def join(self) -> None:
+        """
+        Wait until every submitted stack has been accumulated.
+        Re-raises any exception that occured in the worker thread.
+        """
+        time_1 = perf_counter()
+        self._queue.join()
+        self.drain_time += perf_counter() - time_1
+        self._raise_worker_exception()
+
+    def close(self) -> None:
+        """
+        Drain the queue and stop the worker thread.
+        """
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join()
+        logging.info(
+            f"Pipelined acquisition recovered {self.recovered_dead_time:.3f} s".ljust(
+                65, "."
+            )
+            + "[done]"
+        )
+
+    @property
+    def recovered_dead_time(self) -> float:
+        """
+        Reduction time that overlapped with acquisition, in seconds.
+        Sequentially, every second spent in :meth:`Data.update_data` would
+        have been dead time for the sensor. Only the time the measurement
+        loop spent waiting for a free buffer or for the final drain is lost.
+        """
+        return max(self.reduction_time - self.blocked_time - self.drain_time, 0.0)
+
+    def report(self) -> Dict[str, float]:
+        """
+        :return: Timing summary of the pipeline, suitable for the
+         measurement metadata.
+        :rtype: Dict[str, float]
+        """
+        return {
+            "buffers": self.buffers,
+            "batches": self.batches,
+            "reduction_time": round(self.reduction_time, 6),
+            "blocked_time": round(self.blocked_time, 6),
+            "drain_time": round(self.drain_time, 6),
+            "recovered_dead_time": round(self.recovered_dead_time, 6),
+        }
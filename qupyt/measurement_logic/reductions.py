@@ -0,0 +1,282 @@
+"""
+Per frame reduction stages applied to the data before accumulation.
+
+Stages are declared as a list in the ``data`` block of the instruction
+file and applied in order, e.g.::
+
+    reductions:
+      - type: 'bin'
+        factor: 2
+      - type: 'mask'
+        mask: 'pixel_mask.npy'
+
+Every stage takes a frame stack of shape ``[number_frames, *roi]`` and
+returns ``[number_frames, *reduced_roi]``. Results are written into a
+buffer that is reused for all following stacks of the same shape.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from qupyt.mixins import ConfigurationMixin, UpdateConfigurationType, ConfigurationError
+
+REDUCTION_TYPES = ["bin", "mask", "weighted_sums"]
+
+
+def _load_array(value: Union[str, List[Any], np.ndarray]) -> np.ndarray:
+    if isinstance(value, str):
+        return np.asarray(np.load(value))
+    return np.asarray(value)
+
+
+class ReductionFactory:
+    """
+    Creates reduction stages from their configuration dictionaries.
+
+    Example:
+        >>> stage = ReductionFactory.create_stage({'type': 'bin', 'factor': 4})
+    """
+
+    @staticmethod
+    def create_stage(configuration: Dict[str, Any]) -> "ReductionStage":
+        """
+        :param configuration: Stage configuration. The 'type' key selects
+         the stage, all other keys configure it.
+        :type configuration: dict
+        :return: Instance of the requested reduction stage.
+        :rtype: ReductionStage
+        :raises ConfigurationError:
+        """
+        stage_configuration = dict(configuration)
+        stage_type = stage_configuration.pop("type", None)
+        if stage_type == "bin":
+            return Binning(stage_configuration)
+        if stage_type == "mask":
+            return PixelMask(stage_configuration)
+        if stage_type == "weighted_sums":
+            return WeightedSums(stage_configuration)
+        raise ConfigurationError("reductions type", stage_type, REDUCTION_TYPES)
+
+    @staticmethod
+    def create_chain(configurations: List[Dict[str, Any]]) -> List["ReductionStage"]:
+        """
+        :param configurations: List of stage configurations, applied in order.
+        :type configurations: list[dict]
+        :rtype: list[ReductionStage]
+        """
+        return [ReductionFactory.create_stage(config) for config in configurations]
+
+
+class ReductionStage(ABC, ConfigurationMixin):
+    """
+    Abstract Base Class for all reduction stages.
+    """
+
+    attribute_map: UpdateConfigurationType
+
+    def __init__(self) -> None:
+        self._output: Optional[np.ndarray] = None
+
+    def _output_buffer(self, shape: List[int], dtype: np.dtype) -> np.ndarray:
+        if (
+            self._output is None
+            or list(self._output.shape) != list(shape)
+            or self._output.dtype != dtype
+        ):
+            self._output = np.empty(shape, dtype=dtype)
+        return self._output
+
+    @abstractmethod
+    def output_shape(self, roi_shape: List[int]) -> List[int]:
+        """
+        :param roi_shape: Shape of a single input frame.
+        :type roi_shape: list[int]
+        :return: Shape of a single reduced frame.
+        :rtype: list[int]
+        :raises ValueError: If the stage cannot be applied to frames
+         of this shape.
+        """
+
+    @abstractmethod
+    def output_dtype(self, dtype: np.dtype) -> np.dtype:
+        """
+        :param dtype: Data type of the input frames.
+        :type dtype: np.dtype
+        :return: Data type of the reduced frames.
+        :rtype: np.dtype
+        """
+
+    def summed_pixels(self, roi_shape: List[int]) -> int:
+        """
+        :param roi_shape: Shape of a single input frame.
+        :type roi_shape: list[int]
+        :return: Number of input pixels summed into one reduced pixel.
+         Integer accumulators need this many times more headroom.
+        :rtype: int
+        """
+        return 1
+
+    @abstractmethod
+    def apply(self, frames: np.ndarray) -> np.ndarray:
+        """
+        :param frames: Frame stack of shape ``[number_frames, *roi]``.
+        :type frames: np.ndarray
+        :return: Reduced stack of shape ``[number_frames, *reduced_roi]``.
+         The returned array is reused by the next call.
+        :rtype: np.ndarray
+        """
+
+
+class Binning(ReductionStage):
+    """
+    Bins k x k pixels (or k pixels for 1D sensors) into one.
+    Pixels that do not fill a complete bin at the edges are dropped.
+
+    Possible configuration values:
+        - **factor** (int | list[int]): Bin size, either for all axes
+          or per axis.
+        - **mode** (str): 'sum' (default) or 'mean'.
+    """
+
+    def __init__(self, configuration: Dict[str, Any]) -> None:
+        super().__init__()
+        self.factor: Union[int, List[int]] = 2
+        self.mode: str = "sum"
+        self.attribute_map = {
+            "factor": self._set_factor,
+            "mode": self._set_mode,
+        }
+        self._update_from_configuration(configuration)
+
+    def _set_factor(self, factor: Union[int, List[int]]) -> None:
+        self.factor = factor
+
+    def _set_mode(self, mode: str) -> None:
+        if mode not in ["sum", "mean"]:
+            raise ConfigurationError("bin mode", mode, ["sum", "mean"])
+        self.mode = mode
+
+    def _factors(self, ndim: int) -> List[int]:
+        if isinstance(self.factor, int):
+            return [self.factor] * ndim
+        if len(self.factor) != ndim:
+            raise ValueError(
+                f"Got {len(self.factor)} bin factors for frames with {ndim} axes."
+            )
+        return [int(factor) for factor in self.factor]
+
+    def output_shape(self, roi_shape: List[int]) -> List[int]:
+        return [
+            size // factor
+            for size, factor in zip(roi_shape, self._factors(len(roi_shape)))
+        ]
+
+    def summed_pixels(self, roi_shape: List[int]) -> int:
+        if self.mode == "mean":
+            return 1
+        return int(np.prod(self._factors(len(roi_shape))))
+
+    def output_dtype(self, dtype: np.dtype) -> np.dtype:
+        if self.mode == "mean" or np.dtype(dtype).kind == "f":
+            return np.dtype(float)
+        # Sums of small integer types would overflow.
+        return np.promote_types(dtype, np.uint32 if np.dtype(dtype).kind == "u" else np.int64)
+
+    def apply(self, frames: np.ndarray) -> np.ndarray:
+        roi_shape = list(frames.shape[1:])
+        factors = self._factors(len(roi_shape))
+        binned_shape = self.output_shape(roi_shape)
+        crop = (slice(None),) + tuple(
+            slice(0, size * factor) for size, factor in zip(binned_shape, factors)
+        )
+        split_shape = [frames.shape[0]]
+        for size, factor in zip(binned_shape, factors):
+            split_shape += [size, factor]
+        output = self._output_buffer(
+            [frames.shape[0], *binned_shape], self.output_dtype(frames.dtype)
+        )
+        np.add.reduce(
+            frames[crop].reshape(split_shape),
+            axis=tuple(range(2, len(split_shape), 2)),
+            dtype=output.dtype,
+            out=output,
+        )
+        if self.mode == "mean":
+            output /= np.prod(factors)
+        return output
+
+
+class PixelMask(ReductionStage):
+    """
+    Keeps only the pixels selected by a boolean mask, flattening each
+    frame to ``[number_selected_pixels]``.
+
+    Possible configuration values:
+        - **mask** (str | list): Boolean array of the frame shape, or the
+          path to a .npy file holding it.
+    """
+
+    def __init__(self, configuration: Dict[str, Any]) -> None:
+        super().__init__()
+        self.mask: np.ndarray
+        self._indices: np.ndarray
+        self.attribute_map = {"mask": self._set_mask}
+        self._update_from_configuration(configuration)
+
+    def _set_mask(self, mask: Union[str, List[Any]]) -> None:
+        self.mask = _load_array(mask).astype(bool)
+        self._indices = np.flatnonzero(self.mask)
+
+    def output_shape(self, roi_shape: List[int]) -> List[int]:
+        if list(self.mask.shape) != list(roi_shape):
+            raise ValueError(
+                f"Mask of shape {list(self.mask.shape)} does not match frames of shape {list(roi_shape)}."
+            )
+        return [len(self._indices)]
+
+    def output_dtype(self, dtype: np.dtype) -> np.dtype:
+        return np.dtype(dtype)
+
+    def apply(self, frames: np.ndarray) -> np.ndarray:
+        output = self._output_buffer([frames.shape[0], len(self._indices)], frames.dtype)
+        np.take(frames.reshape(frames.shape[0], -1), self._indices, axis=1, out=output)
+        return output
+
+
+class WeightedSums(ReductionStage):
+    """
+    Reduces each frame to a handful of weighted pixel sums, e.g. the
+    integrated signal of several regions of interest.
+
+    Possible configuration values:
+        - **weights** (str | list): Array of shape ``[number_sums, *roi]``,
+          or the path to a .npy file holding it.
+    """
+
+    def __init__(self, configuration: Dict[str, Any]) -> None:
+        super().__init__()
+        self.weights: np.ndarray
+        self._flat_weights: np.ndarray
+        self.attribute_map = {"weights": self._set_weights}
+        self._update_from_configuration(configuration)
+
+    def _set_weights(self, weights: Union[str, List[Any]]) -> None:
+        self.weights = _load_array(weights).astype(float)
+        self._flat_weights = self.weights.reshape(self.weights.shape[0], -1).T.copy()
+
+    def output_shape(self, roi_shape: List[int]) -> List[int]:
+        if list(self.weights.shape[1:]) != list(roi_shape):
+            raise ValueError(
+                f"Weights of shape {list(self.weights.shape)} do not match frames of shape {list(roi_shape)}."
+            )
+        return [self.weights.shape[0]]
+
+    def output_dtype(self, dtype: np.dtype) -> np.dtype:
+        return np.dtype(float)
+
+    def apply(self, frames: np.ndarray) -> np.ndarray:
+        output = self._output_buffer([frames.shape[0], self.weights.shape[0]], np.dtype(float))
+        np.matmul(frames.reshape(frames.shape[0], -1), self._flat_weights, out=output)
+        return output
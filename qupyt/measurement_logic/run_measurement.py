@@ -12,7 +12,10 @@ import yaml
 from tqdm import tqdm
 
 from qupyt.hardware.device_handler import DeviceHandler, DynamicDeviceHandler
+from qupyt.hardware.settle import wait_until_settled
 from qupyt.measurement_logic.data_handling import Data
+from qupyt.measurement_logic.pipeline import AcquisitionPipeline
+from qupyt.measurement_logic.timing import PhaseTimer
 from qupyt.hardware.synchronisers import Synchroniser
 from qupyt.hardware.sensors import Sensor
 from qupyt._version import __version__ as qupyt_version
@@ -25,53 +28,206 @@ def run_measurement(
     sensor: Sensor,
     synchroniser: Synchroniser,
     params: Dict[str, Any],
+    close_sensor: bool = True,
+    close_synchroniser: bool = True,
 ) -> str:
+    """
+    Run one measurement.
+
+    :param close_sensor: Close the sensor at the end of the measurement.
+     Pass False if the sensor is kept open for the following measurements,
+     see :class:`qupyt.hardware.device_handler.SensorHandler`.
+    :type close_sensor: bool
+    :param close_synchroniser: Close the synchroniser at the end of the
+     measurement. Pass False if it is kept open for the following
+     measurements, see
+     :class:`qupyt.hardware.device_handler.SynchroniserHandler`.
+    :type close_synchroniser: bool
+    :return: 'success' or 'failed'.
+    :rtype: str
+    """
     static_devices.set_all_params()
     iterator_size = int(params.get("dynamic_steps", 1))
     ps_iterator_size = int(params.get("pulse_sequence_steps", 1))
     mid = datetime.today().strftime("%Y-%m-%d-%H-%M-%S")
+    filename = params["experiment_type"] + "_" + mid
     return_status = "all_fail"
+    pipeline = None
+    timer = PhaseTimer()
+    averages = int(params["averages"])
+    # Averages recorded per trigger, with the sequence repeated in hardware.
+    averages_per_trigger = int(params.get("averages_per_trigger", 1))
+    number_measurements = sensor.number_measurements
     try:
         data_container = Data(params["data"])
-        data_container.set_dims_from_sensor(sensor)
+        if averages % averages_per_trigger != 0:
+            raise ValueError(
+                f"averages ({averages}) has to be divisible by averages_per_trigger ({averages_per_trigger})."
+            )
+        if averages_per_trigger > 1:
+            sensor.set_number_measurements(number_measurements * averages_per_trigger)
+            synchroniser.set_sequence_repeats(averages_per_trigger)
+        data_container.set_averages_per_trigger(averages_per_trigger)
+        data_container.set_dims_from_sensor(sensor, averages)
+        data_container.set_output_name(filename)
         data_container.create_array()
+        if params.get("pipelined_acquisition", False):
+            pipeline = AcquisitionPipeline(
+                data_container, int(params.get("pipeline_buffers", 2))
+            )
 
-        for ps_itervalue in tqdm(range(ps_iterator_size)):
-            synchroniser.open()
-            synchroniser.stop()
-            synchroniser.load_sequence(get_seq_dir() / f"sequence_{ps_itervalue}.yaml")
-            synchroniser.run()
-            sleep(0.1)
-            sensor.open()
-            sleep(0.5)
-            for itervalue in tqdm(range(iterator_size), leave=(ps_itervalue == ps_iterator_size - 1)):
-                dynamic_devices.next_dynamic_step()
-                sleep(0.1)
-                for avg in tqdm(
-                        range(int(params["averages"])),
-                        leave=(itervalue == (iterator_size - 1)) and (ps_itervalue == (ps_iterator_size - 1)),
-                ):
+        ps_yaml_files = [
+            get_seq_dir() / f"sequence_{ps_step}.yaml"
+            for ps_step in range(ps_iterator_size)
+        ]
+        with timer.phase("precompile_sequences"):
+            synchroniser.precompile_sequences(
+                ps_yaml_files, params.get("precompile_workers")
+            )
+
+        interleave = bool(params.get("interleave_pulse_sequences", False))
+        preloaded = False
+        if params.get("preload_pulse_sequences", False) or interleave:
+            with timer.phase("synchroniser_open"):
+                synchroniser.ensure_open()
+            with timer.phase("preload_sequences"):
+                preloaded = synchroniser.preload_sequences(ps_yaml_files)
+            if interleave and not preloaded:
+                raise ValueError(
+                    f"interleave_pulse_sequences needs a synchroniser that can preload sequences, got {synchroniser}."
+                )
+
+        def start_sequence(ps_itervalue: int, itervalue: int = -1, avg: int = -1) -> None:
+            with timer.phase("synchroniser_open", ps_itervalue, itervalue, avg):
+                synchroniser.ensure_open()
+            with timer.phase("synchroniser_stop", ps_itervalue, itervalue, avg):
+                synchroniser.stop()
+            if preloaded:
+                with timer.phase("select_sequence", ps_itervalue, itervalue, avg):
+                    synchroniser.select_sequence(ps_itervalue)
+            else:
+                with timer.phase("load_sequence", ps_itervalue, itervalue, avg):
+                    synchroniser.load_sequence(ps_yaml_files[ps_itervalue])
+            with timer.phase("synchroniser_run", ps_itervalue, itervalue, avg):
+                synchroniser.run()
+            synchroniser.mark_touched()
 
-                    sleep(float(params.get("sleep", 0)))
-                    data = sensor.acquire_data(synchroniser)
+        def acquire(ps_itervalue: int, itervalue: int, avg: int) -> None:
+            with timer.phase("sleep", ps_itervalue, itervalue, avg):
+                sleep(float(params.get("sleep", 0)))
+            with timer.phase("acquire_data", ps_itervalue, itervalue, avg):
+                data = sensor.acquire_data(synchroniser)
+            if pipeline is not None:
+                with timer.phase("submit", ps_itervalue, itervalue, avg):
+                    pipeline.submit(data, ps_itervalue, itervalue, avg)
+            else:
+                with timer.phase("update_data", ps_itervalue, itervalue, avg):
                     data_container.update_data(data, ps_itervalue, itervalue, avg)
+
+        def finish_step(ps_itervalue: int, itervalue: int) -> None:
+            step_metadata = {
+                "finished": datetime.now().isoformat(),
+                "averages": averages,
+            }
+            with timer.phase("finish_step", ps_itervalue, itervalue):
+                if pipeline is not None:
+                    pipeline.finish_step(ps_itervalue, itervalue, step_metadata)
+                else:
+                    data_container.finish_step(ps_itervalue, itervalue, step_metadata)
+
+        if interleave:
+            # All pulse sequence steps are played within every average
+            # of every dynamic step, so slow drifts affect all steps alike.
+            with timer.phase("sensor_open"):
+                sensor.open()
+            sensor.mark_touched()
+            current_sequence = None
+            for itervalue in tqdm(range(iterator_size)):
+                with timer.phase("next_dynamic_step", -1, itervalue):
+                    dynamic_devices.next_dynamic_step()
+                with timer.phase("dynamic_step_settle", -1, itervalue):
+                    dynamic_devices.wait_until_settled()
+                for avg in tqdm(
+                        range(averages // averages_per_trigger),
+                        leave=itervalue == (iterator_size - 1),
+                ):
+                    for ps_itervalue in range(ps_iterator_size):
+                        if ps_itervalue != current_sequence:
+                            start_sequence(ps_itervalue, itervalue, avg)
+                            current_sequence = ps_itervalue
+                        with timer.phase("settle", ps_itervalue, itervalue, avg):
+                            wait_until_settled([synchroniser, sensor])
+                        acquire(ps_itervalue, itervalue, avg)
+                for ps_itervalue in range(ps_iterator_size):
+                    finish_step(ps_itervalue, itervalue)
             dynamic_devices.current_dynamic_step = 0
+        else:
+            for ps_itervalue in tqdm(range(ps_iterator_size)):
+                start_sequence(ps_itervalue)
+                with timer.phase("sensor_open", ps_itervalue):
+                    sensor.open()
+                sensor.mark_touched()
+                # Synchroniser and sensor settle concurrently.
+                with timer.phase("settle", ps_itervalue):
+                    wait_until_settled([synchroniser, sensor])
+                for itervalue in tqdm(range(iterator_size), leave=(ps_itervalue == ps_iterator_size - 1)):
+                    with timer.phase("next_dynamic_step", ps_itervalue, itervalue):
+                        dynamic_devices.next_dynamic_step()
+                    with timer.phase("dynamic_step_settle", ps_itervalue, itervalue):
+                        dynamic_devices.wait_until_settled()
+                    for avg in tqdm(
+                            range(averages // averages_per_trigger),
+                            leave=(itervalue == (iterator_size - 1)) and (ps_itervalue == (ps_iterator_size - 1)),
+                    ):
+                        acquire(ps_itervalue, itervalue, avg)
+                    finish_step(ps_itervalue, itervalue)
+                dynamic_devices.current_dynamic_step = 0
+        if pipeline is not None:
+            with timer.phase("pipeline_drain"):
+                pipeline.join()
         return_status = "success"
     except Exception as e:
         print(f"exc {e}")
         logging.exception("An error occured during the measurement!")
         return_status = "failed"
     finally:
-        sensor.close()
-        synchroniser.close()
+        if pipeline is not None:
+            pipeline.close()
+            params["pipeline"] = pipeline.report()
+        if averages_per_trigger > 1:
+            sensor.set_number_measurements(number_measurements)
+            synchroniser.set_sequence_repeats(1)
+        if close_sensor:
+            sensor.close()
+        if close_synchroniser:
+            synchroniser.ensure_closed()
         print("sensor closed")
-        params["filename"] = params["experiment_type"] + "_" + mid
+        params["filename"] = filename
         params["measurement_status"] = return_status
         params["qupyt_version"] = qupyt_version
+        params["timing"] = timer.summary()
 
-        data_container.save(params["filename"])
+        try:
+            data_container.close()
+        except Exception:
+            # Still save the final accumulator and the parameters below.
+            logging.exception(
+                "Writing the measurement data chunks failed".ljust(65, ".")
+                + "[failed]"
+            )
+            return_status = "failed"
+            params["measurement_status"] = return_status
+        data_container.save(params["filename"], params)
         with open(params["filename"] + ".yaml", "w", encoding="utf-8") as file:
             yaml.dump(params, file)
+        try:
+            timer.write_csv(params["filename"] + "_timing.csv")
+        except Exception:
+            # Timing is diagnostics only, the data is saved already.
+            logging.exception(
+                "Writing the timing of the measurement failed".ljust(65, ".")
+                + "[failed]"
+            )
         del data_container
         gc.collect()
     return return_status
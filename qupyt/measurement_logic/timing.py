@@ -0,0 +1,107 @@
+"""
+Lightweight timing of the phases of the measurement loop.
+
+Every phase (opening the synchroniser, acquiring data, waiting, ...)
+is timed with the monotonic :func:`time.perf_counter` clock and kept as
+one row in memory. At the end of a measurement the rows are written to
+a CSV file next to the data, and a summary with percentiles is added
+to the metadata.
+"""
+
+import csv
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+TIMING_COLUMNS = ["phase", "ps_step", "dynamic_step", "avg_step", "start", "duration"]
+
+
+class PhaseTimer:
+    """
+    Records the duration of named phases of the measurement loop.
+
+    Example:
+        >>> timer = PhaseTimer()
+        >>> with timer.phase("acquire_data", ps_step=0, dynamic_step=3, avg_step=1):
+        ...     data = sensor.acquire_data(synchroniser)
+    """
+
+    def __init__(self) -> None:
+        self.records: List[Tuple[str, int, int, int, float, float]] = []
+        self._start = perf_counter()
+        self._stop = self._start
+
+    @contextmanager
+    def phase(
+        self, name: str, ps_step: int = -1, dynamic_step: int = -1, avg_step: int = -1
+    ) -> Iterator[None]:
+        """
+        Time the enclosed block. Steps that do not apply to a phase
+        are recorded as -1.
+        """
+        time_1 = perf_counter()
+        try:
+            yield
+        finally:
+            time_2 = perf_counter()
+            self.records.append(
+                (name, ps_step, dynamic_step, avg_step, time_1 - self._start, time_2 - time_1)
+            )
+            self._stop = time_2
+
+    @property
+    def wall_time(self) -> float:
+        """
+        Time from creating the timer to the end of the last recorded phase.
+        """
+        return self._stop - self._start
+
+    def durations(self, name: str) -> np.ndarray:
+        """
+        :return: All recorded durations of a phase in seconds.
+        :rtype: np.ndarray
+        """
+        return np.array([record[5] for record in self.records if record[0] == name])
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        :return: Count, total and percentiles (in seconds) per phase,
+         the wall time and the duty cycle, i.e. the fraction of the
+         wall time spent in ``acquire_data``.
+        :rtype: Dict[str, Any]
+        """
+        phases: Dict[str, Dict[str, float]] = {}
+        for name in dict.fromkeys(record[0] for record in self.records):
+            durations = self.durations(name)
+            p50, p90, p99 = np.percentile(durations, [50, 90, 99])
+            phases[name] = {
+                "count": int(durations.size),
+                "total": round(float(durations.sum()), 6),
+                "p50": round(float(p50), 6),
+                "p90": round(float(p90), 6),
+                "p99": round(float(p99), 6),
+                "max": round(float(durations.max()), 6),
+            }
+        acquisition = phases.get("acquire_data", {}).get("total", 0.0)
+        return {
+            "wall_time": round(self.wall_time, 6),
+            "duty_cycle": round(acquisition / self.wall_time, 6) if self.wall_time > 0 else 0.0,
+            "phases": phases,
+        }
+
+    def write_csv(self, filename: str) -> None:
+        """
+        Write one row per recorded phase.
+
+        :param filename: Name of the CSV file.
+        :type filename: str
+        """
+        with open(filename, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(TIMING_COLUMNS)
+            for name, ps_step, dynamic_step, avg_step, start, duration in self.records:
+                writer.writerow(
+                    [name, ps_step, dynamic_step, avg_step, f"{start:.9f}", f"{duration:.9f}"]
+                )
@@ -1,12 +1,18 @@
 import logging
 import pickle
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import hashlib
 from pathlib import Path
 import numpy as np
 from termcolor import colored
-import yaml
 from qupyt.set_up import get_seq_dir
+from qupyt.pulse_sequences import sequence_cache
+from qupyt.pulse_sequences.compiled_sequence import (
+    PICOSECONDS_PER_MICROSECOND,
+    CompiledSequence,
+    load_compiled_sequence,
+    to_microseconds,
+)
 
 
 class PulseSequenceYaml:
@@ -27,63 +33,157 @@ class PulseSequenceYaml:
         self.channel_mapping = channel_mapping
         self.samp_rate = float(samprate)  # samples per second
 
-    def _sequence_didnt_change(self) -> bool:
-        with open(self.yaml_file, "r", encoding="utf-8") as file:
-            sequence_instructions = yaml.safe_load(file)
-        try:
-            with open(
-                self.yaml_file.with_suffix(".aux"), "r", encoding="utf-8"
-            ) as file:
-                previous_sequence_instructions = yaml.safe_load(file)
-            with open(
-                self.yaml_file.with_suffix(".aux"), "w", encoding="utf-8"
-            ) as file:
-                yaml.dump(sequence_instructions, file)
-            return previous_sequence_instructions == sequence_instructions
-        except FileNotFoundError:
-            with open(
-                self.yaml_file.with_suffix(".aux"), "w", encoding="utf-8"
-            ) as file:
-                yaml.dump(sequence_instructions, file)
-            return False
-
-    def translate_yaml_to_numeric_instructions(self) -> None:
-        if self._sequence_didnt_change():
-            return
-        with open(self.yaml_file, "r", encoding="utf-8") as file:
-            sequence_instructions = yaml.safe_load(file)
-        sequence_order = sequence_instructions["sequencing_order"]
-        sequencing_repeats = sequence_instructions["sequencing_repeats"]
-        duration = float(sequence_instructions["total_duration"])
-        sorted_pulse_blocks = sorted(set(sequence_order))
+    def translate_yaml_to_numeric_instructions(self) -> Path:
+        """
+        Compile the YAML sequence into waveform records, or reuse them
+        from the compiled sequence cache.
+
+        :return: Path of the compiled sequence (.npz).
+        :rtype: Path
+        """
+        cache = sequence_cache.get_sequence_cache()
+        key = cache.key(
+            self.yaml_file,
+            backend="AWG",
+            samprate=self.samp_rate,
+            channel_mapping=self.channel_mapping,
+            awg_sources=list(self.awg_sources),
+        )
+        cached = cache.lookup(key, ".npz")
+        if cached is not None:
+            return cached
+        compiled_sequence = load_compiled_sequence(self.yaml_file)
         seq = PulseSequence(
-            len(sorted_pulse_blocks),
-            duration,
+            len(compiled_sequence.blocks),
+            to_microseconds(compiled_sequence.total_duration),
             self.awg_sources,
             samprate=self.samp_rate,
         )
         flag_channels: Dict[str, Any] = {}
-        for i, block in enumerate(sorted_pulse_blocks):
+        for i, block in enumerate(compiled_sequence.blocks):
             flag_channels[block] = []
-            for channel, pulses in sequence_instructions[block].items():
+            for channel in compiled_sequence.channels_of(block):
                 mapped_channel = self.channel_mapping[channel]
                 if isinstance(mapped_channel, str):
                     flag_channels[block].append(mapped_channel)
                     continue
-                for pulse in pulses.values():
+                for pulse in compiled_sequence.pulses_of(block, channel):
                     seq.add_pulse(
                         i,
-                        float(pulse["start"]),
-                        float(pulse["duration"]),
+                        to_microseconds(pulse["start"]),
+                        to_microseconds(pulse["stop"] - pulse["start"]),
                         channel=mapped_channel,
                         inputtype="time",
                         amplitude=float(pulse["amplitude"]),
                         freq=(float(pulse["frequency"]), float(pulse["phase"])),
                     )
         seq.flag_channels = pickle.dumps(flag_channels)
-        seq.sequencer = sequencing_repeats
-        seq.sequencernames = sequence_order
-        seq.make("sequence.npz")
+        seq.sequencer = compiled_sequence.repeats.tolist()
+        seq.sequencernames = compiled_sequence.sequencing_order
+        return cache.store(key, ".npz", seq.make)
+
+
+class PulseRecords:
+    """
+    Run length representation of the pulses of a sequence. Each record
+    holds one pulse (block, channel, first and last sample, amplitude,
+    frequency and phase). Waveforms are rendered one block and AWG source
+    at a time, so memory scales with the longest single waveform rather
+    than with the whole sequence.
+
+    Channels are numbered as in :class:`PulseSequence`, five per source:
+    the analog channel followed by markers 1 to 4.
+    """
+
+    record_dtype = np.dtype(
+        [
+            ("block", np.int64),
+            ("channel", np.int64),
+            ("first", np.int64),
+            ("last", np.int64),
+            ("amplitude", np.float64),
+            ("frequency", np.float64),
+            ("phase", np.float64),
+        ]
+    )
+
+    def __init__(
+        self,
+        records: np.ndarray,
+        num_points: int,
+        duration: float,
+        number_sources: int,
+    ) -> None:
+        self.records = records
+        self.num_points = int(num_points)
+        self.duration = float(duration)
+        self.number_sources = int(number_sources)
+
+    @classmethod
+    def from_npz(cls, block: Any) -> "PulseRecords":
+        """
+        :param block: Sequence file as loaded with np.load, see
+         :meth:`PulseSequence.make`.
+        """
+        num_points, duration, number_sources = block["arr_6"]
+        return cls(block["arr_0"], num_points, duration, number_sources)
+
+    def geometry(self) -> np.ndarray:
+        return np.array([self.num_points, self.duration, self.number_sources])
+
+    def tobytes(self) -> bytes:
+        return self.records.tobytes() + self.geometry().tobytes()
+
+    def _time(self, first: int, last: int) -> np.ndarray:
+        """
+        Sample times in microseconds, identical to
+        np.linspace(0, duration, num_points)[first:last].
+        """
+        if self.num_points < 2:
+            return np.zeros(last - first)
+        step = self.duration / (self.num_points - 1)
+        time = np.arange(first, last) * step
+        if last == self.num_points and last > first:
+            time[-1] = self.duration
+        return time
+
+    def _render_channel(self, block: int, channel: int, out: np.ndarray) -> None:
+        selected = self.records[
+            (self.records["block"] == block) & (self.records["channel"] == channel)
+        ]
+        # Later pulses overwrite earlier ones.
+        for record in selected:
+            first, last = int(record["first"]), int(record["last"])
+            out[first:last] = record["amplitude"] * np.cos(
+                2 * np.pi * record["frequency"] * self._time(first, last)
+                + record["phase"]
+            )
+
+    def render(
+        self, block: int, source_index: int, dtype: Any = np.float32
+    ) -> np.ndarray:
+        """
+        Render the waveform of one block and AWG source.
+
+        :param block: Index of the sequence block.
+        :type block: int
+        :param source_index: Index of the source in the AWG source list.
+        :type source_index: int
+        :param dtype: Data type of the returned samples.
+        :return: Array of shape [2, num_points]. Row 0 is the analog
+         signal, row 1 the marker byte with marker 1 to 4 in bits 7 to 4.
+        :rtype: np.ndarray
+        """
+        waveform = np.zeros((2, self.num_points), dtype=dtype)
+        self._render_channel(block, 5 * source_index, waveform[0])
+        marker_byte = np.zeros(self.num_points)
+        marker = np.empty(self.num_points)
+        for marker_index in range(1, 5):
+            marker[:] = 0
+            self._render_channel(block, 5 * source_index + marker_index, marker)
+            marker_byte += marker * 2 ** (8 - marker_index)
+        waveform[1] = marker_byte
+        return waveform
 
 
 class PulseSequence:
@@ -98,7 +198,7 @@ class PulseSequence:
         self.min_time = 1 / samprate
         points = samprate * duration * 1e-6
         self.num_points = int(round(points))
-        self.time = np.linspace(0, duration, self.num_points)  # in microseconds
+        self.duration = duration  # in microseconds
         self.numseqs = numseqs
         self.awg_sources = awg_sources
 
@@ -120,9 +220,11 @@ class PulseSequence:
             )
 
         #  5 => 1 for analog, 4 for 8 bit marker.
-        self.pulses = np.zeros((numseqs, 5 * len(self.awg_sources), self.num_points))
-        self.sequencer = None
-        self.sequencernames = None
+        #  Pulses are kept as run length records and only rendered
+        #  to samples when a waveform is uploaded, see PulseRecords.
+        self.records: List[Tuple[int, int, int, int, float, float, float]] = []
+        self.sequencer: Optional[List[int]] = None
+        self.sequencernames: Optional[List[str]] = None
         self.flag_channels: Any
         self.warning_counter = 0
         self.properties = {"Values": "None"}
@@ -184,172 +286,219 @@ class PulseSequence:
         if freq is not None:
             frequency, phase = freq
             frequency *= 10**-6
-            fr = np.cos(
-                2 * np.pi * frequency * self.time[int(start) : int(start + duration)]
-                + phase
-            )
         else:
-            fr = 1
+            frequency, phase = 0.0, 0.0
         try:
-            self.pulses[
-                numseq[0] : numseq[1], channel, int(start) : int(start + duration)
-            ] = (amplitude * fr)
-        except Exception:
-            self.pulses[numseq, channel, int(start) : int(start + duration)] = (
-                amplitude * fr
+            blocks = range(*slice(numseq[0], numseq[1]).indices(self.numseqs))
+        except TypeError:
+            blocks = range(numseq, numseq + 1)
+        first, last, _ = slice(int(start), int(start + duration)).indices(
+            self.num_points
+        )
+        for block in blocks:
+            self.records.append(
+                (block, channel, first, last, amplitude, frequency, phase)
             )
 
-    def make(self, name: str) -> None:
+    def make(self, path: Path) -> None:
         logging.info(
             f"There where {self.warning_counter} warnings in PS generation".ljust(
                 65, "."
             )
             + "[done]"
         )
-        final = np.zeros((self.numseqs, 2 * len(self.awg_sources), self.num_points))
-        for source_index, source in enumerate(self.awg_sources):
-            final[:, 2 * source_index, :] = self.pulses[:, 5 * source_index, :]
-            final[:, 2 * source_index + 1, :] = (
-                self.pulses[:, 5 * source_index + 1, :] * 2**7
-                + self.pulses[:, 5 * source_index + 2, :] * 2**6
-                + self.pulses[:, 5 * source_index + 3, :] * 2**5
-                + self.pulses[:, 5 * source_index + 4, :] * 2**4
-            )
+        assert self.sequencer is not None and self.sequencernames is not None
+        records = PulseRecords(
+            np.array(self.records, dtype=PulseRecords.record_dtype),
+            self.num_points,
+            self.duration,
+            len(self.awg_sources),
+        )
 
-        hash1 = hashlib.sha1(final.tobytes()).hexdigest()
+        hash1 = hashlib.sha1(records.tobytes()).hexdigest()
         hash2 = hashlib.sha1(str(self.sequencer).encode("utf-8")).hexdigest()
         hash3 = hashlib.sha1(str(self.sequencernames).encode("utf-8")).hexdigest()
         hash4 = hash1 + hash2 + hash3
         finalhash = hashlib.sha1(hash4.encode("utf-8")).hexdigest()
 
-        file_dir = get_seq_dir()
         np.savez(
-            file_dir / name,
-            final,
+            path,
+            records.records,
             self.sequencer,
             self.sequencernames,
             finalhash,
             self.properties,
             self.flag_channels,
+            records.geometry(),
         )
-        logging.info(f"Pulse sequence written to {name}".ljust(65, ".") + "[done]")
+        logging.info(f"Pulse sequence written to {path}".ljust(65, ".") + "[done]")
 
 
 class PulseBlasterSequence:
+    """
+    Compile a pulse sequence into PulseBlaster instructions, i.e. pairs
+    of channel bit masks and the durations (in microseconds) for which
+    they are held.
+
+    Each block is compiled in one vectorized pass over its edges: the
+    rising and falling edges of all pulses are sorted by time, the bit
+    deltas of their channels are summed up, and coincident edges are
+    merged into one instruction.
+
+    :param channel_mapping: Channel name to output bit.
+    :type channel_mapping: Dict[str, Any]
+    :param yaml_file: Pulse sequence file.
+    :type yaml_file: Path
+    :param compiled_sequence: Parsed sequence to use instead of reading
+     ``yaml_file``.
+    :type compiled_sequence: Optional[CompiledSequence]
+    """
+
+    # Instruction codes of the PulseBlaster, see spinapi's Inst.
+    CONTINUE = 0
+    LOOP = 2
+    END_LOOP = 3
+    BRANCH = 6
+    #: Largest loop count of one LOOP instruction (20 bit data field).
+    MAX_LOOPS = 2**20 - 1
+
     def __init__(
         self,
         channel_mapping: Dict[str, Any],
         yaml_file: Path = get_seq_dir() / "sequence.yaml",
+        compiled_sequence: Optional[CompiledSequence] = None,
     ) -> None:
-        self.event_times: List[float] = []
-        self.event_durations: List[float] = []
-        self.event_channel: List[str] = []
-        self.events: List[str] = []
-        self.channel_bits: List[int] = []
-        self.segment_durations: List[float] = []
         self.channel_mapping = channel_mapping
         self.ps: Dict[str, Any] = {}
-        self.yaml_sequence: Dict[str, Any] = self._load_yaml_sequence(yaml_file)
-        self.total_duration = self.yaml_sequence["total_duration"]
-
-    def _load_yaml_sequence(self, path: Path) -> Dict[str, Any]:
-        with open(path, "r", encoding="utf-8") as file:
-            yaml_sequence = yaml.safe_load(file)
-        return yaml_sequence
+        if compiled_sequence is None:
+            compiled_sequence = load_compiled_sequence(yaml_file)
+        self.compiled_sequence: CompiledSequence = compiled_sequence
+        self.total_duration: Any = (
+            "ignore"
+            if self.compiled_sequence.total_duration is None
+            else to_microseconds(self.compiled_sequence.total_duration)
+        )
 
     def parse_pulse_sequence_file(self) -> None:
-        for block in self.yaml_sequence["sequencing_order"]:
-            self._parse_block(self.yaml_sequence[block])
-            self._sort_pulses()
-            self._get_event_durations()
-            self._compute_channel_bits()
+        channel_bits = np.array(
+            [
+                2 ** self.channel_mapping[channel]
+                for channel in self.compiled_sequence.channels
+            ],
+            dtype=np.int64,
+        )
+        for block in self.compiled_sequence.blocks:
+            bits, durations = self._compile_block(
+                self.compiled_sequence.pulses_of(block), channel_bits
+            )
             self.ps[block] = {
-                "channel_bits": self.channel_bits,
-                "durations": self.event_durations,
+                "channel_bits": bits.tolist(),
+                "durations": durations.tolist(),
             }
-            self._reset_attributes()
 
-    def compile(self) -> Tuple[List[int], List[float]]:
+    def compile(self) -> Tuple[List[int], List[float], List[int], List[int]]:
         """
         combines the individual sub seqeunces into one long sequence that
         can be uploaded to the pulse blaster card in one go.
+
+        Repeated blocks become hardware loops (LOOP on the first and
+        END_LOOP on the last instruction of the block), so the number of
+        instructions scales with the number of blocks rather than with
+        their repeats. A loop needs at least two instructions, so blocks
+        of a single instruction are looped in pairs. No instruction is
+        longer than in the block itself. The last instruction branches
+        back to the start of the program.
+
+        :return: Channel bit masks, durations (in microseconds),
+         instruction codes (as in spinapi's Inst) and instruction data.
+         END_LOOP and BRANCH data are instruction indices relative to
+         the first instruction of the program.
         """
-        channel_bits = []
-        bits_duration = []
-        sequencing_info = zip(
-            self.yaml_sequence["sequencing_order"],
-            self.yaml_sequence["sequencing_repeats"],
-        )
-        for sequence_block, block_repeats in sequencing_info:
-            channel_bits += self.ps[sequence_block]["channel_bits"] * block_repeats
-            bits_duration += self.ps[sequence_block]["durations"] * block_repeats
-
-        return channel_bits, bits_duration
-
-    def _reset_attributes(self) -> None:
-        self.event_times = []
-        self.event_durations = []
-        self.event_channel = []
-        self.events = []
-        self.channel_bits = []
-        self.segment_durations = []
-
-    def _append_event(self, channel: str, pulse: Dict[str, float]) -> None:
-        self.event_times.append(pulse["start"])
-        self.event_times.append(pulse["start"] + pulse["duration"])
-        self.event_channel.append(channel)
-        self.event_channel.append(channel)
-        self.events.append("up")
-        self.events.append("down")
-
-    def _parse_channel(self, channel: str, channel_pulses: Dict[str, Any]) -> None:
-        for pulse in channel_pulses.values():
-            self._append_event(channel, pulse)
-
-    def _parse_block(self, ps_block: Dict[str, Any]) -> None:
-        for channel, channel_pulses in ps_block.items():
-            self._parse_channel(channel, channel_pulses)
-
-    def _sort_pulses(self) -> None:
-        self.event_times, self.event_channel, self.events = zip(
-            *sorted(zip(self.event_times, self.event_channel, self.events))
-        )
+        channel_bits: List[int] = []
+        bits_duration: List[float] = []
+        instructions: List[int] = []
+        instruction_data: List[int] = []
 
-    def _get_event_durations(self) -> None:
-        self.event_durations = [
-            i - j for i, j in zip(self.event_times[1:], self.event_times[:-1])
-        ]
-        if self.total_duration == "ignore":
-            pass
-        elif self.event_times[-1] != self.total_duration:
-            self.event_durations.append(self.total_duration - self.event_times[-1])
-
-    def _event_to_sign(self, event: str) -> int:
-        if event == "up":
-            return 1
-        if event == "down":
-            return -1
-        raise ValueError(f'No event {event}, options are "up" or "down"')
-
-    def _compute_channel_bits(self) -> None:
-        for i, _ in enumerate(self.event_durations):
-            prev_val = self.channel_bits[-1] if self.channel_bits else 0
-            self.channel_bits.append(
-                prev_val
-                + 2 ** (self.channel_mapping[self.event_channel[i]])
-                * self._event_to_sign(self.events[i])
+        def emit(block_bits: List[int], durations: List[float], loops: int) -> None:
+            start = len(instructions)
+            channel_bits.extend(block_bits)
+            bits_duration.extend(durations)
+            instructions.extend([self.CONTINUE] * len(block_bits))
+            instruction_data.extend([0] * len(block_bits))
+            if loops > 1:
+                instructions[start] = self.LOOP
+                instruction_data[start] = loops
+                instructions[-1] = self.END_LOOP
+                instruction_data[-1] = start
+
+        def repeat(
+            block_bits: List[int], durations: List[float], repeats: int, is_last: bool
+        ) -> None:
+            # The last block ends with the BRANCH instruction,
+            # so its last repetition is not part of a loop.
+            loops = repeats - 1 if is_last else repeats
+            while loops > 0:
+                chunk = min(loops, self.MAX_LOOPS)
+                emit(block_bits, durations, chunk)
+                loops -= chunk
+            if is_last:
+                emit(block_bits, durations, 1)
+
+        sequencing_info = [
+            (sequence_block, block_repeats)
+            for sequence_block, block_repeats in zip(
+                self.compiled_sequence.sequencing_order,
+                self.compiled_sequence.repeats.tolist(),
             )
-        if self.event_times[0] != 0:
-            self.channel_bits.insert(0, 0)
-            self.event_durations.insert(0, self.event_times[0])
-        self._pop_uncessary_entries()
-
-    def _pop_uncessary_entries(self) -> None:
-        indices_to_pop = [
-            index
-            for index, duration in enumerate(self.event_durations)
-            if duration == 0
+            if block_repeats > 0 and self.ps[sequence_block]["channel_bits"]
         ]
-        for pop_index in indices_to_pop:
-            self.event_durations.pop(pop_index)
-            self.channel_bits.pop(pop_index)
+        for index, (sequence_block, block_repeats) in enumerate(sequencing_info):
+            block_bits = self.ps[sequence_block]["channel_bits"]
+            durations = self.ps[sequence_block]["durations"]
+            is_last = index == len(sequencing_info) - 1
+            if len(block_bits) > 1:
+                repeat(block_bits, durations, block_repeats, is_last)
+                continue
+            pairs, single = divmod(block_repeats, 2)
+            if pairs:
+                repeat(block_bits * 2, durations * 2, pairs, is_last and not single)
+            if single:
+                emit(block_bits, durations, 1)
+        if instructions:
+            instructions[-1] = self.BRANCH
+            instruction_data[-1] = 0
+        return channel_bits, bits_duration, instructions, instruction_data
+
+    def _compile_block(
+        self, pulses: np.ndarray, channel_bits: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param pulses: Pulses of one block, see :class:`CompiledSequence`.
+        :param channel_bits: Bit mask of every channel of the sequence.
+        :return: Channel bit mask of every instruction and its duration
+         in microseconds.
+        """
+        bits = channel_bits[pulses["channel"]]
+        times = np.concatenate((pulses["start"], pulses["stop"]))
+        deltas = np.concatenate((bits, -bits))
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        states = np.cumsum(deltas[order])
+        # Coincident edges form one instruction holding the state after
+        # the last of them.
+        last_of_group = np.ones(len(times), dtype=bool)
+        last_of_group[:-1] = times[1:] != times[:-1]
+        times = times[last_of_group]
+        states = states[last_of_group]
+
+        if len(times) == 0 or times[0] != 0:
+            times = np.concatenate(([0], times))
+            states = np.concatenate(([0], states))
+        total_duration = self.compiled_sequence.total_duration
+        if total_duration is None or times[-1] == total_duration:
+            # The last edge ends the block.
+            states = states[:-1]
+        else:
+            times = np.concatenate((times, [total_duration]))
+        durations = np.diff(times) / PICOSECONDS_PER_MICROSECOND
+        return states, durations
@@ -0,0 +1,218 @@
+"""
+Device independent representation of a YAML pulse sequence.
+
+The YAML file is parsed and quantized to integer picoseconds once.
+Every synchroniser lowers the resulting :class:`CompiledSequence` to its
+own instruction format (AWG waveforms, PulseStreamer patterns,
+PulseBlaster instructions), and the parsed sequence is kept in the
+compiled sequence cache, so alternating device types do not parse the
+file again.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import yaml
+
+from qupyt.pulse_sequences import sequence_cache
+
+PICOSECONDS_PER_MICROSECOND = 10**6
+
+
+def to_picoseconds(time: Any) -> int:
+    """
+    :param time: Time in microseconds, as written in the YAML file.
+    :return: Time in integer picoseconds.
+    :rtype: int
+    """
+    return int(round(float(time) * PICOSECONDS_PER_MICROSECOND))
+
+
+def to_microseconds(time: Any) -> float:
+    """
+    Inverse of :func:`to_picoseconds`. Times written with at most six
+    decimals in the YAML file come back as the identical float.
+
+    :param time: Time in integer picoseconds.
+    :rtype: float
+    """
+    return int(time) / PICOSECONDS_PER_MICROSECOND
+
+
+class CompiledSequence:
+    """
+    Columnar table of all pulses of a sequence, together with the
+    sequencing order and repeats of its blocks.
+
+    Each row of :attr:`pulses` is one pulse, i.e. the rising (``start``)
+    and falling (``stop``) edge of one channel in one block, in integer
+    picoseconds. Blocks and channels are stored as indices into
+    :attr:`blocks` and :attr:`channels`. Rows keep the order of the YAML
+    file.
+
+    :param pulses: Array of dtype :attr:`pulse_dtype`.
+    :param blocks: Names of the sequence blocks, sorted.
+    :param channels: Names of the channels, in order of appearance.
+    :param present: Boolean array [blocks, channels], True if the
+     channel is listed in the block, even without pulses.
+    :param order: Block indices in sequencing order.
+    :param repeats: Repetitions of each entry of ``order``.
+    :param total_duration: Duration of one block in picoseconds, or None
+     if the YAML file sets it to 'ignore'.
+    """
+
+    pulse_dtype = np.dtype(
+        [
+            ("block", np.int64),
+            ("channel", np.int64),
+            ("start", np.int64),
+            ("stop", np.int64),
+            ("amplitude", np.float64),
+            ("frequency", np.float64),
+            ("phase", np.float64),
+        ]
+    )
+
+    def __init__(
+        self,
+        pulses: np.ndarray,
+        blocks: List[str],
+        channels: List[str],
+        present: np.ndarray,
+        order: np.ndarray,
+        repeats: np.ndarray,
+        total_duration: Optional[int],
+    ) -> None:
+        self.pulses = pulses
+        self.blocks = list(blocks)
+        self.channels = list(channels)
+        self.present = present
+        self.order = np.asarray(order, dtype=np.int64)
+        self.repeats = np.asarray(repeats, dtype=np.int64)
+        self.total_duration = total_duration
+
+    @classmethod
+    def from_yaml(cls, yaml_file: Path) -> "CompiledSequence":
+        with open(yaml_file, "r", encoding="utf-8") as file:
+            sequence_instructions = yaml.safe_load(file)
+        return cls.from_dict(sequence_instructions)
+
+    @classmethod
+    def from_dict(cls, sequence_instructions: Dict[str, Any]) -> "CompiledSequence":
+        """
+        :param sequence_instructions: Pulse sequence as written by
+         :class:`qupyt.pulse_sequences.yaml_sequence.YamlSequence`.
+        """
+        sequence_order = list(sequence_instructions["sequencing_order"])
+        blocks = sorted(set(sequence_order))
+        channels: List[str] = []
+        present: List[Set[int]] = []
+        rows = []
+        for block_index, block in enumerate(blocks):
+            present.append(set())
+            for channel, pulses in sequence_instructions[block].items():
+                if channel not in channels:
+                    channels.append(channel)
+                channel_index = channels.index(channel)
+                present[-1].add(channel_index)
+                for pulse in (pulses or {}).values():
+                    start = to_picoseconds(pulse["start"])
+                    rows.append(
+                        (
+                            block_index,
+                            channel_index,
+                            start,
+                            start + to_picoseconds(pulse["duration"]),
+                            float(pulse.get("amplitude", 1.0)),
+                            float(pulse.get("frequency", 0.0)),
+                            float(pulse.get("phase", 0.0)),
+                        )
+                    )
+        present_table = np.zeros((len(blocks), len(channels)), dtype=bool)
+        for block_index, channel_indices in enumerate(present):
+            present_table[block_index, list(channel_indices)] = True
+        total_duration = sequence_instructions["total_duration"]
+        return cls(
+            np.array(rows, dtype=cls.pulse_dtype),
+            blocks,
+            channels,
+            present_table,
+            np.array([blocks.index(block) for block in sequence_order], dtype=np.int64),
+            np.array(
+                [int(repeat) for repeat in sequence_instructions["sequencing_repeats"]],
+                dtype=np.int64,
+            ),
+            None if total_duration == "ignore" else to_picoseconds(total_duration),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledSequence":
+        arrays = np.load(path)
+        total_duration = int(arrays["total_duration"])
+        return cls(
+            arrays["pulses"],
+            arrays["blocks"].tolist(),
+            arrays["channels"].tolist(),
+            arrays["present"],
+            arrays["order"],
+            arrays["repeats"],
+            None if total_duration < 0 else total_duration,
+        )
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            pulses=self.pulses,
+            blocks=np.array(self.blocks, dtype=str),
+            channels=np.array(self.channels, dtype=str),
+            present=self.present,
+            order=self.order,
+            repeats=self.repeats,
+            total_duration=-1 if self.total_duration is None else self.total_duration,
+        )
+
+    @property
+    def sequencing_order(self) -> List[str]:
+        return [self.blocks[index] for index in self.order]
+
+    def channels_of(self, block: str) -> List[str]:
+        """
+        :return: Channels listed in a block, including those without pulses.
+        :rtype: List[str]
+        """
+        block_index = self.blocks.index(block)
+        return [
+            channel
+            for channel_index, channel in enumerate(self.channels)
+            if self.present[block_index, channel_index]
+        ]
+
+    def pulses_of(self, block: str, channel: Optional[str] = None) -> np.ndarray:
+        """
+        :return: Rows of :attr:`pulses` of one block, optionally
+         restricted to one channel, in the order of the YAML file.
+        :rtype: np.ndarray
+        """
+        selected: np.ndarray = self.pulses["block"] == self.blocks.index(block)
+        if channel is not None:
+            selected &= self.pulses["channel"] == self.channels.index(channel)
+        pulses: np.ndarray = self.pulses[selected]
+        return pulses
+
+
+def load_compiled_sequence(yaml_file: Path) -> CompiledSequence:
+    """
+    Parse a YAML pulse sequence, or load it from the compiled sequence
+    cache if the same file content was parsed before.
+
+    :rtype: CompiledSequence
+    """
+    cache = sequence_cache.get_sequence_cache()
+    key = cache.key(yaml_file, backend="CompiledSequence")
+    cached = cache.lookup(key, ".npz")
+    if cached is not None:
+        return CompiledSequence.load(cached)
+    compiled_sequence = CompiledSequence.from_yaml(yaml_file)
+    cache.store(key, ".npz", compiled_sequence.save)
+    return compiled_sequence
@@ -0,0 +1,164 @@
+"""
+On disk cache of compiled pulse sequences.
+
+Compiled artifacts (AWG waveform records, PulseStreamer patterns,
+PulseBlaster instructions) are stored under ``get_seq_dir() / "cache"``
+and named by a hash of the sequence YAML and everything else the
+compilation depends on (sampling rate, channel mapping, ...). Switching
+back and forth between sequences therefore only compiles each of them
+once.
+"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from qupyt.set_up import get_seq_dir
+
+
+class SequenceCache:
+    """
+    Content addressed store of compiled pulse sequences with least
+    recently used eviction.
+
+    :param directory: Directory holding the artifacts.
+    :type directory: Path
+    :param capacity: Size budget of the directory in bytes.
+    :type capacity: int
+    """
+
+    def __init__(self, directory: Path, capacity: int = 2 * 1024**3) -> None:
+        self.directory = Path(directory)
+        self.capacity = int(capacity)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(yaml_file: Path, **context: Any) -> str:
+        """
+        :param yaml_file: Pulse sequence YAML file.
+        :type yaml_file: Path
+        :param context: Everything besides the YAML content that
+         changes the compiled artifact, e.g. the backend, sampling rate
+         and channel mapping.
+        :return: Content hash identifying the compiled artifact.
+        :rtype: str
+        """
+        content = hashlib.sha1(Path(yaml_file).read_bytes())
+        for name, value in sorted(context.items()):
+            if isinstance(value, dict):
+                value = sorted(value.items(), key=str)
+            content.update(f"{name}={value!r};".encode("utf-8"))
+        return content.hexdigest()
+
+    def path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{key}{suffix}"
+
+    def lookup(self, key: str, suffix: str) -> Optional[Path]:
+        """
+        :return: Path of the cached artifact, or None if it has to be
+         compiled.
+        :rtype: Optional[Path]
+        """
+        path = self.path(key, suffix)
+        try:
+            # The modification time keeps track of the last use.
+            os.utime(path)
+        except FileNotFoundError:
+            # Never compiled, or evicted by another process meanwhile.
+            self.misses += 1
+            self._log("miss", key)
+            return None
+        self.hits += 1
+        self._log("hit", key)
+        return path
+
+    def store(self, key: str, suffix: str, save: Callable[[Path], None]) -> Path:
+        """
+        Write an artifact to the cache and evict the least recently used
+        ones if the cache outgrows its capacity.
+
+        :param save: Writes the artifact to the path it is given. The
+         file is moved to its final place only once it is complete.
+        :type save: Callable[[Path], None]
+        :return: Path of the cached artifact.
+        :rtype: Path
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key, suffix)
+        partial = self.directory / f"{key}.{os.getpid()}.partial{suffix}"
+        save(partial)
+        os.replace(partial, path)
+        self._evict(keep=path)
+        return path
+
+    def clear(self) -> None:
+        """
+        Remove all cached artifacts. Artifacts other processes are
+        still writing are left alone.
+        """
+        if not self.directory.exists():
+            return
+        for path in self.directory.iterdir():
+            if ".partial" not in path.name:
+                path.unlink(missing_ok=True)
+
+    def _evict(self, keep: Path) -> None:
+        # Several processes may store into the same directory, so any
+        # artifact can disappear between listing and removing it.
+        artifacts = []
+        for path in self.directory.iterdir():
+            if ".partial" in path.name:
+                continue
+            try:
+                status = path.stat()
+            except FileNotFoundError:
+                continue
+            artifacts.append((status.st_mtime, status.st_size, path))
+        size = sum(artifact[1] for artifact in artifacts)
+        for _, artifact_size, path in sorted(artifacts):
+            if size <= self.capacity:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            size -= artifact_size
+            logging.info(
+                f"Evicted compiled sequence {path.name}".ljust(65, ".") + "[done]"
+            )
+
+    def _log(self, result: str, key: str) -> None:
+        logging.info(
+            f"Compiled sequence cache {result} for {key[:12]} "
+            f"({self.hits} hits, {self.misses} misses)".ljust(65, ".")
+            + "[done]"
+        )
+
+
+_sequence_cache: Optional[SequenceCache] = None
+
+
+def set_sequence_cache(directory: Path, capacity: int) -> None:
+    """
+    Use the cache in ``directory`` from now on, e.g. in worker processes
+    that compile into the cache of the process that started them.
+
+    :type directory: Path
+    :type capacity: int
+    """
+    global _sequence_cache
+    _sequence_cache = SequenceCache(directory, capacity)
+
+
+def get_sequence_cache() -> SequenceCache:
+    """
+    :return: The cache of compiled pulse sequences shared by all
+     synchronisers.
+    :rtype: SequenceCache
+    """
+    global _sequence_cache
+    if _sequence_cache is None:
+        _sequence_cache = SequenceCache(get_seq_dir() / "cache")
+    return _sequence_cache
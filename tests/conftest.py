@@ -0,0 +1,11 @@
+from qupyt.pulse_sequences import sequence_cache as sequence_cache_module
+from qupyt.pulse_sequences.sequence_cache import SequenceCache
+import pytest
+
+
+# Compiled pulse sequences never end up in the user's sequence cache.
+@pytest.fixture(autouse=True)
+def sequence_cache(tmp_path_factory, monkeypatch):
+    cache = SequenceCache(tmp_path_factory.mktemp("sequence_cache"))
+    monkeypatch.setattr(sequence_cache_module, "_sequence_cache", cache)
+    return cache
@@ -0,0 +1,91 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import multiprocessing
+
+from qupyt.hardware import synchronisers
+from qupyt.hardware.synchronisers import (
+    MockGenerator,
+    compile_awg_sequence,
+    compile_pulse_streamer_sequence,
+)
+import pytest
+import yaml
+
+
+class PrecompilingGenerator(MockGenerator):
+    def compile_job(self, ps_yaml_file):
+        if self.device_type == "PulseStreamer":
+            return compile_pulse_streamer_sequence, (ps_yaml_file, self.channel_mapping)
+        return compile_awg_sequence, (ps_yaml_file, self.channel_mapping, [1], 1e9)
+
+
+def _write_sequences(tmp_path, number):
+    ps_yaml_files = []
+    for step in range(number):
+        sequence = {
+            "total_duration": 1.0,
+            "sequencing_order": ["block_0"],
+            "sequencing_repeats": [1],
+            "block_0": {
+                "LASER": {
+                    "pulse1": {
+                        "start": 0.1,
+                        "duration": 0.01 * (step + 1),
+                        "amplitude": 1,
+                        "frequency": 0,
+                        "phase": 0,
+                    }
+                }
+            },
+        }
+        ps_yaml_files.append(tmp_path / f"sequence_{step}.yaml")
+        with open(ps_yaml_files[-1], "w", encoding="utf-8") as file:
+            yaml.dump(sequence, file)
+    return ps_yaml_files
+
+
+@pytest.mark.parametrize("device_type", ["AWG", "PulseStreamer"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_precompiled_sequences_are_loaded_from_cache(
+    tmp_path, sequence_cache, device_type, workers
+):
+    ps_yaml_files = _write_sequences(tmp_path, 3)
+    synchroniser = PrecompilingGenerator({"address": "None"}, {"LASER": 1})
+    synchroniser.device_type = device_type
+    assert synchroniser.precompile_sequences(ps_yaml_files, workers) == 3
+    # One artifact per sequence, plus its parsed sequence.
+    assert len(list(sequence_cache.directory.iterdir())) == 6
+    hits = sequence_cache.hits
+    for ps_yaml_file in ps_yaml_files:
+        function, args = synchroniser.compile_job(ps_yaml_file)
+        function(*args)
+    assert sequence_cache.hits == hits + 3
+
+
+# Spawned workers do not inherit the cache of the test,
+# they have to be pointed to it.
+def test_spawned_workers_compile_into_the_same_cache(tmp_path, sequence_cache, monkeypatch):
+    monkeypatch.setattr(
+        synchronisers,
+        "ProcessPoolExecutor",
+        partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")),
+    )
+    synchroniser = PrecompilingGenerator({"address": "None"}, {"LASER": 1})
+    synchroniser.device_type = "AWG"
+    assert synchroniser.precompile_sequences(_write_sequences(tmp_path, 2), 2) == 2
+    assert len(list(sequence_cache.directory.iterdir())) == 4
+
+
+# Small sequences are compiled without starting worker processes.
+def test_small_sequences_are_compiled_in_process(tmp_path, sequence_cache, monkeypatch):
+    monkeypatch.setattr(synchronisers, "ProcessPoolExecutor", None)
+    synchroniser = PrecompilingGenerator({"address": "None"}, {"LASER": 1})
+    synchroniser.device_type = "AWG"
+    assert synchroniser.precompile_sequences(_write_sequences(tmp_path, 3)) == 3
+    assert len(list(sequence_cache.directory.iterdir())) == 6
+
+
+def test_synchronisers_without_compile_job_skip_precompilation(tmp_path, sequence_cache):
+    synchroniser = MockGenerator({"address": "None"}, {"LASER": 1})
+    assert synchroniser.precompile_sequences(_write_sequences(tmp_path, 2)) == 0
+    assert list(sequence_cache.directory.iterdir()) == []
@@ -0,0 +1,98 @@
+from qupyt.hardware.synchronisers import (
+    PStreamer,
+    compile_pulse_streamer_patterns,
+    load_pulse_streamer_patterns,
+    pulse_streamer_pattern,
+    save_pulse_streamer_patterns,
+)
+from qupyt.mixins import PulseSequenceError
+from qupyt.pulse_sequences.compiled_sequence import CompiledSequence
+import pytest
+import yaml
+
+CHANNEL_MAPPING = {"LASER": 0, "MW": 1, "READ": 3}
+
+
+@pytest.fixture
+def streamer():
+    # Translating the sequence needs no connection to the device.
+    streamer = PStreamer.__new__(PStreamer)
+    streamer.channel_mapping = CHANNEL_MAPPING
+    return streamer
+
+
+def _load(streamer, tmp_path, sequence):
+    with open(tmp_path / "sequence.yaml", "w", encoding="utf-8") as file:
+        yaml.dump(sequence, file)
+    streamer.load_sequence(str(tmp_path / "sequence.yaml"))
+    return streamer
+
+
+def test_pulses_become_duration_level_arrays():
+    pulses = CompiledSequence.from_dict(
+        {
+            "total_duration": 2.0,
+            "sequencing_order": ["block_0"],
+            "sequencing_repeats": [1],
+            "block_0": {
+                "LASER": {
+                    "pulse1": {"start": 1.0, "duration": 0.5},
+                    "pulse2": {"start": 0.1, "duration": 0.2},
+                }
+            },
+        }
+    ).pulses
+    durations, levels = pulse_streamer_pattern("LASER", pulses, 2000)
+    assert durations.tolist() == [100, 200, 700, 500, 500]
+    assert levels.tolist() == [0, 1, 0, 1, 0]
+    durations, levels = pulse_streamer_pattern("LASER", pulses, None)
+    assert durations.tolist() == [100, 200, 700, 500]
+    pulses["stop"][1] = 1200 * 1000
+    with pytest.raises(PulseSequenceError):
+        pulse_streamer_pattern("LASER", pulses, 2000)
+
+
+# Blocks stay compact until the sequence is streamed, channels
+# missing from a block are padded low for its duration.
+def test_repeated_blocks_are_unrolled_when_streamed(streamer, tmp_path):
+    sequence = {
+        "total_duration": 1.0,
+        "sequencing_order": ["block_0", "block_1"],
+        "sequencing_repeats": [1000, 2],
+        "block_0": {"LASER": {"pulse1": {"start": 0.0, "duration": 0.5}}},
+        "block_1": {"MW": {"pulse1": {"start": 0.5, "duration": 0.5}}},
+    }
+    _load(streamer, tmp_path, sequence)
+    assert streamer.sequence is None
+    _, _, patterns = streamer.compiled_patterns
+    assert patterns["block_0"][0][0].tolist() == [0, 500, 500]
+    assert patterns["block_0"][1][0].tolist() == [1000]
+    assert patterns["block_1"][1][0].tolist() == [500, 500, 0]
+    pulse_streamer_sequence = streamer._build_sequence()
+    assert pulse_streamer_sequence.getDuration() == 1002 * 1000
+    data = pulse_streamer_sequence.getData()
+    assert data[:2] == [(500, 0b01, 0, 0), (500, 0b00, 0, 0)]
+    assert data[-2:] == [(500, 0b00, 0, 0), (500, 0b10, 0, 0)]
+    assert len(data) == 2 * 1000 + 3
+
+
+def test_patterns_roundtrip_through_npz(tmp_path):
+    sequence = {
+        "total_duration": 1.0,
+        "sequencing_order": ["block_0", "block_1", "block_0"],
+        "sequencing_repeats": [3, 2, 1],
+        "block_0": {"LASER": {"pulse1": {"start": 0.0, "duration": 0.5}}},
+        "block_1": {"MW": {"pulse1": {"start": 0.5, "duration": 0.5}}},
+    }
+    with open(tmp_path / "sequence.yaml", "w", encoding="utf-8") as file:
+        yaml.dump(sequence, file)
+    compiled = compile_pulse_streamer_patterns(tmp_path / "sequence.yaml", CHANNEL_MAPPING)
+    save_pulse_streamer_patterns(tmp_path / "patterns.npz", compiled)
+    order, repeats, patterns = load_pulse_streamer_patterns(tmp_path / "patterns.npz")
+    assert (order, repeats) == (compiled[0], compiled[1])
+    assert patterns.keys() == compiled[2].keys()
+    for block, block_patterns in compiled[2].items():
+        assert list(patterns[block]) == list(block_patterns)
+        for port, (durations, levels) in block_patterns.items():
+            assert patterns[block][port][0].tolist() == durations.tolist()
+            assert patterns[block][port][1].tolist() == levels.tolist()
@@ -0,0 +1,41 @@
+from qupyt.hardware.device_handler import SensorHandler
+from qupyt.hardware.sensors import MockCam
+import pytest
+
+
+# The pooled sensor is reused and only receives the changed values.
+def test_pooled_sensor_is_reconfigured_in_place(monkeypatch):
+    handler = SensorHandler()
+    sensor = handler.get_sensor("MockCam", {"number_measurements": 10, "image_roi": [4, 4]})
+    applied = []
+    original = MockCam.reconfigure
+    monkeypatch.setattr(MockCam, "reconfigure",
+                        lambda self, config: applied.append(dict(config)) or original(self, config))
+    again = handler.get_sensor("MockCam", {"number_measurements": 20, "image_roi": [4, 4]})
+    assert again is sensor
+    assert applied == [{"number_measurements": 20}]
+    assert sensor.number_measurements == 20
+
+
+@pytest.mark.parametrize("sensor_type, configuration", [
+    ("MockCam", {"number_measurements": 10}),  # image_roi dropped
+    ("DAQ", {}),                               # different sensor type
+])
+def test_pooled_sensor_is_replaced(monkeypatch, sensor_type, configuration):
+    handler = SensorHandler()
+    sensor = handler.get_sensor("MockCam", {"number_measurements": 10, "image_roi": [4, 4]})
+    closed = []
+    monkeypatch.setattr(sensor, "close", lambda: closed.append(True))
+    monkeypatch.setattr("qupyt.hardware.device_handler.SensorFactory.create_sensor",
+                        lambda sensor_type, configuration: MockCam(configuration))
+    again = handler.get_sensor(sensor_type, configuration)
+    assert again is not sensor
+    assert closed == [True]
+
+
+def test_sensors_that_are_not_poolable_are_not_kept(monkeypatch):
+    monkeypatch.setattr(MockCam, "poolable", False)
+    handler = SensorHandler()
+    sensor = handler.get_sensor("MockCam", {})
+    assert handler.sensor is None
+    assert handler.get_sensor("MockCam", {}) is not sensor
@@ -0,0 +1,49 @@
+from qupyt.hardware.settle import wait_until_settled
+from qupyt.hardware.sensors import SensorFactory
+from qupyt.hardware.synchronisers import SynchroniserFactory
+from qupyt.hardware.signal_sources import DeviceFactory
+from qupyt.mixins import ConfigurationError
+import pytest
+
+
+def _devices(sensor_settle=0.1, sync_settle=0.05):
+    sensor = SensorFactory.create_sensor("MockCam", {"settle_time": sensor_settle})
+    synchroniser = SynchroniserFactory.create_synchroniser(
+        "MockSynchroniser", {"address": "None", "settle_time": sync_settle}, {})
+    return sensor, synchroniser
+
+
+# Settle times of all touched devices overlap, the loop only waits
+# for the slowest one.
+def test_settle_times_run_concurrently():
+    sensor, synchroniser = _devices()
+    synchroniser.mark_touched()
+    sensor.mark_touched()
+    waited = wait_until_settled([synchroniser, sensor])
+    assert 0.1 <= waited < 0.15
+    # Nothing was touched since.
+    assert wait_until_settled([synchroniser, sensor]) < 0.01
+
+
+def test_untouched_and_none_policy_devices_do_not_wait():
+    source = DeviceFactory.create_device({"address": "None",
+                                          "device_type": "Mock",
+                                          "config": {},
+                                          "settle_policy": "none"})
+    sensor, _ = _devices()
+    source.mark_touched()
+    assert wait_until_settled([source, sensor]) < 0.01
+
+
+def test_ready_policy_polls_until_ready():
+    sensor, _ = _devices()
+    sensor.settle_policy = "ready"
+    answers = iter([False, False, True])
+    sensor.is_ready = lambda: next(answers)
+    sensor.mark_touched()
+    assert wait_until_settled([sensor]) < 0.1
+
+
+def test_refuse_unknown_settle_policy():
+    with pytest.raises(ConfigurationError):
+        SensorFactory.create_sensor("MockCam", {"settle_policy": "forever"})
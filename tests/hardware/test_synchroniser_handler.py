@@ -0,0 +1,67 @@
+from qupyt.hardware.device_handler import SynchroniserHandler
+from qupyt.hardware.synchronisers import MockGenerator
+import pytest
+
+
+def _count_calls(monkeypatch, name):
+    calls = []
+    original = getattr(MockGenerator, name)
+    monkeypatch.setattr(MockGenerator, name,
+                        lambda self: calls.append(name) or original(self))
+    return calls
+
+
+# Opening is idempotent, so all pulse sequence steps share one connection.
+def test_ensure_open_opens_once(monkeypatch):
+    opened = _count_calls(monkeypatch, "open")
+    closed = _count_calls(monkeypatch, "close")
+    synchroniser = MockGenerator({"address": "None"}, {})
+    for _ in range(5):
+        synchroniser.ensure_open()
+    synchroniser.ensure_closed()
+    synchroniser.ensure_closed()
+    assert len(opened) == 1
+    assert len(closed) == 1
+
+
+def test_cached_synchroniser_applies_configuration_diff(monkeypatch):
+    opened = _count_calls(monkeypatch, "open")
+    handler = SynchroniserHandler()
+    synchroniser = handler.get_synchroniser("MockSynchroniser", {"address": "None"}, {"LASER": 1})
+    synchroniser.ensure_open()
+    # Same configuration, nothing to apply.
+    assert handler.get_synchroniser("MockSynchroniser", {"address": "None"}, {"LASER": 1}) is synchroniser
+    synchroniser.ensure_open()
+    assert len(opened) == 1
+    # Changed values are applied with the next ensure_open.
+    again = handler.get_synchroniser("MockSynchroniser", {"address": "None", "settle_time": 0.3}, {"LASER": 1})
+    assert again is synchroniser
+    assert synchroniser.settle_time == 0.3
+    synchroniser.ensure_open()
+    assert len(opened) == 2
+
+
+@pytest.mark.parametrize("configuration, channel_mapping", [
+    ({"address": "other"}, {"LASER": 1}),                # new connection
+    ({"address": "None"}, {"LASER": 2}),                 # new channel mapping
+])
+def test_cached_synchroniser_is_replaced(monkeypatch, configuration, channel_mapping):
+    closed = _count_calls(monkeypatch, "close")
+    handler = SynchroniserHandler()
+    synchroniser = handler.get_synchroniser("MockSynchroniser", {"address": "None", "settle_time": 0.1}, {"LASER": 1})
+    synchroniser.ensure_open()
+    assert handler.get_synchroniser("MockSynchroniser", configuration, channel_mapping) is not synchroniser
+    assert len(closed) == 1
+
+
+def test_preloaded_sequences_are_selected_by_step(tmp_path):
+    files = []
+    for ps_step, duration in enumerate([1.0, 2.5, 4.0]):
+        files.append(tmp_path / f"sequence_{ps_step}.yaml")
+        files[-1].write_text(f"total_duration: {duration}\nsequencing_order: []\nsequencing_repeats: []\n")
+    synchroniser = MockGenerator({"address": "None"}, {})
+    assert synchroniser.preload_sequences(files)
+    synchroniser.select_sequence(1)
+    assert synchroniser.total_duration == 2500
+    synchroniser.select_sequence(0)
+    assert synchroniser.total_duration == 1000
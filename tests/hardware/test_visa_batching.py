@@ -0,0 +1,76 @@
+from qupyt.hardware import visa_handler
+from qupyt.hardware.visa_handler import VisaObject
+import pytest
+
+
+class _Instrument:
+    def __init__(self):
+        self.messages = []
+
+    def write(self, message):
+        self.messages.append(message)
+
+    def write_binary_values(self, message, values, **kwargs):
+        self.messages.append((message, list(values)))
+
+    def query(self, message):
+        self.messages.append(message)
+        return "1"
+
+
+@pytest.fixture
+def awg(monkeypatch):
+    instrument = _Instrument()
+    monkeypatch.setattr(visa_handler.pyvisa, "ResourceManager",
+                        lambda: type("RM", (), {"open_resource": lambda self, handle: instrument})())
+    return VisaObject("TCPIP::test::INSTR", "TekAWG")
+
+
+# A batch joins its commands into one write and syncs once at its end.
+def test_batch_joins_commands_and_syncs_once(awg):
+    with awg.batch():
+        for channel in (1, 2):
+            awg.write(f"source{channel}:dac:resolution 12")
+            awg.opc_wait()
+        with awg.batch():
+            awg.write("outp1 on")
+    assert awg.instance.messages == [
+        "source1:dac:resolution 12;:source2:dac:resolution 12;:outp1 on",
+        "*OPC?",
+    ]
+    assert awg.round_trips == 2
+
+
+def test_batch_is_split_and_flushed_before_binary_data(awg):
+    awg.batch_size = 30
+    with awg.batch():
+        awg.write("wlist:waveform:delete \"a\"")
+        awg.write("wlist:waveform:new \"a\",4")
+        awg.write_binary_values("wlist:waveform:data \"a\",", [0, 1, 0, 1])
+        awg.write("outp1 on")
+    assert awg.instance.messages == [
+        "wlist:waveform:delete \"a\"",
+        "wlist:waveform:new \"a\",4",
+        ("wlist:waveform:data \"a\",", [0, 1, 0, 1]),
+        "outp1 on",
+    ]
+
+
+def test_failed_batch_is_dropped(awg):
+    with pytest.raises(RuntimeError):
+        with awg.batch():
+            awg.write("outp1 on")
+            raise RuntimeError
+    awg.write("outp2 on")
+    assert awg.instance.messages == ["outp2 on"]
+
+
+# The readiness query sends queued commands first and counts as a round trip.
+def test_is_ready_flushes_batch(awg):
+    awg.write("outp1 on")
+    awg.round_trips = 0
+    with awg.batch():
+        awg.write("outp2 on")
+        assert awg.is_ready()
+    assert awg.instance.messages[-2:] == ["outp2 on", "*OPC?"]
+    assert awg.round_trips == 2
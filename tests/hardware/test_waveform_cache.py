@@ -0,0 +1,60 @@
+from qupyt.hardware.synchronisers import AWGenerator, WaveformCache, pack_integer_waveform
+import numpy as np
+import pytest
+
+
+def test_identical_waveforms_share_a_digest():
+    waveform = np.zeros((2, 100))
+    waveform[0, 10:20] = 1
+    assert WaveformCache.digest(waveform) == WaveformCache.digest(waveform.copy())
+    assert WaveformCache.digest(waveform) != WaveformCache.digest(waveform[:, :50])
+    other = waveform.copy()
+    other[1, 0] = 128
+    assert WaveformCache.digest(waveform) != WaveformCache.digest(other)
+
+
+def test_only_missing_waveforms_are_uploaded():
+    cache = WaveformCache(1000)
+    assert cache.lookup("a") is None
+    cache.insert("a", "wf_a", 100, set())
+    assert cache.lookup("a") == "wf_a"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+# Least recently used waveforms are evicted first,
+# waveforms of the current sequence never.
+def test_least_recently_used_waveforms_are_evicted():
+    cache = WaveformCache(300)
+    for digest in "abc":
+        cache.insert(digest, f"wf_{digest}", 100, set())
+    cache.lookup("a")
+    assert cache.insert("d", "wf_d", 100, {"d"}) == ["wf_b"]
+    assert cache.insert("e", "wf_e", 200, {"c", "e"}) == ["wf_a", "wf_d"]
+    assert cache.size == 300
+    assert cache.lookup("c") == "wf_c"
+    assert cache.lookup("b") is None
+
+
+def test_pack_integer_waveform():
+    waveform = np.array([[-1.0, 0.0, 1.0, 2.0],
+                         [0, 2**7, 2**7 + 2**4, 2**6]])
+    packed = pack_integer_waveform(waveform, 12)
+    assert packed.dtype == np.uint16
+    assert list(packed & 0xFFF) == [0, 2048, 4095, 4095]
+    assert list(packed >> 12) == [0b0000, 0b0001, 0b1001, 0b0010]
+    assert list(pack_integer_waveform(waveform[:, [0, 1, 3]], 14) >> 14) == [0, 1, 2]
+    # Marker 4 does not fit next to 14 analog bits.
+    with pytest.raises(ValueError):
+        pack_integer_waveform(waveform, 14)
+
+
+# Reopening the AWG applies all settings and uploads all waveforms again.
+def test_open_forgets_applied_settings_and_waveforms(monkeypatch):
+    awg = AWGenerator.__new__(AWGenerator)
+    awg._applied_settings = {("dac_resolution", 1): 12}
+    awg.waveform_cache = WaveformCache(1000)
+    awg.waveform_cache.insert("a", "wf_a", 100, set())
+    monkeypatch.setattr(AWGenerator, "_configure", lambda self: None)
+    awg.open()
+    assert awg._applied_settings == {}
+    assert len(awg.waveform_cache) == 0
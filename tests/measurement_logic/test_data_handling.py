@@ -1,5 +1,9 @@
 from qupyt.hardware.sensors import SensorFactory
 from qupyt.measurement_logic.data_handling import Data
+from qupyt.measurement_logic.chunked_storage import load_chunked, load_chunked_attributes
+from qupyt.mixins import ConfigurationError
+import numpy as np
+import yaml
 import pytest
 
 
@@ -83,3 +87,320 @@ def test_data_container_refuse_0_dyn_steps():
     dynamic_steps = 0
     with pytest.raises(ValueError):
         data = Data({"averaging_mode": "spread", "dynamic_steps": dynamic_steps})
+
+
+def _legacy_update(data_array, frames, reference_channels, averaging_mode, live_compression, ps_step, dynamic_step):
+    for i in range(reference_channels):
+        channel_frames = frames[i::reference_channels]
+        if live_compression:
+            channel_frames = channel_frames.mean(axis=tuple(range(1, frames.ndim))).reshape(-1, 1)
+        if averaging_mode == "sum":
+            data_array[i, ps_step, dynamic_step] += channel_frames.sum(axis=0)
+        else:
+            data_array[i, ps_step, dynamic_step] += channel_frames
+
+
+# The vectorized accumulation has to reproduce the per channel
+# strided slicing of the original implementation.
+@pytest.mark.parametrize("live_compression", [False, True])
+@pytest.mark.parametrize("averaging_mode", ["sum", "spread"])
+@pytest.mark.parametrize("reference_channels", [1, 2, 4])
+@pytest.mark.parametrize("image_roi", [[6, 5], [7], [2, 3, 4]])
+def test_update_data_matches_strided_accumulation(image_roi, reference_channels, averaging_mode, live_compression):
+    nframes = 8
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": nframes})
+    cam.roi_shape = image_roi
+    data = Data({"averaging_mode": averaging_mode,
+                 "dynamic_steps": 3,
+                 "ps_steps": 2,
+                 "live_compression": live_compression,
+                 "reference_channels": reference_channels})
+    data.set_dims_from_sensor(cam)
+    data.create_array()
+    expected = np.zeros_like(data.data)
+    for avg in range(3):
+        frames = cam.acquire_data()
+        data.update_data(frames, 1, 2, avg)
+        _legacy_update(expected, frames, reference_channels, averaging_mode, live_compression, 1, 2)
+    np.testing.assert_allclose(data.data, expected)
+
+
+def _memmap_data(tmp_path, storage, memory_budget=4):
+    data = Data({"averaging_mode": "spread",
+                 "dynamic_steps": 3,
+                 "reference_channels": 2,
+                 "number_measurements": 4,
+                 "roi_shape": [5, 6],
+                 "storage": storage,
+                 "memory_budget": memory_budget,
+                 "storage_dir": str(tmp_path)})
+    data.create_array()
+    return data
+
+
+def test_estimate_size_matches_allocation(tmp_path):
+    data = _memmap_data(tmp_path, "ram")
+    assert data.estimate_size() == data.data.nbytes
+
+
+# Asking for the size must not change the container.
+def test_estimate_size_keeps_state(tmp_path):
+    data = Data({"averaging_mode": "variance",
+                 "dynamic_steps": 3,
+                 "reference_channels": 2,
+                 "number_measurements": 4,
+                 "roi_shape": [5, 6],
+                 "live_compression": True,
+                 "storage_dir": str(tmp_path)})
+    data.data_type = np.uint16
+    assert data.estimate_size() == 2 * 2 * 1 * 3 * 1 * 1 * np.dtype(float).itemsize
+    assert data.roi_shape == [5, 6]
+    assert data.data_type is np.uint16
+
+
+# A memory mapped backend must accumulate like the in RAM array,
+# and saving moves the backing file instead of copying it.
+def test_memmap_backend_accumulates_and_saves(tmp_path):
+    data = _memmap_data(tmp_path, "memmap")
+    assert isinstance(data.data, np.memmap)
+    frames = np.arange(4 * 5 * 6).reshape(4, 5, 6)
+    data.update_data(frames, 0, 1, 0)
+    data.update_data(frames, 0, 1, 1)
+    data.save(str(tmp_path / "result"))
+    saved = np.load(tmp_path / "result.npy")
+    assert saved.shape == (2, 1, 3, 2, 5, 6)
+    np.testing.assert_array_equal(saved[1, 0, 1], 2 * frames[1::2])
+    assert list(tmp_path.glob("qupyt_data_*.npy")) == []
+
+
+@pytest.mark.parametrize("memory_budget, memmap", [(1e-9, True), (1, False)])
+def test_auto_storage_respects_memory_budget(tmp_path, memory_budget, memmap):
+    data = _memmap_data(tmp_path, "auto", memory_budget)
+    assert isinstance(data.data, np.memmap) == memmap
+
+
+def test_refuse_unknown_storage():
+    with pytest.raises(ConfigurationError):
+        Data({"averaging_mode": "sum", "storage": "cloud"})
+
+
+# Chunks are written in the background with unique names per step,
+# listed in a manifest, and together with the final array
+# contain every recorded frame exactly once.
+@pytest.mark.parametrize("storage", ["ram", "memmap"])
+def test_save_in_chunks_writes_unique_chunks_and_manifest(tmp_path, storage):
+    data = Data({"averaging_mode": "sum",
+                 "dynamic_steps": 2,
+                 "reference_channels": 2,
+                 "number_measurements": 4,
+                 "roi_shape": [3, 3],
+                 "save_in_chunks": 2,
+                 "storage": storage,
+                 "storage_dir": str(tmp_path)})
+    data.set_output_name("test")
+    data.create_array()
+    frames = np.ones((4, 3, 3))
+    for dynamic_step in range(2):
+        for avg in range(3):
+            data.update_data(frames, 0, dynamic_step, avg)
+    data.close()
+    data.save(str(tmp_path / "test"))
+    with open(tmp_path / "test_chunks.yaml", encoding="utf-8") as file:
+        manifest = yaml.safe_load(file)
+    chunk_files = [chunk["file"] for chunk in manifest["chunks"]]
+    assert len(chunk_files) == len(set(chunk_files)) == 2
+    assert [(chunk["dynamic_step"], chunk["avg_step"]) for chunk in manifest["chunks"]] == [(0, 1), (1, 1)]
+    total = np.load(tmp_path / "test.npy") + sum(np.load(tmp_path / name) for name in chunk_files)
+    np.testing.assert_array_equal(total, np.full((2, 1, 2, 1, 3, 3), 6.0))
+    assert list(tmp_path.glob("qupyt_data_*.npy")) == []
+
+
+# The chunked container holds data, parameters and step metadata,
+# and single dynamic steps can be read back on their own.
+@pytest.mark.parametrize("compression", ["zlib", "lzma", "none"])
+@pytest.mark.parametrize("storage", ["ram", "memmap"])
+def test_chunked_output_roundtrip(tmp_path, compression, storage):
+    data = Data({"averaging_mode": "spread",
+                 "dynamic_steps": 3,
+                 "reference_channels": 2,
+                 "number_measurements": 4,
+                 "roi_shape": [5, 6],
+                 "output_format": "chunked",
+                 "compression": compression,
+                 "storage": storage,
+                 "storage_dir": str(tmp_path)})
+    data.set_output_name("test")
+    data.create_array()
+    frames = np.arange(4 * 5 * 6, dtype=float).reshape(4, 5, 6)
+    for dynamic_step in range(2):
+        data.update_data(frames * (dynamic_step + 1), 0, dynamic_step, 0)
+        data.finish_step(0, dynamic_step, {"finished": f"step {dynamic_step}"})
+    expected = np.array(data.data)
+    data.close()
+    data.save(str(tmp_path / "result"), {"experiment_type": "ODMR"})
+    container = tmp_path / "result.zarr.zip"
+    np.testing.assert_array_equal(load_chunked(container), expected)
+    step = load_chunked(container, dynamic_step=1)
+    assert step.shape == (2, 1, 1, 2, 5, 6)
+    np.testing.assert_array_equal(step[1, 0, 0], 2 * frames[1::2])
+    attributes = load_chunked_attributes(container)
+    assert attributes["params"] == {"experiment_type": "ODMR"}
+    assert [s["finished"] for s in attributes["steps"]] == ["step 0", "step 1"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["result.zarr.zip"]
+
+
+def test_chunked_output_refuses_save_in_chunks(tmp_path):
+    data = Data({"averaging_mode": "sum",
+                 "dynamic_steps": 1,
+                 "reference_channels": 2,
+                 "number_measurements": 4,
+                 "roi_shape": [2],
+                 "save_in_chunks": 2,
+                 "output_format": "chunked",
+                 "storage_dir": str(tmp_path)})
+    data.set_output_name("test")
+    with pytest.raises(ValueError):
+        data.create_array()
+
+
+def test_refuse_unknown_compression():
+    with pytest.raises(ConfigurationError):
+        Data({"averaging_mode": "sum", "compression": "snappy"})
+
+
+# Streaming mean and standard error have to agree with the
+# statistics over all frames recorded for a step.
+@pytest.mark.parametrize("live_compression", [False, True])
+@pytest.mark.parametrize("reference_channels", [1, 2])
+def test_variance_mode_matches_full_statistics(tmp_path, reference_channels, live_compression):
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": 6})
+    cam.roi_shape = [4, 3]
+    data = Data({"averaging_mode": "variance",
+                 "dynamic_steps": 2,
+                 "live_compression": live_compression,
+                 "reference_channels": reference_channels})
+    data.set_dims_from_sensor(cam)
+    data.create_array()
+    stacks = [cam.acquire_data() for _ in range(5)]
+    for avg, frames in enumerate(stacks):
+        data.update_data(frames, 0, 1, avg)
+    frames = np.concatenate(stacks).astype(float)
+    if live_compression:
+        frames = frames.mean(axis=(1, 2)).reshape(-1, 1)
+    channel_frames = frames.reshape(-1, reference_channels, *frames.shape[1:])
+    np.testing.assert_allclose(data.data[:, 0, 1, 0], channel_frames.mean(axis=0))
+    expected_sem = channel_frames.std(axis=0, ddof=1) / np.sqrt(channel_frames.shape[0])
+    np.testing.assert_allclose(data.sem[:, 0, 1, 0], expected_sem)
+    assert np.isnan(data.sem[:, 0, 0]).all()
+    data.save(str(tmp_path / "result"))
+    np.testing.assert_allclose(np.load(tmp_path / "result_sem.npy")[:, 0, 1, 0], expected_sem)
+
+
+# The live contrast has to agree with the contrast computed from all
+# recorded frame pairs, and contrast_only keeps no raw data.
+@pytest.mark.parametrize("averaging_mode", ["sum", "spread"])
+def test_live_contrast_matches_frame_pairs(tmp_path, averaging_mode):
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": 6})
+    cam.roi_shape = [4, 3]
+    data = Data({"averaging_mode": averaging_mode,
+                 "dynamic_steps": 2,
+                 "live_contrast": True,
+                 "contrast_only": True})
+    data.set_dims_from_sensor(cam)
+    data.create_array()
+    stacks = [cam.acquire_data() + 1 for _ in range(4)]
+    for avg, frames in enumerate(stacks):
+        data.update_data(frames, 0, 1, avg)
+    assert not hasattr(data, "data")
+    frames = np.concatenate(stacks).astype(float)
+    contrast = (frames[::2] - frames[1::2]) / (frames[::2] + frames[1::2])
+    if averaging_mode == "spread":
+        # One contrast per readout of the sequence, averaged over stacks.
+        contrast = contrast.reshape(len(stacks), -1, *contrast.shape[1:])
+    np.testing.assert_allclose(data.contrast_mean[0, 1], contrast.mean(axis=0))
+    expected_sem = contrast.std(axis=0, ddof=1) / np.sqrt(contrast.shape[0])
+    np.testing.assert_allclose(data.contrast_sem[0, 1], expected_sem)
+    data.save(str(tmp_path / "result"))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["result_contrast.npy"]
+    saved = np.load(tmp_path / "result_contrast.npy")
+    assert saved.shape == (2, 1, 2, *contrast.shape[1:])
+    np.testing.assert_allclose(saved[1, 0, 1], expected_sem)
+
+
+def test_live_contrast_needs_two_channels():
+    data = Data({"averaging_mode": "sum",
+                 "dynamic_steps": 1,
+                 "reference_channels": 1,
+                 "number_measurements": 4,
+                 "roi_shape": [2],
+                 "live_contrast": True})
+    with pytest.raises(ValueError):
+        data.create_array()
+
+
+# Integer sensors get the smallest integer accumulator that cannot
+# overflow, an explicit target_data_type always wins.
+@pytest.mark.parametrize("averages, bit_depth, expected", [(100, None, np.uint32),
+                                                           (10**6, None, np.uint64),
+                                                           (10**4, 12, np.uint32),
+                                                           (None, 12, np.uint64)])
+def test_accumulator_dtype_negotiated_with_sensor(averages, bit_depth, expected):
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": 10, "image_roi": [4, 4]})
+    cam.bit_depth = bit_depth
+    data = Data({"averaging_mode": "sum", "dynamic_steps": 1})
+    data.set_dims_from_sensor(cam, averages)
+    data.create_array()
+    assert data.data.dtype == expected
+    frames = cam.acquire_data()
+    data.update_data(frames, 0, 0, 0)
+    assert data.data.dtype == expected
+    np.testing.assert_array_equal(data.data[0, 0, 0, 0], frames[0::2].sum(axis=0))
+
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": 10, "target_data_type": float})
+    data = Data({"averaging_mode": "sum", "dynamic_steps": 1})
+    data.set_dims_from_sensor(cam, averages)
+    assert data.data_type is float
+
+
+# Pixels summed by reduction stages need headroom in the accumulator too.
+@pytest.mark.parametrize("reductions, expected", [([], np.uint32),
+                                                  ([{"type": "bin", "factor": 2}], np.uint32),
+                                                  ([{"type": "bin", "factor": 4}], np.uint64),
+                                                  ([{"type": "bin", "factor": 4, "mode": "mean"}], float)])
+def test_accumulator_dtype_includes_summed_pixels(reductions, expected):
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": 10, "image_roi": [4, 4]})
+    cam.bit_depth = 12
+    data = Data({"averaging_mode": "sum", "dynamic_steps": 1, "reductions": reductions})
+    data.set_dims_from_sensor(cam, 10**4)
+    data.create_array()
+    assert data.data.dtype == expected
+
+
+# A frame stack recorded with several averages per trigger has to give
+# the same result as one update per block of averages.
+@pytest.mark.parametrize("averaging_mode", ["sum", "spread"])
+@pytest.mark.parametrize("reference_channels", [1, 2])
+def test_averages_per_trigger_matches_single_blocks(averaging_mode, reference_channels):
+    nframes, repeats = 4, 3
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": nframes * repeats, "image_roi": [3, 2]})
+    data = Data({"averaging_mode": averaging_mode,
+                 "dynamic_steps": 2,
+                 "reference_channels": reference_channels})
+    data.set_averages_per_trigger(repeats)
+    data.set_dims_from_sensor(cam)
+    data.create_array()
+    assert data.data.shape[3] == (1 if averaging_mode == "sum" else nframes // reference_channels)
+    expected = np.zeros_like(data.data)
+    frames = cam.acquire_data()
+    data.update_data(frames, 0, 1, 0)
+    for block in frames.reshape(repeats, nframes, *frames.shape[1:]):
+        _legacy_update(expected, block, reference_channels, averaging_mode, False, 0, 1)
+    np.testing.assert_array_equal(data.data, expected)
+
+
+def test_averages_per_trigger_refuses_uneven_blocks():
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": 10})
+    data = Data({"averaging_mode": "sum", "dynamic_steps": 1})
+    data.set_averages_per_trigger(3)
+    with pytest.raises(ValueError):
+        data.set_dims_from_sensor(cam)
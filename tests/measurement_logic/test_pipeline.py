@@ -0,0 +1,50 @@
+from qupyt.hardware.sensors import SensorFactory
+from qupyt.measurement_logic.data_handling import Data
+from qupyt.measurement_logic.pipeline import AcquisitionPipeline
+import numpy as np
+import pytest
+
+
+def _make_data(averaging_mode):
+    cam = SensorFactory.create_sensor("MockCam", {"number_measurements": 4, "image_roi": [3, 5]})
+    data = Data({"averaging_mode": averaging_mode,
+                 "dynamic_steps": 3,
+                 "reference_channels": 2})
+    data.set_dims_from_sensor(cam)
+    data.create_array()
+    return cam, data
+
+
+# The pipelined hand-off has to produce exactly the same
+# accumulated data as the sequential update.
+@pytest.mark.parametrize("buffers", [2, 3])
+@pytest.mark.parametrize("averaging_mode", ["sum", "spread"])
+def test_pipeline_matches_sequential_update(buffers, averaging_mode):
+    cam, sequential = _make_data(averaging_mode)
+    _, pipelined = _make_data(averaging_mode)
+    pipeline = AcquisitionPipeline(pipelined, buffers)
+    for dynamic_step in range(3):
+        for avg in range(5):
+            frames = cam.acquire_data()
+            sequential.update_data(frames, 0, dynamic_step, avg)
+            pipeline.submit(frames, 0, dynamic_step, avg)
+    pipeline.join()
+    pipeline.close()
+    np.testing.assert_array_equal(pipelined.data, sequential.data)
+    assert pipeline.report()["batches"] == 15
+
+
+# Exceptions in the worker thread must surface in the measurement loop.
+def test_pipeline_reraises_worker_exception():
+    cam, data = _make_data("sum")
+    pipeline = AcquisitionPipeline(data, 2)
+    pipeline.submit(np.zeros((3, 7, 7)), 0, 0, 0)
+    with pytest.raises(RuntimeError):
+        pipeline.join()
+    pipeline.close()
+
+
+def test_pipeline_refuses_single_buffer():
+    _, data = _make_data("sum")
+    with pytest.raises(ValueError):
+        AcquisitionPipeline(data, 1)
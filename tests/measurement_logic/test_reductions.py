@@ -0,0 +1,53 @@
+from qupyt.measurement_logic.reductions import ReductionFactory
+from qupyt.measurement_logic.data_handling import Data
+from qupyt.mixins import ConfigurationError
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("mode", ["sum", "mean"])
+def test_binning_drops_incomplete_bins(mode):
+    stage = ReductionFactory.create_stage({"type": "bin", "factor": [2, 3], "mode": mode})
+    frames = np.arange(3 * 5 * 7, dtype=np.uint16).reshape(3, 5, 7)
+    assert stage.output_shape([5, 7]) == [2, 2]
+    expected = frames[:, :4, :6].reshape(3, 2, 2, 2, 3).sum(axis=(2, 4))
+    if mode == "mean":
+        expected = expected / 6
+    reduced = stage.apply(frames)
+    assert reduced.dtype == stage.output_dtype(frames.dtype)
+    np.testing.assert_allclose(reduced, expected)
+
+
+def test_mask_and_weighted_sums():
+    mask = np.zeros((4, 3), dtype=bool)
+    mask[1:3, 1] = True
+    weights = np.random.rand(2, 4, 3)
+    frames = np.random.poisson(100, size=(6, 4, 3))
+    masked = ReductionFactory.create_stage({"type": "mask", "mask": mask.tolist()}).apply(frames)
+    np.testing.assert_array_equal(masked, frames[:, mask])
+    sums = ReductionFactory.create_stage({"type": "weighted_sums", "weights": weights}).apply(frames)
+    np.testing.assert_allclose(sums, np.einsum("nij,wij->nw", frames, weights))
+
+
+def test_refuse_unknown_reduction():
+    with pytest.raises(ConfigurationError):
+        ReductionFactory.create_stage({"type": "fft"})
+
+
+# Data sizes its array from the reduced frames and accumulates them.
+def test_data_applies_reduction_chain(tmp_path):
+    mask = np.ones((3, 4), dtype=bool)
+    mask[0, 0] = False
+    np.save(tmp_path / "mask.npy", mask)
+    data = Data({"averaging_mode": "sum",
+                 "dynamic_steps": 1,
+                 "number_measurements": 4,
+                 "roi_shape": [6, 8],
+                 "reductions": [{"type": "bin", "factor": 2},
+                                {"type": "mask", "mask": str(tmp_path / "mask.npy")}]})
+    data.create_array()
+    assert data.data.shape == (2, 1, 1, 1, 11)
+    frames = np.random.poisson(100, size=(4, 6, 8))
+    data.update_data(frames, 0, 0, 0)
+    binned = frames.reshape(4, 3, 2, 4, 2).sum(axis=(2, 4))[:, mask]
+    np.testing.assert_array_equal(data.data[:, 0, 0, 0], [binned[0::2].sum(axis=0), binned[1::2].sum(axis=0)])
@@ -0,0 +1,30 @@
+from qupyt.measurement_logic.timing import PhaseTimer, TIMING_COLUMNS
+from time import sleep
+import csv
+import yaml
+
+
+def test_phase_timer_records_rows_and_summary(tmp_path):
+    timer = PhaseTimer()
+    with timer.phase("load_sequence", 0):
+        sleep(0.01)
+    for avg in range(4):
+        with timer.phase("acquire_data", 0, 1, avg):
+            sleep(0.005)
+        with timer.phase("update_data", 0, 1, avg):
+            pass
+    summary = timer.summary()
+    assert list(summary["phases"]) == ["load_sequence", "acquire_data", "update_data"]
+    acquire = summary["phases"]["acquire_data"]
+    assert acquire["count"] == 4
+    assert 0.005 <= acquire["p50"] <= acquire["p90"] <= acquire["p99"] <= acquire["max"]
+    assert 0 < summary["duty_cycle"] < 1
+    # The summary ends up in the metadata yaml.
+    assert yaml.safe_load(yaml.dump(summary)) == summary
+
+    timer.write_csv(str(tmp_path / "timing.csv"))
+    with open(tmp_path / "timing.csv", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == TIMING_COLUMNS
+    assert rows[1][:4] == ["load_sequence", "0", "-1", "-1"]
+    assert len(rows) == 1 + 9
@@ -0,0 +1,58 @@
+from qupyt.pulse_sequences.compiled_sequence import (
+    CompiledSequence,
+    to_microseconds,
+    to_picoseconds,
+)
+import numpy as np
+
+
+SEQUENCE = {
+    "total_duration": 2.5,
+    "sequencing_order": ["block_1", "block_0", "block_1"],
+    "sequencing_repeats": [2, 1, 3],
+    "block_0": {
+        "LASER": {
+            "pulse1": {"start": 0.1, "duration": 0.2, "amplitude": 1, "frequency": 0, "phase": 0},
+            "pulse2": {"start": 1.0, "duration": 0.3, "amplitude": 1, "frequency": 0, "phase": 0},
+        },
+        "READ": {},
+    },
+    "block_1": {
+        "MW": {
+            "pulse1": {"start": 0.000125, "duration": 0.05, "amplitude": 0.5, "frequency": 2e7, "phase": 1.5},
+        },
+    },
+}
+
+
+def test_yaml_sequence_is_quantized_to_picoseconds():
+    compiled = CompiledSequence.from_dict(SEQUENCE)
+    assert compiled.blocks == ["block_0", "block_1"]
+    assert compiled.sequencing_order == SEQUENCE["sequencing_order"]
+    assert compiled.repeats.tolist() == [2, 1, 3]
+    assert compiled.total_duration == 2_500_000
+    laser = compiled.pulses_of("block_0", "LASER")
+    assert laser["start"].tolist() == [100_000, 1_000_000]
+    assert laser["stop"].tolist() == [300_000, 1_300_000]
+    # Channels without pulses are kept, so backends can still set them low.
+    assert compiled.channels_of("block_0") == ["LASER", "READ"]
+    assert compiled.channels_of("block_1") == ["MW"]
+    (microwave,) = compiled.pulses_of("block_1")
+    assert microwave["start"] == 125
+    assert (microwave["amplitude"], microwave["frequency"], microwave["phase"]) == (0.5, 2e7, 1.5)
+
+
+def test_microseconds_round_trip():
+    for time in [0.1, 0.3, 1.000125, 2.5, 1234.567891]:
+        assert to_microseconds(to_picoseconds(time)) == time
+
+
+def test_save_and_load(tmp_path):
+    compiled = CompiledSequence.from_dict(dict(SEQUENCE, total_duration="ignore"))
+    compiled.save(tmp_path / "compiled.npz")
+    loaded = CompiledSequence.load(tmp_path / "compiled.npz")
+    assert loaded.total_duration is None
+    assert loaded.blocks == compiled.blocks and loaded.channels == compiled.channels
+    assert loaded.sequencing_order == compiled.sequencing_order
+    np.testing.assert_array_equal(loaded.pulses, compiled.pulses)
+    np.testing.assert_array_equal(loaded.present, compiled.present)
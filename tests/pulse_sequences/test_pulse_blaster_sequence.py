@@ -0,0 +1,143 @@
+from qupyt.pulse_sequences.compiled_sequence import CompiledSequence
+from qupyt.pulse_sequences.SequenceDesigner import PulseBlasterSequence
+import pytest
+
+CHANNEL_MAPPING = {"LASER": 0, "MW": 1, "READ": 2}
+
+
+def _compile(block, total_duration=2.0):
+    sequence = {
+        "total_duration": total_duration,
+        "sequencing_order": ["block_0", "block_0"],
+        "sequencing_repeats": [1, 2],
+        "block_0": block,
+    }
+    pulse_blaster_sequence = PulseBlasterSequence(
+        CHANNEL_MAPPING, compiled_sequence=CompiledSequence.from_dict(sequence)
+    )
+    pulse_blaster_sequence.parse_pulse_sequence_file()
+    return pulse_blaster_sequence
+
+
+def test_edges_become_bit_masks_and_durations():
+    sequence = _compile(
+        {
+            "LASER": {"pulse1": {"start": 0.5, "duration": 1.0}},
+            "MW": {"pulse1": {"start": 0.2, "duration": 0.5}},
+        }
+    )
+    block = sequence.ps["block_0"]
+    assert block["channel_bits"] == [0, 2, 3, 1, 0]
+    assert block["durations"] == pytest.approx([0.2, 0.3, 0.2, 0.8, 0.5])
+    channel_bits, durations, _, _ = sequence.compile()
+    assert channel_bits == block["channel_bits"] * 3
+    assert len(durations) == 15
+
+
+# Edges at the same time are merged into one instruction,
+# also several zero length events in a row.
+def test_coincident_edges_are_merged():
+    sequence = _compile(
+        {
+            "LASER": {"pulse1": {"start": 0.0, "duration": 1.0}},
+            "MW": {
+                "pulse1": {"start": 0.0, "duration": 0.5},
+                "pulse2": {"start": 1.0, "duration": 0.5},
+            },
+            "READ": {"pulse1": {"start": 0.5, "duration": 0.5}},
+        },
+        total_duration=1.5,
+    )
+    block = sequence.ps["block_0"]
+    assert block["channel_bits"] == [3, 5, 2]
+    assert block["durations"] == pytest.approx([0.5, 0.5, 0.5])
+
+
+def test_ignored_total_duration_ends_with_last_edge():
+    sequence = _compile(
+        {"LASER": {"pulse1": {"start": 0.5, "duration": 1.0}}}, total_duration="ignore"
+    )
+    assert sequence.ps["block_0"]["channel_bits"] == [0, 1]
+    assert sequence.ps["block_0"]["durations"] == pytest.approx([0.5, 1.0])
+
+
+def _expand(channel_bits, durations, instructions, instruction_data):
+    """
+    Play a compiled program once, up to its final BRANCH.
+    """
+    played = []
+    loops = {}
+    index = 0
+    while True:
+        played.append((channel_bits[index], round(durations[index], 9)))
+        instruction = instructions[index]
+        if instruction == PulseBlasterSequence.BRANCH:
+            return played
+        if instruction == PulseBlasterSequence.LOOP:
+            loops.setdefault(index, instruction_data[index])
+        if instruction == PulseBlasterSequence.END_LOOP:
+            start = instruction_data[index]
+            loops[start] -= 1
+            if loops[start] > 0:
+                index = start
+                continue
+            del loops[start]
+        index += 1
+
+
+# Repeated blocks become hardware loops, the last repetition of the
+# last block is unrolled so the program can end with BRANCH.
+def test_repeated_blocks_become_loops(monkeypatch):
+    monkeypatch.setattr(PulseBlasterSequence, "MAX_LOOPS", 4)
+    sequence = {
+        "total_duration": 2.0,
+        "sequencing_order": ["block_0", "block_1", "block_0"],
+        "sequencing_repeats": [10, 9, 3],
+        "block_0": {"LASER": {"pulse1": {"start": 0.5, "duration": 1.0}}},
+        "block_1": {"MW": {"pulse1": {"start": 0.0, "duration": 2.0}}},
+    }
+    pulse_blaster_sequence = PulseBlasterSequence(
+        CHANNEL_MAPPING, compiled_sequence=CompiledSequence.from_dict(sequence)
+    )
+    pulse_blaster_sequence.parse_pulse_sequence_file()
+    program = pulse_blaster_sequence.compile()
+    channel_bits, durations, instructions, instruction_data = program
+    # block_0 in loops of 4, 4 and 2, block_1 in a loop of 4 pairs and
+    # once more, block_0 in a loop of 2 and once unrolled.
+    assert len(instructions) == 3 * 3 + 3 + 3 + 3
+    assert instructions[:3] == [
+        PulseBlasterSequence.LOOP,
+        PulseBlasterSequence.CONTINUE,
+        PulseBlasterSequence.END_LOOP,
+    ]
+    assert instruction_data[:3] == [4, 0, 0]
+    assert instructions[9:12] == [
+        PulseBlasterSequence.LOOP,
+        PulseBlasterSequence.END_LOOP,
+        PulseBlasterSequence.CONTINUE,
+    ]
+    assert instruction_data[9:11] == [4, 9]
+    assert instructions[-1] == PulseBlasterSequence.BRANCH
+    block_0 = [(0, 0.5), (1, 1.0), (0, 0.5)]
+    assert _expand(*program) == block_0 * 10 + [(2, 2.0)] * 9 + block_0 * 3
+
+
+# Blocks of a single instruction are looped in pairs, no instruction
+# is held longer than in the block.
+@pytest.mark.parametrize("repeats", [1, 2, 3, 4, 5, 12])
+def test_single_instruction_blocks_loop_in_pairs(repeats):
+    sequence = {
+        "total_duration": 2.0,
+        "sequencing_order": ["block_0"],
+        "sequencing_repeats": [repeats],
+        "block_0": {"MW": {"pulse1": {"start": 0.0, "duration": 2.0}}},
+    }
+    pulse_blaster_sequence = PulseBlasterSequence(
+        CHANNEL_MAPPING, compiled_sequence=CompiledSequence.from_dict(sequence)
+    )
+    pulse_blaster_sequence.parse_pulse_sequence_file()
+    program = pulse_blaster_sequence.compile()
+    assert max(program[1]) == pytest.approx(2.0)
+    assert len(program[0]) <= 4
+    assert program[2][-1] == PulseBlasterSequence.BRANCH
+    assert _expand(*program) == [(2, 2.0)] * repeats
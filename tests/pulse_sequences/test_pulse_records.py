@@ -0,0 +1,45 @@
+from qupyt.pulse_sequences.SequenceDesigner import PulseRecords, PulseSequence
+import numpy as np
+
+
+def _records(sequence: PulseSequence) -> PulseRecords:
+    return PulseRecords(
+        np.array(sequence.records, dtype=PulseRecords.record_dtype),
+        sequence.num_points,
+        sequence.duration,
+        len(sequence.awg_sources),
+    )
+
+
+def test_rendered_waveform_matches_dense_sampling():
+    sequence = PulseSequence(2, 1.0, [1, 2], samprate=1e9)
+    sequence.add_pulse(0, 0.1, 0.2, channel=0, amplitude=0.5, freq=(2e7, 0.3))
+    sequence.add_pulse(0, 0.2, 0.1, channel=1)
+    sequence.add_pulse(0, 0.25, 0.1, channel=3)
+    sequence.add_pulse(1, 0.9, 0.5, channel=5, amplitude=0.2)
+    records = _records(sequence)
+
+    time = np.linspace(0, 1.0, 1000)
+    waveform = records.render(0, 0, dtype=np.float64)
+    analog = np.zeros(1000)
+    analog[100:300] = 0.5 * np.cos(2 * np.pi * 20 * time[100:300] + 0.3)
+    marker = np.zeros(1000)
+    marker[200:300] += 128
+    marker[250:350] += 32
+    assert np.array_equal(waveform[0], analog)
+    assert np.array_equal(waveform[1], marker)
+
+    # Pulses are clipped to the sequence duration.
+    waveform = records.render(1, 1)
+    assert waveform.dtype == np.float32
+    assert np.all(waveform[0, 900:] == np.float32(0.2))
+    assert not np.any(waveform[0, :900]) and not np.any(waveform[1])
+    assert not np.any(records.render(1, 0))
+
+
+def test_later_pulses_overwrite_earlier_ones():
+    sequence = PulseSequence(1, 0.1, [1], samprate=1e9)
+    sequence.add_pulse(0, 0.0, 0.05, channel=0, amplitude=1.0)
+    sequence.add_pulse(0, 0.02, 0.01, channel=0, amplitude=-1.0)
+    waveform = _records(sequence).render(0, 0)
+    assert list(waveform[0, 18:32]) == [1.0] * 2 + [-1.0] * 10 + [1.0] * 2
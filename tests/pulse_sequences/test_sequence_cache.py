@@ -0,0 +1,103 @@
+import os
+
+from qupyt.pulse_sequences import SequenceDesigner
+from qupyt.pulse_sequences.sequence_cache import SequenceCache
+from qupyt.pulse_sequences.SequenceDesigner import PulseSequenceYaml
+import numpy as np
+import yaml
+
+
+def _write_sequence(path, laser_duration):
+    sequence = {
+        "total_duration": 1.0,
+        "sequencing_order": ["block_0"],
+        "sequencing_repeats": [1],
+        "block_0": {
+            "LASER": {
+                "pulse1": {
+                    "start": 0.1,
+                    "duration": laser_duration,
+                    "amplitude": 1,
+                    "frequency": 0,
+                    "phase": 0,
+                }
+            }
+        },
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        yaml.dump(sequence, file)
+
+
+def test_key_depends_on_content_and_context(tmp_path):
+    _write_sequence(tmp_path / "a.yaml", 0.2)
+    _write_sequence(tmp_path / "b.yaml", 0.2)
+    _write_sequence(tmp_path / "c.yaml", 0.3)
+    key = SequenceCache.key(tmp_path / "a.yaml", samprate=1e9, channel_mapping={"LASER": 1})
+    assert key == SequenceCache.key(
+        tmp_path / "b.yaml", channel_mapping={"LASER": 1}, samprate=1e9
+    )
+    assert key != SequenceCache.key(
+        tmp_path / "c.yaml", samprate=1e9, channel_mapping={"LASER": 1}
+    )
+    assert key != SequenceCache.key(
+        tmp_path / "a.yaml", samprate=2e9, channel_mapping={"LASER": 1}
+    )
+    assert key != SequenceCache.key(
+        tmp_path / "a.yaml", samprate=1e9, channel_mapping={"LASER": 2}
+    )
+
+
+def test_least_recently_used_artifacts_are_evicted(tmp_path):
+    cache = SequenceCache(tmp_path, capacity=250)
+    for age, key in enumerate("abc"):
+        path = cache.store(key, ".bin", lambda path: path.write_bytes(bytes(100)))
+        os.utime(path, (age, age))
+    # Storing "c" pushed the cache over its capacity.
+    assert cache.lookup("a", ".bin") is None
+    assert cache.lookup("b", ".bin") is not None
+    cache.store("d", ".bin", lambda path: path.write_bytes(bytes(100)))
+    assert cache.lookup("c", ".bin") is None
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["b.bin", "d.bin"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+# Alternating between two sequences compiles each only once.
+def test_alternating_sequences_compile_once(tmp_path, monkeypatch):
+    compiled = []
+    make = SequenceDesigner.PulseSequence.make
+    monkeypatch.setattr(
+        SequenceDesigner.PulseSequence,
+        "make",
+        lambda self, path: compiled.append(path) or make(self, path),
+    )
+    _write_sequence(tmp_path / "a.yaml", 0.2)
+    _write_sequence(tmp_path / "b.yaml", 0.3)
+    paths = [
+        PulseSequenceYaml(
+            {"LASER": 1}, [1], samprate=1e9, yaml_file=tmp_path / name
+        ).translate_yaml_to_numeric_instructions()
+        for name in ["a.yaml", "b.yaml", "a.yaml", "b.yaml"]
+    ]
+    assert len(compiled) == 2
+    assert paths[0] == paths[2] and paths[1] == paths[3] and paths[0] != paths[1]
+    records = SequenceDesigner.PulseRecords.from_npz(np.load(paths[1]))
+    assert np.count_nonzero(records.render(0, 0)[1]) == 300
+
+
+# Other processes compiling into the same directory may remove
+# artifacts at any time, or still be writing theirs.
+def test_artifacts_removed_concurrently_are_skipped(tmp_path, monkeypatch):
+    cache = SequenceCache(tmp_path, capacity=150)
+    cache.store("a", ".bin", lambda path: path.write_bytes(bytes(100)))
+    (tmp_path / "b.123.partial.bin").write_bytes(bytes(100))
+    iterdir = type(tmp_path).iterdir
+    monkeypatch.setattr(
+        type(tmp_path),
+        "iterdir",
+        lambda self: [*iterdir(self), self / "evicted.bin"],
+    )
+    cache.store("c", ".bin", lambda path: path.write_bytes(bytes(100)))
+    assert cache.lookup("evicted", ".bin") is None
+    assert cache.lookup("c", ".bin") is not None
+    cache.clear()
+    assert [path.name for path in iterdir(tmp_path)] == ["b.123.partial.bin"]